@@ -1,35 +1,207 @@
 import argparse
+import subprocess
 import time
 import json
+import os
+import sys
 from pathlib import Path
 
-from alltius_ai.pdf_extractor import extract_pdf, save_extraction
+from alltius_ai.pdf_extractor import extract_pdf, iter_pages, save_extraction
+from alltius_ai.models import ExtractionResult
+from alltius_ai.table_extractor import preload_backend
+
+BASELINE_FORMAT = 1
+
+# cold-import cost, each measured in a fresh interpreter
+IMPORT_TARGETS = ("alltius_ai", "alltius_ai.cli", "fitz", "pdfplumber", "alltius_ai.pdf_extractor")
+
+
+def _options(args) -> dict:
+    return dict(
+        min_heading_ratio=args.min_heading_ratio,
+        merge_lines=not args.no_merge_lines,
+        merge_gap_ratio=args.merge_gap_ratio,
+        enable_ocr=args.enable_ocr,
+        table_backend=None if args.no_tables else args.table_backend,
+        parallel=args.parallel,
+        workers=args.workers,
+    )
+
+
+def import_timings(targets=IMPORT_TARGETS, runs: int = 3) -> dict:
+    code = "import sys, time; t = time.perf_counter(); __import__(sys.argv[1]); print(time.perf_counter() - t)"
+    timings = {}
+    for target in targets:
+        samples = []
+        for _ in range(runs):
+            out = subprocess.run([sys.executable, "-c", code, target], capture_output=True, text=True)
+            if out.returncode != 0:
+                break
+            samples.append(float(out.stdout.strip()))
+        if samples:
+            timings[target] = round(min(samples), 4)
+    return timings
+
+
+def _print_imports(timings: dict) -> None:
+    print("Import times: " + "  ".join(f"{name}={seconds * 1000:.0f}ms" for name, seconds in timings.items()))
+
+
+def _measure(pdf_path: str, options: dict) -> dict:
+    # one extraction + serialization; runs in a fresh child so peak RSS belongs to this document only
+    import resource
+    stats = {}
+    t0 = time.perf_counter()
+    pages = list(iter_pages(pdf_path, stats=stats, **options))
+    t1 = time.perf_counter()
+    save_extraction(ExtractionResult(pages=pages), os.devnull)
+    t2 = time.perf_counter()
+    stages = {name: round(seconds, 4) for name, seconds in sorted(stats.get("stages", {}).items())}
+    stages["serialize"] = round(t2 - t1, 4)
+    return {
+        "pages": len(pages),
+        "seconds": round(t2 - t0, 4),
+        "pages_per_sec": round(len(pages) / (t2 - t0), 2) if t2 > t0 else 0.0,
+        # KiB on Linux; with --parallel the largest page worker counts too
+        "peak_rss_mb": round(max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+                                 resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss) / 1024, 1),
+        "stages": stages,
+    }
+
+
+def _measure_child(pdf_path: str, options: dict, conn) -> None:
+    try:
+        conn.send((True, _measure(pdf_path, options)))
+    except BaseException as e:
+        conn.send((False, f"{type(e).__name__}: {e}"))
+    finally:
+        conn.close()
+
+
+def _measure_isolated(pdf_path: str, options: dict) -> dict:
+    # a plain (non-daemonic) child, as in batch mode: with --parallel it starts its own page workers
+    import multiprocessing as mp
+    methods = mp.get_all_start_methods()
+    ctx = mp.get_context("fork" if "fork" in methods else methods[0])
+    recv, send = ctx.Pipe(duplex=False)
+    proc = ctx.Process(target=_measure_child, args=(pdf_path, options, send))
+    proc.start()
+    send.close()
+    try:
+        ok, payload = recv.recv()
+    except EOFError:
+        proc.join()
+        raise RuntimeError(f"measurement of {pdf_path} exited with code {proc.exitcode}") from None
+    finally:
+        recv.close()
+    proc.join()
+    if not ok:
+        raise RuntimeError(f"measurement of {pdf_path} failed: {payload}")
+    return payload
+
+
+def _best(runs: list) -> dict:
+    # fastest run's timings, highest observed memory
+    best = dict(min(runs, key=lambda r: r["seconds"]))
+    best["peak_rss_mb"] = max(r["peak_rss_mb"] for r in runs)
+    return best
+
+
+def run_suite(args) -> dict:
+    sys.path.insert(0, str(Path(__file__).resolve().parent))
+    from synthetic_corpus import build_corpus
+    names = [n.strip() for n in args.only.split(",") if n.strip()] if args.only else None
+    corpus = build_corpus(args.corpus_dir, scale=args.scale, names=names)
+    # import cost is reported separately; load the table engine before forking so runs time extraction only
+    preload_backend(_options(args)["table_backend"])
+    results = {}
+    for name, path in corpus.items():
+        runs = [_measure_isolated(str(path), _options(args)) for _ in range(args.runs)]
+        results[name] = _best(runs)
+        r = results[name]
+        print(f"{name:10s} {r['pages']:5d} pages  {r['seconds']:8.3f}s  {r['pages_per_sec']:8.1f} pages/s  {r['peak_rss_mb']:7.1f} MB peak")
+        print("           " + "  ".join(f"{stage}={seconds:.3f}s" for stage, seconds in r["stages"].items()))
+    return results
+
+
+def compare(results: dict, baseline: dict, threshold: float, min_delta: float, imports: dict | None = None) -> list:
+    # a metric regresses when it is worse than baseline by more than `threshold` (relative)
+    # and, for timings, by more than `min_delta` seconds (so tiny stages do not flap on noise)
+    regressions = []
+    for name, base in baseline.get("results", {}).items():
+        cur = results.get(name)
+        if cur is None:
+            continue
+        timings = [("seconds", base["seconds"], cur["seconds"])]
+        timings += [(f"stages.{s}", v, cur["stages"].get(s, 0.0)) for s, v in base.get("stages", {}).items()]
+        for metric, old, new in timings:
+            if new > old * (1 + threshold) and new - old > min_delta:
+                regressions.append(f"{name} {metric}: {old:.3f}s -> {new:.3f}s")
+        old, new = base.get("peak_rss_mb", 0), cur["peak_rss_mb"]
+        if old and new > old * (1 + threshold):
+            regressions.append(f"{name} peak_rss_mb: {old:.1f} -> {new:.1f}")
+    for target, old in baseline.get("imports", {}).items():
+        new = (imports or {}).get(target)
+        if new is not None and new > old * (1 + threshold) and new - old > min_delta:
+            regressions.append(f"import {target}: {old:.3f}s -> {new:.3f}s")
+    return regressions
 
 
 def main():
     parser = argparse.ArgumentParser(description="Benchmark PDF extraction")
-    parser.add_argument("pdf_path")
+    parser.add_argument("pdf_path", nargs="?", help="Single PDF to time (omit with --suite)")
     parser.add_argument("--runs", type=int, default=1)
     parser.add_argument("--out")
     parser.add_argument("--min-heading-ratio", type=float, default=1.15)
     parser.add_argument("--merge-gap-ratio", type=float, default=0.6)
     parser.add_argument("--no-merge-lines", action="store_true")
     parser.add_argument("--enable-ocr", action="store_true")
+    parser.add_argument("--table-backend", default="pdfplumber")
+    parser.add_argument("--no-tables", action="store_true")
+    parser.add_argument("--parallel", action="store_true")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--suite", action="store_true", help="Run the synthetic corpus (prose, tables, images, headings, 1000-page)")
+    parser.add_argument("--corpus-dir", default=".bench_corpus", help="Where the synthetic corpus is generated (reused across runs)")
+    parser.add_argument("--scale", type=float, default=1.0, help="Scale every corpus document's page count")
+    parser.add_argument("--only", help="Comma separated corpus documents to run")
+    parser.add_argument("--json-out", help="Write suite results as JSON")
+    parser.add_argument("--baseline", help="Compare suite results against this baseline JSON")
+    parser.add_argument("--save-baseline", help="Store suite results as a new baseline JSON")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed relative slowdown before a metric counts as a regression")
+    parser.add_argument("--min-delta", type=float, default=0.05, help="Ignore timing regressions smaller than this many seconds")
     args = parser.parse_args()
 
+    imports = import_timings()
+    _print_imports(imports)
+    if args.suite:
+        results = run_suite(args)
+        payload = {"format": BASELINE_FORMAT, "options": _options(args), "scale": args.scale, "imports": imports, "results": results}
+        for path in filter(None, (args.json_out, args.save_baseline)):
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(payload, f, indent=2)
+            print(f"Wrote {path}")
+        if args.baseline:
+            with open(args.baseline, encoding="utf-8") as f:
+                baseline = json.load(f)
+            regressions = compare(results, baseline, args.threshold, args.min_delta, imports)
+            if regressions:
+                print(f"{len(regressions)} regression(s) over {args.threshold:.0%}:")
+                for line in regressions:
+                    print(f"  {line}")
+                sys.exit(1)
+            print(f"No regressions over {args.threshold:.0%} against {args.baseline}")
+        return
+    if not args.pdf_path:
+        parser.error("a PDF path (or --suite) is required")
+
     timings = []
     for i in range(args.runs):
         t0 = time.perf_counter()
-        result = extract_pdf(
-            args.pdf_path,
-            min_heading_ratio=args.min_heading_ratio,
-            merge_lines=not args.no_merge_lines,
-            merge_gap_ratio=args.merge_gap_ratio,
-            enable_ocr=args.enable_ocr,
-        )
+        result = extract_pdf(args.pdf_path, **_options(args))
         elapsed = time.perf_counter() - t0
         timings.append(elapsed)
         print(f"Run {i+1}: {elapsed:.3f}s")
+        print("  " + "  ".join(f"{stage}={seconds:.3f}s" for stage, seconds in sorted(result.stats.get("stages", {}).items())))
     avg = sum(timings)/len(timings)
     print(f"Average: {avg:.3f}s over {len(timings)} run(s)")
 
@@ -0,0 +1,199 @@
+import argparse
+import random
+from pathlib import Path
+
+from reportlab.lib.pagesizes import LETTER
+from reportlab.pdfgen import canvas
+
+# Reproducible benchmark corpus: every document is generated from a fixed seed, so the same
+# spec always produces the same text, tables and images (and the same extraction workload).
+
+WORDS = (
+    "revenue growth margin policy premium coverage claim customer account balance interest rate "
+    "annual quarterly report statement portfolio fund asset risk return market share service "
+    "product region segment forecast analysis operating income expense liability capital"
+).split()
+
+CORPUS = {
+    # name: (builder, pages)
+    "prose": ("prose", 40),
+    "tables": ("tables", 40),
+    "images": ("images", 20),
+    "headings": ("headings", 40),
+    "outline": ("outline", 200),  # heading-dense with a bookmark outline (heading_source="outline")
+    "long": ("prose", 1000),
+}
+
+
+def _sentence(rng: random.Random, words: int = 14) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+
+def _body(c, rng: random.Random, y: float, lines: int) -> float:
+    c.setFont("Helvetica", 11)
+    for _ in range(lines):
+        if y < 90:
+            break
+        c.drawString(72, y, _sentence(rng))
+        y -= 14
+    return y
+
+
+def _footer(c, page: int) -> None:
+    c.setFont("Helvetica", 8)
+    c.drawString(72, 30, f"Page {page} - synthetic benchmark document")
+
+
+def _prose_page(c, rng, page, state):
+    y = 730
+    if page % 10 == 1:
+        state["section"] += 1
+        c.setFont("Helvetica-Bold", 18)
+        c.drawString(72, y, f"{state['section']} Chapter {state['section']}")
+        y -= 30
+    while y > 120:
+        y = _body(c, rng, y, rng.randint(4, 8)) - 12
+    _footer(c, page)
+
+
+def _table(c, rng, x, y, rows, cols, cell_w=90, cell_h=18):
+    # ruled grid with a header row: passes the table prefilter and is found by both backends
+    for r in range(rows + 1):
+        c.line(x, y - r * cell_h, x + cols * cell_w, y - r * cell_h)
+    for k in range(cols + 1):
+        c.line(x + k * cell_w, y, x + k * cell_w, y - rows * cell_h)
+    c.setFont("Helvetica", 9)
+    for r in range(rows):
+        for k in range(cols):
+            text = f"Col {k + 1}" if r == 0 else f"{rng.randint(0, 99999):,}"
+            c.drawString(x + 4, y - r * cell_h - 13, text)
+    return y - rows * cell_h
+
+
+def _tables_page(c, rng, page, state):
+    c.setFont("Helvetica-Bold", 14)
+    c.drawString(72, 740, f"{page} Financial Summary {page}")
+    y = _body(c, rng, 715, 2) - 10
+    y = _table(c, rng, 72, y, rows=8, cols=5) - 20
+    y = _body(c, rng, y, 2) - 10
+    _table(c, rng, 72, y, rows=6, cols=4)
+    _footer(c, page)
+
+
+def _images_page(c, rng, page, state):
+    c.setFont("Helvetica-Bold", 14)
+    c.drawString(72, 740, f"{page} Chart Gallery {page}")
+    y = 700
+    for i in range(3):
+        c.drawImage(state["images"][(page + i) % len(state["images"])], 72, y - 150, width=220, height=140)
+        c.drawImage(state["icon"], 320, y - 30, width=16, height=16)  # decorative icon (OCR prefilter rejects it)
+        c.setFont("Helvetica", 10)
+        c.drawString(320, y - 60, _sentence(rng, 6))
+        y -= 200
+    _footer(c, page)
+
+
+def _headings_page(c, rng, page, state, outline=False):
+    y = 740
+    for _ in range(4):
+        state["sub"] += 1
+        if state["sub"] > 3:
+            state["section"] += 1
+            state["sub"] = 1
+            c.setFont("Helvetica-Bold", 18)
+            title = f"{state['section']} Part {state['section']}"
+            c.drawString(72, y, title)
+            if outline:
+                key = f"s{state['section']}"
+                c.bookmarkHorizontal(key, 72, y + 18)
+                c.addOutlineEntry(title, key, level=0)
+            y -= 26
+        c.setFont("Helvetica-Bold", 14)
+        title = f"{state['section']}.{state['sub']} Topic {state['sub']}"
+        c.drawString(72, y, title)
+        if outline:
+            key = f"s{state['section']}.{state['sub']}"
+            c.bookmarkHorizontal(key, 72, y + 14)
+            c.addOutlineEntry(title, key, level=1)
+        y = _body(c, rng, y - 20, 5) - 16
+    _footer(c, page)
+
+
+def _outline_page(c, rng, page, state):
+    if page == 1:
+        state["sub"] = 3  # open with a Part: outline levels cannot start below the top
+    _headings_page(c, rng, page, state, outline=True)
+
+
+_BUILDERS = {
+    "prose": _prose_page,
+    "tables": _tables_page,
+    "images": _images_page,
+    "headings": _headings_page,
+    "outline": _outline_page,
+}
+
+
+def _image_assets(directory: Path) -> dict:
+    from PIL import Image, ImageDraw
+    assets = directory / "_assets"
+    assets.mkdir(parents=True, exist_ok=True)
+    images = []
+    rng = random.Random(7)
+    for i in range(4):
+        path = assets / f"chart{i}.png"
+        if not path.exists():
+            img = Image.new("RGB", (660, 420), (255, 255, 255))
+            draw = ImageDraw.Draw(img)
+            for b in range(8):
+                h = rng.randint(40, 380)
+                draw.rectangle([30 + b * 78, 400 - h, 90 + b * 78, 400], fill=(40 * i % 255, 90, 160))
+            img.save(path)
+        images.append(str(path))
+    icon = assets / "icon.png"
+    if not icon.exists():
+        Image.new("RGB", (32, 32), (200, 30, 30)).save(icon)
+    return {"images": images, "icon": str(icon)}
+
+
+def build_document(path: Path, kind: str, pages: int, seed: int = 0) -> Path:
+    rng = random.Random(f"{kind}-{pages}-{seed}")
+    state = {"section": 0, "sub": 0}
+    if kind == "images":
+        state.update(_image_assets(path.parent))
+    builder = _BUILDERS[kind]
+    c = canvas.Canvas(str(path), pagesize=LETTER, invariant=1)
+    for page in range(1, pages + 1):
+        builder(c, rng, page, state)
+        c.showPage()
+    c.save()
+    return path
+
+
+def build_corpus(directory: str, scale: float = 1.0, names=None) -> dict:
+    # returns {name: pdf path}; existing files for the same spec are reused
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    corpus = {}
+    for name, (kind, pages) in CORPUS.items():
+        if names and name not in names:
+            continue
+        pages = max(1, int(pages * scale))
+        path = directory / f"{name}-{pages}p.pdf"
+        if not path.exists():
+            build_document(path, kind, pages)
+        corpus[name] = path
+    return corpus
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate the synthetic benchmark corpus")
+    parser.add_argument("out_dir")
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiply every document's page count")
+    args = parser.parse_args()
+    for name, path in build_corpus(args.out_dir, args.scale).items():
+        print(f"{name}: {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,18 @@
-from .pdf_extractor import extract_pdf, save_extraction
+# Public API is resolved lazily (PEP 562): importing the package, or a light submodule such as
+# alltius_ai.cli for --help, does not load PyMuPDF until extraction is actually used.
+__all__ = ["extract_pdf", "iter_pages", "save_extraction", "save_extraction_stream", "extract_pdf_async", "aiter_pages"]
+_ASYNC = ("extract_pdf_async", "aiter_pages")
 
-__all__ = ["extract_pdf", "save_extraction"]
+
+def __getattr__(name):
+    if name in _ASYNC:
+        from . import aio
+        return getattr(aio, name)
+    if name in __all__:
+        from . import pdf_extractor
+        return getattr(pdf_extractor, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -0,0 +1,125 @@
+from __future__ import annotations
+from concurrent.futures import Executor, ThreadPoolExecutor, wait
+from typing import AsyncIterator, Optional
+import asyncio
+import os
+import time
+import weakref
+
+from .metrics import Metrics, NULL_METRICS
+from .models import ExtractionResult, PageResult
+from .pdf_extractor import _attach_fingerprints, _with_metrics, iter_pages
+
+# asyncio front end. The page pipeline (iter_pages) is advanced one page at a time on an executor thread,
+# one page ahead of the consumer, so the event loop never waits on PyMuPDF, table detection or OCR.
+# Documents take a slot of a concurrency semaphore (per event loop, shared by all callers unless one is
+# passed) for as long as their PDF is open. Cancellation and timeouts take effect between pages; the PDF
+# handles are closed on the executor before the slot is released.
+DEFAULT_MAX_CONCURRENCY = os.cpu_count() or 1
+
+_max_concurrency = DEFAULT_MAX_CONCURRENCY
+_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+_executor: Optional[ThreadPoolExecutor] = None
+_DONE = object()
+
+
+def set_max_concurrency(limit: int) -> None:
+    # documents extracted at once through the default semaphore (and threads of the default executor)
+    global _max_concurrency, _executor
+    if limit < 1:
+        raise ValueError("The concurrency limit must be at least 1")
+    _max_concurrency = limit
+    _semaphores.clear()  # documents holding a slot release it to the semaphore they took it from
+    # documents in progress keep stepping (and closing) on the old pool; its threads exit once it is unused
+    _executor = None
+
+
+def _default_semaphore() -> asyncio.Semaphore:
+    loop = asyncio.get_running_loop()
+    semaphore = _semaphores.get(loop)
+    if semaphore is None:
+        semaphore = _semaphores[loop] = asyncio.Semaphore(_max_concurrency)
+    return semaphore
+
+
+def _default_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=_max_concurrency, thread_name_prefix="alltius-aio")
+    return _executor
+
+
+def _close(pages, step) -> None:
+    # on the executor: let a page still being produced finish, then close the generator, which closes the
+    # document, table backend and OCR pool (iter_pages' finally blocks)
+    if step is not None:
+        wait([step])
+    pages.close()
+
+
+async def aiter_pages(
+    pdf_path: str,
+    *,
+    executor: Executor | None = None,
+    semaphore: asyncio.Semaphore | None = None,
+    timeout: float | None = None,
+    **options,
+) -> AsyncIterator[PageResult]:
+    # async counterpart of iter_pages (same options, e.g. page_executor= / ocr_executor= to share process
+    # and Tesseract pools between documents). executor: thread pool that advances the page pipeline (a
+    # shared default sized by set_max_concurrency). timeout: seconds for the whole document, counted from
+    # when it gets its semaphore slot; exceeding it raises TimeoutError.
+    loop = asyncio.get_running_loop()
+    executor = executor or _default_executor()
+    semaphore = semaphore or _default_semaphore()
+    await semaphore.acquire()
+    pages = None
+    step = None
+    try:
+        deadline = None if timeout is None else loop.time() + timeout
+        pages = iter_pages(pdf_path, **options)
+        step = executor.submit(next, pages, _DONE)
+        while True:
+            pending = asyncio.wrap_future(step)
+            if deadline is None:
+                page = await pending
+            else:
+                try:
+                    page = await asyncio.wait_for(pending, max(0.0, deadline - loop.time()))
+                except asyncio.TimeoutError:
+                    raise TimeoutError(f"Extraction of {pdf_path} exceeded {timeout:g}s") from None
+            if page is _DONE:
+                step = None
+                return
+            # the next page is produced while the consumer handles this one
+            step = executor.submit(next, pages, _DONE)
+            yield page
+    finally:
+        try:
+            if pages is not None:
+                await asyncio.shield(asyncio.wrap_future(executor.submit(_close, pages, step)))
+        finally:
+            semaphore.release()
+
+
+async def extract_pdf_async(
+    pdf_path: str,
+    *,
+    executor: Executor | None = None,
+    semaphore: asyncio.Semaphore | None = None,
+    timeout: float | None = None,
+    metrics: Metrics | None = None,
+    attach_metrics: bool = False,
+    **options,
+) -> ExtractionResult:
+    # async counterpart of extract_pdf, built on aiter_pages (options as for iter_pages; no result cache
+    # or page spilling). Cancelling the awaiting task stops the extraction after the current page.
+    if attach_metrics and metrics is None:
+        metrics = Metrics()
+    t0 = time.perf_counter()
+    result = ExtractionResult()
+    async for page in aiter_pages(pdf_path, executor=executor, semaphore=semaphore, timeout=timeout,
+                                  stats=result.stats, metrics=metrics, **options):
+        result.pages.append(page)
+    _attach_fingerprints(result)
+    return _with_metrics(result, metrics or NULL_METRICS, attach_metrics, t0)
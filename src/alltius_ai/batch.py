@@ -0,0 +1,200 @@
+from __future__ import annotations
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import List, Optional
+import glob
+import json
+import logging
+import multiprocessing as mp
+import os
+import time
+from multiprocessing.connection import wait
+
+
+@dataclass
+class BatchJob:
+    input: str
+    output: str
+
+
+@dataclass
+class JobOutcome:
+    job: BatchJob
+    ok: bool
+    pages: int = 0
+    seconds: float = 0.0
+    error: Optional[str] = None
+
+
+@dataclass
+class BatchSummary:
+    outcomes: List[JobOutcome] = field(default_factory=list)
+    wall_seconds: float = 0.0
+
+    @property
+    def succeeded(self) -> int:
+        return sum(1 for o in self.outcomes if o.ok)
+
+    @property
+    def failures(self) -> List[JobOutcome]:
+        return [o for o in self.outcomes if not o.ok]
+
+    @property
+    def pages(self) -> int:
+        return sum(o.pages for o in self.outcomes if o.ok)
+
+    @property
+    def docs_per_second(self) -> float:
+        return self.succeeded / self.wall_seconds if self.wall_seconds else 0.0
+
+    @property
+    def pages_per_second(self) -> float:
+        return self.pages / self.wall_seconds if self.wall_seconds else 0.0
+
+    def format(self) -> str:
+        lines = [
+            f"Batch: {len(self.outcomes)} documents, {self.succeeded} ok, {len(self.failures)} failed in {self.wall_seconds:.2f}s",
+            f"Throughput: {self.docs_per_second:.2f} docs/s, {self.pages_per_second:.2f} pages/s ({self.pages} pages)",
+        ]
+        for o in self.failures:
+            lines.append(f"  FAILED {o.job.input}: {o.error}")
+        return "\n".join(lines)
+
+
+def collect_jobs(spec: str, out_dir: Optional[str] = None, fmt: str = "json") -> List[BatchJob]:
+    # spec: a directory (its *.pdf files), a glob pattern, or a JSONL manifest with
+    # {"input": ..., "output": ...} per line (output optional when out_dir is given)
+    from .columnar import COLUMNAR_SUFFIXES
+    suffix = ".ndjson" if fmt == "ndjson" else COLUMNAR_SUFFIXES.get(fmt, ".json")
+
+    def default_output(pdf: str) -> str:
+        if not out_dir:
+            raise ValueError(f"No output path for {pdf}: pass --out-dir or set 'output' in the manifest")
+        return str(Path(out_dir) / (Path(pdf).stem + suffix))
+
+    path = Path(spec)
+    if path.is_dir():
+        inputs = sorted(str(p) for p in path.iterdir() if p.suffix.lower() == ".pdf")
+        return [BatchJob(p, default_output(p)) for p in inputs]
+    if path.is_file() and path.suffix.lower() in (".jsonl", ".ndjson"):
+        jobs = []
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                jobs.append(BatchJob(entry["input"], entry.get("output") or default_output(entry["input"])))
+        return jobs
+    return [BatchJob(p, default_output(p)) for p in sorted(glob.glob(spec, recursive=True))]
+
+
+def _run_job(job: BatchJob, options: dict, fmt: str, pretty: bool, plugins: List[str], cache: Optional[dict], conn) -> None:
+    # child process: any crash here (even a segfault in a native library) only loses this document
+    try:
+        from .pdf_extractor import extract_pdf, iter_pages, save_extraction_stream
+        t0 = time.perf_counter()
+        if cache:
+            from .cache import ResultCache
+            pages = extract_pdf(job.input, cache=ResultCache(**cache), **options).pages
+        else:
+            pages = iter_pages(job.input, **options)
+        if plugins:
+            # inline: the job already runs in its own (daemonic) process, which cannot start a pool
+            from .plugins import PluginPipeline
+            pages = PluginPipeline(plugins, workers=0).process_pages(pages)
+        Path(job.output).parent.mkdir(parents=True, exist_ok=True)
+        from .columnar import COLUMNAR_FORMATS
+        if fmt in COLUMNAR_FORMATS:
+            from .columnar import save_columnar
+            from .models import ExtractionResult
+            count = save_columnar(ExtractionResult(pages=list(pages)), job.output, fmt=fmt)
+        else:
+            count = save_extraction_stream(pages, job.output, fmt=fmt, pretty=pretty)
+        conn.send((True, count, time.perf_counter() - t0, None))
+    except BaseException as e:  # report everything, including KeyboardInterrupt in the child
+        conn.send((False, 0, 0.0, f"{type(e).__name__}: {e}"))
+    finally:
+        conn.close()
+
+
+def _context():
+    # fork keeps the parent's warm imports (fitz, pdfplumber) so each document costs no interpreter start-up
+    methods = mp.get_all_start_methods()
+    return mp.get_context("fork" if "fork" in methods else methods[0])
+
+
+def run_batch(
+    jobs: List[BatchJob],
+    options: dict | None = None,
+    concurrency: int | None = None,
+    timeout: float | None = None,
+    fmt: str = "json",
+    pretty: bool = True,
+    plugins: List[str] | None = None,
+    cache: dict | None = None,
+    logger: logging.Logger | None = None,
+) -> BatchSummary:
+    # Each document runs in its own child process, at most `concurrency` at a time. Crashes and
+    # timeouts are recorded as failures of that document; the rest of the batch carries on.
+    # cache: ResultCache keyword arguments (directory, max_bytes, max_age) to reuse earlier results.
+    logger = logger or logging.getLogger(__name__)
+    options = options or {}
+    if options.get("parallel") or options.get("page_executor") is not None:
+        # jobs run in daemonic processes, which cannot start page worker pools; documents already run
+        # side by side, so each one is extracted serially
+        logger.warning("Batch mode extracts each document serially; parallel page extraction is ignored")
+        options = {**options, "parallel": False, "workers": None, "page_executor": None}
+    plugins = plugins or []
+    concurrency = max(1, concurrency or os.cpu_count() or 1)
+    ctx = _context()
+    # load the extraction stack once in the parent; forked children inherit it
+    from . import pdf_extractor  # noqa: F401
+    from .table_extractor import preload_backend
+    preload_backend(options.get("table_backend", "pdfplumber"))
+    summary = BatchSummary()
+    queue = list(reversed(jobs))
+    running = {}  # sentinel -> (process, job, conn, started)
+    t0 = time.perf_counter()
+
+    def finish(sentinel, outcome: JobOutcome):
+        proc, _job, conn, _started = running.pop(sentinel)
+        conn.close()
+        proc.join()
+        summary.outcomes.append(outcome)
+        level = logging.INFO if outcome.ok else logging.WARNING
+        logger.log(level, "%s %s (%d pages, %.2fs)%s", "done" if outcome.ok else "FAILED", outcome.job.input,
+                   outcome.pages, outcome.seconds, f": {outcome.error}" if outcome.error else "")
+
+    while queue or running:
+        while queue and len(running) < concurrency:
+            job = queue.pop()
+            recv, send = ctx.Pipe(duplex=False)
+            proc = ctx.Process(target=_run_job, args=(job, options, fmt, pretty, plugins, cache, send), daemon=True)
+            proc.start()
+            send.close()
+            running[proc.sentinel] = (proc, job, recv, time.perf_counter())
+        now = time.perf_counter()
+        wait_for = None
+        if timeout is not None:
+            wait_for = max(0.0, min(started + timeout for _p, _j, _c, started in running.values()) - now)
+        for sentinel in wait(list(running), timeout=wait_for):
+            proc, job, conn, started = running[sentinel]
+            message = None
+            try:
+                if conn.poll():
+                    message = conn.recv()
+            except EOFError:  # died before reporting (segfault, os._exit, OOM kill)
+                pass
+            if message is not None:
+                finish(sentinel, JobOutcome(job, *message))
+            else:
+                proc.join()
+                finish(sentinel, JobOutcome(job, False, seconds=time.perf_counter() - started, error=f"worker exited with code {proc.exitcode}"))
+        if timeout is not None:
+            now = time.perf_counter()
+            for sentinel, (proc, job, conn, started) in list(running.items()):
+                if now - started >= timeout:
+                    proc.kill()
+                    finish(sentinel, JobOutcome(job, False, seconds=now - started, error=f"timed out after {timeout:g}s"))
+    summary.wall_seconds = time.perf_counter() - t0
+    return summary
@@ -0,0 +1,119 @@
+from __future__ import annotations
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+import gzip
+import hashlib
+import json
+import os
+import time
+
+from .models import ExtractionResult
+from .exporters import write_json_stream
+
+# bump when the extraction output changes so stale entries stop matching
+CACHE_FORMAT = 3
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    stores: int = 0
+    evictions: int = 0
+    bytes_saved: int = 0  # input PDF bytes that did not have to be re-extracted
+
+
+def file_digest(path: str, chunk_size: int = 1024 * 1024) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class ResultCache:
+    # Persistent extraction results keyed by PDF content hash + output-affecting options.
+    # Entries are gzip'd compact JSON of ExtractionResult.to_dict(), plus the block bboxes (which
+    # to_dict leaves out) so a hit feeds bbox-aware outputs such as the columnar formats alike.
+    # Least recently used entries go once the directory exceeds max_bytes; entries older than
+    # max_age seconds are treated as misses and removed.
+    def __init__(self, directory: str, max_bytes: int = 512 * 1024 * 1024, max_age: Optional[float] = None):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.stats = CacheStats()
+
+    def key(self, pdf_path: str, options: dict) -> str:
+        payload = json.dumps({"format": CACHE_FORMAT, "pdf": file_digest(pdf_path), "options": options}, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.json.gz"
+
+    def get(self, key: str, pdf_path: Optional[str] = None) -> Optional[ExtractionResult]:
+        path = self._path(key)
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            self.stats.misses += 1
+            return None
+        if self.max_age is not None and time.time() - entry.get("created", 0) > self.max_age:
+            self._remove(path)
+            self.stats.misses += 1
+            return None
+        os.utime(path)  # LRU bookkeeping
+        self.stats.hits += 1
+        if pdf_path:
+            self.stats.bytes_saved += os.path.getsize(pdf_path)
+        result = ExtractionResult.from_dict(entry["result"])
+        for page, boxes in zip(result.pages, entry.get("bboxes", ())):
+            for block, bbox in zip(page.content, boxes):
+                if bbox is not None:
+                    block.bbox = tuple(bbox)
+        return result
+
+    def put(self, key: str, result: ExtractionResult) -> None:
+        path = self._path(key)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        with gzip.open(tmp, "wt", encoding="utf-8") as f:
+            # {"created": ..., "result": result.to_dict()} written page by page, without the dict tree
+            f.write(f'{{"created":{time.time()!r},"result":')
+            write_json_stream(result.pages, f, pretty=False, metadata=result.metadata)
+            f.write(',"bboxes":[')
+            for i, page in enumerate(result.pages):
+                boxes = [list(b.bbox) if getattr(b, "bbox", None) else None for b in page.content]
+                f.write(("," if i else "") + json.dumps(boxes, separators=(",", ":")))
+            f.write("]}")
+        os.replace(tmp, path)
+        self.stats.stores += 1
+        self.evict()
+
+    def evict(self) -> None:
+        now = time.time()
+        entries = []
+        for path in self.directory.glob("*.json.gz"):
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            # mtime is never earlier than creation, so an old mtime means an expired entry
+            if self.max_age is not None and now - st.st_mtime > self.max_age:
+                self._remove(path)
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+        total = sum(size for _mtime, size, _path in entries)
+        for _mtime, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            self._remove(path)
+            total -= size
+
+    def _remove(self, path: Path) -> None:
+        try:
+            path.unlink()
+            self.stats.evictions += 1
+        except OSError:
+            pass
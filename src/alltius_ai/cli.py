@@ -1,47 +1,249 @@
-from .pdf_extractor import extract_pdf, save_extraction
-from .exporters import to_markdown
+# Heavy modules (pdf_extractor -> PyMuPDF, table backends) are imported inside main() once the
+# arguments are parsed, so --help and argument errors return without loading them.
+from .table_extractor import available_backends
 import logging
 
 
+def _extraction_options(args) -> dict:
+    return dict(
+        min_heading_ratio=args.min_heading_ratio,
+        merge_lines=not args.no_merge_lines,
+        merge_gap_ratio=args.merge_gap_ratio,
+        enable_ocr=args.enable_ocr,
+        parallel=args.parallel,
+        workers=args.workers,
+        table_backend=None if args.no_tables else args.table_backend,
+        force_tables=args.force_table_detection,
+        ocr_cache_dir=args.ocr_cache_dir,
+        ocr_cache_max_mb=args.ocr_cache_max_mb,
+        ocr_workers=args.ocr_workers,
+        ocr_dpi=args.ocr_dpi,
+        pages=args.pages,
+        heading_source=args.heading_source,
+        font_stats=args.font_stats,
+        table_text=args.table_text,
+        memory_budget_mb=args.max_memory_mb,
+    )
+
+
+def _cache_options(args):
+    if not args.cache_dir:
+        return None
+    max_age = args.cache_max_age * 3600 if args.cache_max_age is not None else None
+    return dict(directory=args.cache_dir, max_bytes=int(args.cache_max_mb * 1024 * 1024), max_age=max_age)
+
+
+def _plugin_names(args) -> list:
+    return [p.strip() for p in args.enable_plugins.split(',') if p.strip()]
+
+
 def main():
     import argparse
     parser = argparse.ArgumentParser(description="Alltius PDF -> JSON extractor")
-    parser.add_argument("pdf_path", help="Input PDF path")
-    parser.add_argument("--out", default="output.json", help="Output JSON path")
+    parser.add_argument("pdf_path", nargs="?", help="Input PDF path")
+    parser.add_argument("--out", default=None, help="Output path (default: output.json, or output.<format> for columnar formats)")
+    parser.add_argument("--format", choices=["json", "ndjson", "parquet", "arrow", "msgpack"], default="json",
+                        help="Output format (ndjson: one page per line, always streamed; parquet/arrow/msgpack: one row per block)")
+    parser.add_argument("--stream", action="store_true", help="Write pages as they are extracted instead of building the whole result first")
+    parser.add_argument("--pages", help="Only extract these 1-based pages, e.g. 40-55,80 (section context is still carried in)")
     parser.add_argument("--min-heading-ratio", type=float, default=1.15)
+    parser.add_argument("--heading-source", choices=["auto", "outline", "fonts"], default="auto",
+                        help="Where headings come from: the PDF outline (bookmarks), font sizes, or outline when present (default)")
+    parser.add_argument("--font-stats", choices=["document", "page"], default="document",
+                        help="Body size for pages where every font size occurs once: the document's (sampled once, default) or the page median")
     parser.add_argument("--no-pretty", action="store_true")
     parser.add_argument("--no-merge-lines", action="store_true")
     parser.add_argument("--log-level", default="INFO")
     parser.add_argument("--merge-gap-ratio", type=float, default=0.6)
     parser.add_argument("--enable-ocr", action="store_true")
+    parser.add_argument("--ocr-cache-dir", help="Directory for the persistent, content-addressed OCR cache")
+    parser.add_argument("--ocr-cache-max-mb", type=float, default=64, help="Size bound of the OCR cache directory (LRU eviction)")
+    parser.add_argument("--ocr-workers", type=int, default=None, help="Concurrent Tesseract jobs (0 = inline; default: min(4, CPU count))")
+    parser.add_argument("--ocr-dpi", type=int, default=200, help="Render resolution for OCR input")
+    parser.add_argument("--cache-dir", help="Reuse extraction results for identical PDFs and options from this directory")
+    parser.add_argument("--cache-max-mb", type=float, default=512, help="Size bound of the result cache (LRU eviction)")
+    parser.add_argument("--cache-max-age", type=float, default=None, help="Maximum age of cached results in hours")
     parser.add_argument("--markdown-out", help="Optional markdown output file path")
     parser.add_argument("--enable-plugins", help="Comma separated plugin names to enable", default="")
-    parser.add_argument("--parallel", action="store_true", help="Enable parallel page processing (experimental)")
+    parser.add_argument("--plugin-workers", type=int, default=None,
+                        help="Process-pool size for plugins that opt into parallel execution (default: CPU count, 0 = inline)")
+    parser.add_argument("--parallel", action="store_true", help="Process page shards in worker processes")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes for --parallel (default: CPU count)")
+    parser.add_argument("--table-backend", default="pdfplumber", choices=available_backends(), help="Table detection engine")
+    parser.add_argument("--no-tables", action="store_true", help="Skip table detection entirely (no table backend is loaded)")
+    parser.add_argument("--force-table-detection", action="store_true", help="Run the table detector on every page, bypassing the prefilter")
+    parser.add_argument("--table-text", choices=["drop", "keep"], default="drop",
+                        help="Text lines inside detected tables: drop them (their text is in the cells, default) or keep them as paragraphs too")
+    parser.add_argument("--max-memory-mb", type=float, default=None,
+                        help="Memory-bounded mode: release parsed document state as pages finish and spill finished pages to a temporary file above this RSS")
+    parser.add_argument("--fingerprints", action="store_true",
+                        help="Store per-page fingerprints in the output so a later revision can be extracted with --previous")
+    parser.add_argument("--previous", help="Output of an earlier --fingerprints run on a previous revision of this PDF: only changed pages are extracted")
+    parser.add_argument("--metrics-out", help="Write extraction metrics to this file (JSON if it ends in .json, Prometheus text otherwise)")
+    parser.add_argument("--attach-metrics", action="store_true", help="Embed extraction metrics under \"metadata\" in the JSON output")
+    parser.add_argument("--batch", help="Extract many PDFs: a directory, a glob pattern or a JSONL manifest of {\"input\", \"output\"}")
+    parser.add_argument("--out-dir", help="Output directory for --batch (one <stem>.json/.ndjson per input)")
+    parser.add_argument("--jobs", type=int, default=None, help="Documents extracted concurrently in --batch mode (default: CPU count)")
+    parser.add_argument("--timeout", type=float, default=None, help="Per-document time limit in seconds for --batch")
     args = parser.parse_args()
+    if args.pages:
+        from .pdf_extractor import page_ranges
+        try:
+            page_ranges(args.pages)
+        except ValueError as e:
+            parser.error(str(e))
+    if args.batch:
+        if args.pdf_path:
+            parser.error("pass either a PDF path or --batch, not both")
+        if args.markdown_out:
+            parser.error("--markdown-out is not supported with --batch")
+        if args.fingerprints or args.previous:
+            parser.error("--fingerprints and --previous are not supported with --batch")
+        logging.basicConfig(level=getattr(logging, args.log_level.upper(), logging.INFO))
+        _run_batch(parser, args)
+        return
+    if not args.pdf_path:
+        parser.error("a PDF path (or --batch) is required")
+    from .pdf_extractor import extract_pdf, iter_pages, save_extraction, save_extraction_stream
+    stream = args.stream or args.format == "ndjson"
+    columnar = args.format in ("parquet", "arrow", "msgpack")
+    if args.out is None:
+        args.out = f"output.{args.format}" if columnar else "output.json"
+    if columnar and args.stream:
+        parser.error(f"--format {args.format} is written from the full result; it cannot be combined with --stream")
+    if columnar:
+        from .columnar import require_format
+        try:
+            require_format(args.format)
+        except ImportError as e:
+            parser.error(str(e))
+    if stream and args.cache_dir:
+        parser.error("--cache-dir cannot be combined with streaming output")
+    if stream and args.attach_metrics:
+        parser.error("--attach-metrics needs the full result; use --metrics-out with streaming output")
+    if stream and (args.fingerprints or args.previous):
+        parser.error("--fingerprints and --previous need the full result; they cannot be combined with streaming output")
+    if args.pages and (args.fingerprints or args.previous):
+        parser.error("--fingerprints and --previous cover the whole document; they cannot be combined with --pages")
+    if args.max_memory_mb is not None and args.enable_plugins and not stream:
+        # plugins edit pages in place, which does not reach pages already spilled to disk
+        parser.error("--enable-plugins with --max-memory-mb needs streaming output (--stream)")
 
     logging.basicConfig(level=getattr(logging, args.log_level.upper(), logging.INFO))
-    result = extract_pdf(
-        args.pdf_path,
-        min_heading_ratio=args.min_heading_ratio,
-        merge_lines=not args.no_merge_lines,
-        merge_gap_ratio=args.merge_gap_ratio,
-        enable_ocr=args.enable_ocr,
-        parallel=args.parallel,
-    )
-    # Plugin hook placeholder (plugins executed post extraction)
-    if args.enable_plugins:
-        from .plugins import run_plugins
-        plugin_list = [p.strip() for p in args.enable_plugins.split(',') if p.strip()]
-        if plugin_list:
+    plugin_list = _plugin_names(args)
+    metrics = None
+    if args.metrics_out or args.attach_metrics:
+        from .metrics import Metrics
+        metrics = Metrics()
+    pipeline = None
+    if plugin_list:
+        from .plugins import PluginPipeline
+        try:
+            pipeline = PluginPipeline(plugin_list, metrics=metrics, workers=args.plugin_workers)
+        except ValueError as e:
+            parser.error(str(e))
+    if stream:
+        pages = iter_pages(args.pdf_path, metrics=metrics, **_extraction_options(args))
+        if pipeline is not None:
+            # plugins see pages as they are produced, so streaming output stays bounded
             logging.info("Running plugins: %s", ", ".join(plugin_list))
-            run_plugins(result, plugin_list)
-    save_extraction(result, args.out, pretty=not args.no_pretty)
+            pages = pipeline.process_pages(pages)
+        count = save_extraction_stream(pages, args.out, fmt=args.format, pretty=not args.no_pretty, metrics=metrics,
+                                       markdown_path=args.markdown_out)
+        print(f"Wrote {args.out} ({count} pages)")
+        if args.markdown_out:
+            print(f"Wrote {args.markdown_out}")
+        if pipeline is not None:
+            logging.info("Plugins: %s", pipeline.summary())
+        _write_metrics(metrics, args.metrics_out)
+        return
+    cache = None
+    if args.cache_dir:
+        from .cache import ResultCache
+        cache = ResultCache(**_cache_options(args))
+    previous = None
+    if args.previous:
+        try:
+            previous = _load_result(args.previous)
+        except (OSError, ValueError) as e:
+            parser.error(f"cannot read --previous {args.previous}: {e}")
+        if "fingerprints" not in previous.metadata:
+            parser.error(f"--previous {args.previous} has no page fingerprints (extract it with --fingerprints)")
+    result = extract_pdf(args.pdf_path, cache=cache, metrics=metrics, attach_metrics=args.attach_metrics,
+                         fingerprints=args.fingerprints, previous=previous, **_extraction_options(args))
+    inc = result.stats.get("incremental")
+    if inc is not None:  # absent when the result came from the cache
+        logging.info("Incremental: %d pages reused, %d extracted (%d because their section context changed)",
+                     inc["reused_pages"], inc["extracted_pages"], inc["resynced_pages"])
+    if cache is not None:
+        st = cache.stats
+        logging.info("Result cache: %d hits, %d misses, %d bytes saved", st.hits, st.misses, st.bytes_saved)
+    if pipeline is not None:
+        logging.info("Running plugins: %s", ", ".join(plugin_list))
+        pipeline.run(result)
+        logging.info("Plugins: %s", pipeline.summary())
+    if columnar:
+        from .columnar import save_columnar
+        save_columnar(result, args.out, fmt=args.format, metrics=metrics)
+        if args.markdown_out:
+            from .exporters import write_markdown
+            with open(args.markdown_out, 'w', encoding='utf-8') as f:
+                write_markdown(result.pages, f)
+    else:
+        # JSON and Markdown from one pass over the pages
+        save_extraction(result, args.out, pretty=not args.no_pretty, metrics=metrics, markdown_path=args.markdown_out)
     print(f"Wrote {args.out}")
     if args.markdown_out:
-        md = to_markdown(result)
-        with open(args.markdown_out, 'w', encoding='utf-8') as f:
-            f.write(md)
         print(f"Wrote {args.markdown_out}")
+    _write_metrics(metrics, args.metrics_out)
+
+def _load_result(path):
+    from .columnar import COLUMNAR_SUFFIXES, load_columnar
+    if path.endswith(tuple(COLUMNAR_SUFFIXES.values())):
+        return load_columnar(path)
+    import json
+    from .models import ExtractionResult
+    with open(path, encoding='utf-8') as f:
+        return ExtractionResult.from_dict(json.load(f))
+
+def _write_metrics(metrics, path):
+    if metrics is None or not path:
+        return
+    with open(path, 'w', encoding='utf-8') as f:
+        if path.endswith(".json"):
+            import json
+            json.dump(metrics.to_dict(), f, indent=2)
+        else:
+            f.write(metrics.to_prometheus())
+    print(f"Wrote {path}")
+
+def _run_batch(parser, args):
+    from .batch import collect_jobs, run_batch
+    if args.enable_plugins:
+        from .plugins import PluginPipeline
+        try:
+            PluginPipeline(_plugin_names(args), workers=0)
+        except ValueError as e:
+            parser.error(str(e))
+    try:
+        jobs = collect_jobs(args.batch, args.out_dir, fmt=args.format)
+    except (ValueError, OSError) as e:
+        parser.error(str(e))
+    if not jobs:
+        parser.error(f"no PDFs matched {args.batch!r}")
+    summary = run_batch(
+        jobs,
+        options=_extraction_options(args),
+        concurrency=args.jobs,
+        timeout=args.timeout,
+        fmt=args.format,
+        pretty=not args.no_pretty,
+        plugins=_plugin_names(args),
+        cache=_cache_options(args),
+    )
+    print(summary.format())
+    if summary.failures:
+        raise SystemExit(1)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,192 @@
+from __future__ import annotations
+from typing import Iterator, List, Optional, Sequence
+import json
+
+from .models import ExtractionResult, PageResult, ParagraphBlock, TableBlock, ChartBlock, FootnoteBlock
+from .models import block_from_dict
+
+# One row per content block, for bulk loading into dataframes / query engines. Tables (and rows
+# extracted from charts) stay with their block as a nested list<list<string>> column; the page list
+# (pages without blocks included) and the document metadata travel in the file's own metadata.
+COLUMNAR_FORMATS = ("parquet", "arrow", "msgpack")
+COLUMNAR_SUFFIXES = {"parquet": ".parquet", "arrow": ".arrow", "msgpack": ".msgpack"}
+FORMAT_VERSION = 1
+COLUMNS = (
+    "page_number", "block_index", "type", "section", "sub_section", "text", "description",
+    "confidence", "x0", "y0", "x1", "y1", "rows", "metadata",
+)
+_BATCH_PAGES = 256  # pages per record batch / Parquet row group
+_MSGPACK_FORMAT = "alltius-blocks"
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        return pyarrow
+    except ImportError:
+        raise ImportError("Parquet and Arrow output need pyarrow (pip install pyarrow)") from None
+
+
+def _msgpack():
+    try:
+        import msgpack
+        return msgpack
+    except ImportError:
+        raise ImportError("msgpack output needs msgpack (pip install msgpack)") from None
+
+
+def require_format(fmt: str) -> None:
+    # fails early (before an extraction) when the library a format needs is missing
+    if fmt not in COLUMNAR_FORMATS:
+        raise ValueError(f"Unknown columnar format {fmt!r} (expected one of {', '.join(COLUMNAR_FORMATS)})")
+    if fmt == "msgpack":
+        _msgpack()
+    else:
+        _pyarrow()
+
+
+def block_rows(page: PageResult) -> Iterator[tuple]:
+    # the page's blocks as tuples in COLUMNS order; metadata is a JSON string (or None)
+    for i, b in enumerate(page.content):
+        text = b.text if isinstance(b, (ParagraphBlock, FootnoteBlock)) else None
+        if isinstance(b, TableBlock):
+            rows = b.table_data
+        elif isinstance(b, ChartBlock):
+            rows = b.extracted_data
+        else:
+            rows = None
+        bbox = getattr(b, "bbox", None) or (None, None, None, None)
+        metadata = json.dumps(b._metadata, ensure_ascii=False) if b._metadata else None
+        yield (page.page_number, i, b.type, b.section, b.sub_section, text, getattr(b, "description", None),
+               b.confidence, *bbox, rows, metadata)
+
+
+def _arrow_schema(pa, page_numbers: List[int], metadata: dict):
+    text = pa.string()
+    coord = pa.float64()
+    fields = [
+        pa.field("page_number", pa.int32(), nullable=False),
+        pa.field("block_index", pa.int32(), nullable=False),
+        pa.field("type", text, nullable=False),
+        pa.field("section", text),
+        pa.field("sub_section", text),
+        pa.field("text", text),
+        pa.field("description", text),
+        pa.field("confidence", pa.float64()),
+        pa.field("x0", coord),
+        pa.field("y0", coord),
+        pa.field("x1", coord),
+        pa.field("y1", coord),
+        pa.field("rows", pa.list_(pa.list_(text))),
+        pa.field("metadata", text),
+    ]
+    return pa.schema(fields, metadata={
+        "alltius.format": str(FORMAT_VERSION),
+        "alltius.pages": json.dumps(page_numbers),
+        "alltius.metadata": json.dumps(metadata, ensure_ascii=False),
+    })
+
+
+def _record_batches(pa, schema, pages: Sequence[PageResult]):
+    columns = [[] for _ in COLUMNS]
+    appenders = [c.append for c in columns]
+    for n, page in enumerate(pages, 1):
+        for row in block_rows(page):
+            for append, value in zip(appenders, row):
+                append(value)
+        if n % _BATCH_PAGES == 0 and columns[0]:
+            yield pa.record_batch([pa.array(c, type=f.type) for c, f in zip(columns, schema)], schema=schema)
+            for c in columns:
+                c.clear()
+    if columns[0] or not pages:
+        yield pa.record_batch([pa.array(c, type=f.type) for c, f in zip(columns, schema)], schema=schema)
+
+
+def save_columnar(result: ExtractionResult, output_path: str, fmt: str = "parquet", metrics=None) -> int:
+    # writes result as one row per block; returns the number of pages. Blocks are converted a batch of
+    # pages at a time, so a disk-backed result (memory-bounded run) is never loaded whole.
+    require_format(fmt)
+    from .metrics import NULL_METRICS
+    metrics = metrics or NULL_METRICS
+    with metrics.timer("serialize"):
+        pages = result.pages
+        page_numbers = [p.page_number for p in pages]
+        if fmt == "msgpack":
+            msgpack = _msgpack()
+            packer = msgpack.Packer(use_bin_type=True)
+            with open(output_path, "wb") as f:
+                # a header map, then one array per block in COLUMNS order
+                f.write(packer.pack({"format": _MSGPACK_FORMAT, "version": FORMAT_VERSION, "columns": list(COLUMNS),
+                                     "pages": page_numbers, "metadata": result.metadata}))
+                for page in pages:
+                    for row in block_rows(page):
+                        f.write(packer.pack(row))
+            return len(page_numbers)
+        pa = _pyarrow()
+        schema = _arrow_schema(pa, page_numbers, result.metadata)
+        if fmt == "parquet":
+            import pyarrow.parquet as pq
+            with pq.ParquetWriter(output_path, schema, compression="zstd") as writer:
+                for batch in _record_batches(pa, schema, pages):
+                    writer.write_batch(batch)
+        else:
+            with pa.OSFile(output_path, "wb") as sink, pa.ipc.new_file(sink, schema) as writer:
+                for batch in _record_batches(pa, schema, pages):
+                    writer.write_batch(batch)
+    return len(page_numbers)
+
+
+def _block(row: dict):
+    d = {
+        "type": row["type"],
+        "section": row["section"],
+        "sub_section": row["sub_section"],
+        "confidence": row["confidence"],
+        "metadata": json.loads(row["metadata"]) if row["metadata"] else None,
+        "text": row["text"] if row["text"] is not None else "",
+        "description": row["description"],
+        "table_data": row["rows"],
+        "extracted_data": row["rows"],
+    }
+    block = block_from_dict(d, row["page_number"])
+    if hasattr(block, "bbox") and row["x0"] is not None:
+        block.bbox = (row["x0"], row["y0"], row["x1"], row["y1"])
+    return block
+
+
+def _assemble(page_numbers: List[int], metadata: Optional[dict], rows) -> ExtractionResult:
+    pages = {n: PageResult(page_number=n) for n in page_numbers}
+    for row in rows:
+        page = pages.get(row["page_number"])
+        if page is None:
+            page = pages[row["page_number"]] = PageResult(page_number=row["page_number"])
+        page.content.append(_block(row))
+    return ExtractionResult(pages=list(pages.values()), metadata=metadata or {})
+
+
+def load_columnar(path: str) -> ExtractionResult:
+    # rebuilds an ExtractionResult (bboxes included) from any COLUMNAR_FORMATS file; the format is
+    # recognized from the file's magic bytes
+    with open(path, "rb") as f:
+        magic = f.read(6)
+    if magic[:4] == b"PAR1" or magic == b"ARROW1":
+        pa = _pyarrow()
+        if magic[:4] == b"PAR1":
+            import pyarrow.parquet as pq
+            table = pq.read_table(path)
+        else:
+            with pa.memory_map(path, "r") as source:
+                table = pa.ipc.open_file(source).read_all()
+        meta = {k.decode(): v.decode() for k, v in (table.schema.metadata or {}).items()}
+        if "alltius.pages" not in meta:
+            raise ValueError(f"{path} is not an extraction written by save_columnar")
+        rows = (row for batch in table.to_batches() for row in batch.to_pylist())
+        return _assemble(json.loads(meta["alltius.pages"]), json.loads(meta.get("alltius.metadata") or "{}"), rows)
+    msgpack = _msgpack()
+    with open(path, "rb") as f:
+        unpacker = msgpack.Unpacker(f, raw=False)
+        header = next(unpacker, None)
+        if not isinstance(header, dict) or header.get("format") != _MSGPACK_FORMAT:
+            raise ValueError(f"{path} is not an extraction written by save_columnar")
+        columns = header["columns"]
+        return _assemble(header["pages"], header.get("metadata"), (dict(zip(columns, row)) for row in unpacker))
@@ -1,6 +1,17 @@
 from __future__ import annotations
-from .models import ExtractionResult, ParagraphBlock, TableBlock, ChartBlock, FootnoteBlock
-from typing import List
+from .models import ExtractionResult, PageResult, ParagraphBlock, TableBlock, ChartBlock, FootnoteBlock
+from typing import IO, Iterable, List, Optional
+import io
+import json
+import math
+
+try:
+    import orjson  # optional: pretty JSON pages are encoded with it when installed (~5x faster)
+except ImportError:
+    orjson = None
+
+# json.dumps(..., ensure_ascii=False) string escaping (C-accelerated)
+_encode_str = json.encoder.encode_basestring
 
 def _render_table(table: List[List[str]]) -> str:
     if not table:
@@ -14,51 +25,270 @@ def _render_table(table: List[List[str]]) -> str:
         lines.append("| " + " | ".join(cell.strip() for cell in row) + " |")
     return "\n".join(lines)
 
-def to_markdown(result: ExtractionResult) -> str:
-    md_parts: List[str] = []
-    last_section = None
-    last_sub = None
-    for page in result.pages:
+class MarkdownWriter:
+    # Markdown written page by page to a text sink: one pass over each page's blocks (footnotes are
+    # collected on the way) and one write per page. Section state carries over between pages; the
+    # output is the same as to_markdown's, whose leading/trailing whitespace is trimmed, so trailing
+    # whitespace is held back until more text follows.
+    def __init__(self, fh: IO[str]):
+        self.fh = fh
+        self.last_section = None
+        self.last_sub = None
+        self._joined = False  # parts of earlier pages were emitted (pages are joined by a newline)
+        self._written = False  # text other than whitespace was written
+        self._held = ""
+
+    def _headings(self, parts: List[str], block) -> None:
+        if block.section and block.section != self.last_section:
+            parts.append(f"## {block.section}")
+            self.last_section = block.section
+            self.last_sub = None
+        if block.sub_section and block.sub_section != self.last_sub:
+            parts.append(f"### {block.sub_section}")
+            self.last_sub = block.sub_section
+
+    def write_page(self, page: PageResult) -> None:
+        parts: List[str] = []
+        footnotes = []
         for block in page.content:
             if isinstance(block, ParagraphBlock):
-                if block.section and block.section != last_section:
-                    md_parts.append(f"## {block.section}")
-                    last_section = block.section
-                    last_sub = None
-                if block.sub_section and block.sub_section != last_sub:
-                    md_parts.append(f"### {block.sub_section}")
-                    last_sub = block.sub_section
-                md_parts.append(block.text)
-                md_parts.append("")
+                self._headings(parts, block)
+                parts.append(block.text)
+                parts.append("")
             elif isinstance(block, TableBlock):
-                if block.section and block.section != last_section:
-                    md_parts.append(f"## {block.section}")
-                    last_section = block.section
-                    last_sub = None
-                if block.sub_section and block.sub_section != last_sub:
-                    md_parts.append(f"### {block.sub_section}")
-                    last_sub = block.sub_section
+                self._headings(parts, block)
                 if block.description:
-                    md_parts.append(f"_Table: {block.description}_")
-                md_parts.append(_render_table(block.table_data))
-                md_parts.append("")
+                    parts.append(f"_Table: {block.description}_")
+                parts.append(_render_table(block.table_data))
+                parts.append("")
             elif isinstance(block, ChartBlock):
-                if block.section and block.section != last_section:
-                    md_parts.append(f"## {block.section}")
-                    last_section = block.section
-                    last_sub = None
-                if block.sub_section and block.sub_section != last_sub:
-                    md_parts.append(f"### {block.sub_section}")
-                    last_sub = block.sub_section
-                desc = block.description or "Chart"
-                md_parts.append(f"> {desc}")
-                md_parts.append("")
+                self._headings(parts, block)
+                parts.append(f"> {block.description or 'Chart'}")
+                parts.append("")
             elif isinstance(block, FootnoteBlock):
-                pass
-        footnotes = [b for b in page.content if isinstance(b, FootnoteBlock)]
+                footnotes.append(block)
         if footnotes:
-            md_parts.append("#### Footnotes")
+            parts.append("#### Footnotes")
             for idx, fn in enumerate(footnotes, start=1):
-                md_parts.append(f"[{idx}] {fn.text}")
-            md_parts.append("")
-    return "\n".join(md_parts).strip() + "\n"
+                parts.append(f"[{idx}] {fn.text}")
+            parts.append("")
+        if not parts:
+            return
+        text = "\n".join(parts)
+        if self._joined:
+            text = "\n" + text
+        self._joined = True
+        if not self._written:
+            text = text.lstrip()
+        body = text.rstrip()
+        if body:
+            self.fh.write(self._held + body)
+            self._held = text[len(body):]
+            self._written = True
+        else:
+            self._held += text
+
+    def close(self) -> None:
+        self.fh.write("\n")
+
+
+class JsonWriter:
+    # {"pages": [...]} page by page; byte-identical to json.dump(result.to_dict(), ...) with the same
+    # pretty setting. metadata: document-level extras written after the pages
+    def __init__(self, fh: IO[str], pretty: bool = True, metadata: dict | None = None):
+        self.fh = fh
+        self.pretty = pretty
+        self.metadata = metadata
+        self.count = 0
+        fh.write('{\n  "pages": [' if pretty else '{"pages": [')
+
+    def write_page(self, page: PageResult) -> None:
+        if self.pretty:
+            self.fh.write(",\n    " if self.count else "\n    ")
+            self.fh.write(page_json(page, "\n    "))
+        else:
+            if self.count:
+                self.fh.write(", ")
+            self.fh.write(page_json(page, None))
+        self.count += 1
+
+    def close(self) -> None:
+        if self.pretty:
+            self.fh.write("\n  ]" if self.count else "]")
+            if self.metadata:
+                self.fh.write(',\n  "metadata": ' + json.dumps(self.metadata, indent=2, ensure_ascii=False).replace("\n", "\n  "))
+            self.fh.write("\n}")
+        else:
+            self.fh.write("]")
+            if self.metadata:
+                self.fh.write(', "metadata": ' + json.dumps(self.metadata, ensure_ascii=False))
+            self.fh.write("}")
+
+
+class NdjsonWriter:
+    # one JSON object per page and line; each page is written as soon as it is produced
+    def __init__(self, fh: IO[str]):
+        self.fh = fh
+
+    def write_page(self, page: PageResult) -> None:
+        self.fh.write(page_json(page, None))
+        self.fh.write("\n")
+
+    def close(self) -> None:
+        pass
+
+
+# text formats by name, for writer_for
+WRITERS = {"json": JsonWriter, "ndjson": NdjsonWriter, "markdown": MarkdownWriter}
+
+
+def writer_for(fmt: str, fh: IO[str], pretty: bool = True, metadata: dict | None = None):
+    if fmt == "json":
+        return JsonWriter(fh, pretty=pretty, metadata=metadata)
+    if fmt not in WRITERS:
+        raise ValueError(f"Unknown stream format: {fmt!r}")
+    return WRITERS[fmt](fh)
+
+
+def write_pages(pages: Iterable[PageResult], writers: List) -> int:
+    # one traversal of the pages feeding every writer (e.g. JSON and Markdown from the same run of
+    # iter_pages); each page is dropped once all writers have it. Writers are closed at the end.
+    count = 0
+    for page in pages:
+        for writer in writers:
+            writer.write_page(page)
+        count += 1
+    for writer in writers:
+        writer.close()
+    return count
+
+
+def to_markdown(result: ExtractionResult) -> str:
+    buf = io.StringIO()
+    write_pages(result.pages, [MarkdownWriter(buf)])
+    return buf.getvalue()
+
+
+def _value(v, nl: Optional[str]) -> str:
+    # any JSON value as json.dumps writes it; nl is the newline + indent of the value's line (None: compact)
+    if v is None:
+        return "null"
+    if type(v) is str:
+        return _encode_str(v)
+    if type(v) is float and math.isfinite(v):
+        return float.__repr__(v)
+    if nl is None:
+        return json.dumps(v, ensure_ascii=False)
+    return json.dumps(v, indent=2, ensure_ascii=False).replace("\n", nl)
+
+
+def _rows(rows, nl: Optional[str]) -> str:
+    # table_data / extracted_data: a list of rows of string cells
+    if rows is None:
+        return "null"
+    if type(rows) is not list or not all(type(row) is list and all(type(c) is str for c in row) for row in rows):
+        return _value(rows, nl)
+    if nl is None:
+        return "[" + ", ".join("[" + ", ".join(map(_encode_str, row)) + "]" for row in rows) + "]"
+    if not rows:
+        return "[]"
+    row_nl = nl + "  "
+    cell_nl = row_nl + "  "
+    cell_sep = "," + cell_nl
+    encoded = ["[" + cell_nl + cell_sep.join(map(_encode_str, row)) + row_nl + "]" if row else "[]" for row in rows]
+    return "[" + row_nl + ("," + row_nl).join(encoded) + nl + "]"
+
+
+def _block_json(b, nl: Optional[str]) -> str:
+    # same members, order and formatting as json.dumps(block_to_dict(b)), without building the dict
+    inner = None if nl is None else nl + "  "
+    members = [
+        '"type": ' + _encode_str(b.type),
+        '"section": ' + (_encode_str(b.section) if type(b.section) is str else _value(b.section, inner)),
+        '"sub_section": ' + (_encode_str(b.sub_section) if type(b.sub_section) is str else _value(b.sub_section, inner)),
+    ]
+    if isinstance(b, (ParagraphBlock, FootnoteBlock)):
+        members.append('"text": ' + (_encode_str(b.text) if type(b.text) is str else _value(b.text, inner)))
+    elif isinstance(b, TableBlock):
+        members.append('"table_data": ' + _rows(b.table_data, inner))
+        members.append('"description": ' + _value(b.description, inner))
+    elif isinstance(b, ChartBlock):
+        members.append('"description": ' + _value(b.description, inner))
+        members.append('"extracted_data": ' + _rows(b.extracted_data, inner))
+    if b.confidence is not None:
+        members.append('"confidence": ' + _value(b.confidence, inner))
+    if b._metadata:
+        members.append('"metadata": ' + _value(b._metadata, inner))
+    if nl is None:
+        return "{" + ", ".join(members) + "}"
+    return "{" + inner + ("," + inner).join(members) + nl + "}"
+
+
+def _orjson_safe(v) -> bool:
+    # values orjson writes exactly like json.dumps; it differs on NaN/Infinity, integers beyond 64 bits
+    # and exponent notation of floats (and rejects lone surrogates, which the caller catches)
+    t = type(v)
+    if v is None or t is str or t is bool:
+        return True
+    if t is int:
+        return -2**63 <= v < 2**64
+    if t is float:
+        return v == 0 or 1e-4 <= abs(v) < 1e16
+    if t is list:
+        return all(map(_orjson_safe, v))
+    if t is dict:
+        return all(type(k) is str and _orjson_safe(x) for k, x in v.items())
+    return False
+
+
+def _orjson_page(page: PageResult, nl: str) -> Optional[str]:
+    # the indent=2 page through orjson (its OPT_INDENT_2 layout matches json's), or None when the page
+    # holds a value it would write differently
+    if type(page.page_number) is not int:
+        return None
+    for b in page.content:
+        if b.confidence is not None and not _orjson_safe(b.confidence):
+            return None
+        if b._metadata and not _orjson_safe(b._metadata):
+            return None
+        rows = getattr(b, "table_data", None) or getattr(b, "extracted_data", None)
+        if rows and not _orjson_safe(rows):
+            return None
+    try:
+        text = orjson.dumps(page.to_dict(), option=orjson.OPT_INDENT_2).decode("utf-8")
+    except TypeError:  # lone surrogates in extracted text
+        return None
+    return text if nl == "\n" else text.replace("\n", nl)
+
+
+def page_json(page: PageResult, nl: Optional[str] = "\n") -> str:
+    # json.dumps(page.to_dict(), indent=2, ensure_ascii=False) with every newline followed by the
+    # indent in `nl` (compact json.dumps(page.to_dict(), ensure_ascii=False) when nl is None),
+    # written straight from the blocks: no intermediate dicts and no generic encoder walk
+    if nl is not None and orjson is not None:
+        text = _orjson_page(page, nl)
+        if text is not None:
+            return text
+    if nl is None:
+        return '{"page_number": ' + _value(page.page_number, None) + ', "content": [' + ", ".join(_block_json(b, None) for b in page.content) + "]}"
+    inner = nl + "  "
+    if page.content:
+        block_nl = inner + "  "
+        content = "[" + block_nl + ("," + block_nl).join(_block_json(b, block_nl) for b in page.content) + inner + "]"
+    else:
+        content = "[]"
+    return "{" + inner + '"page_number": ' + _value(page.page_number, inner) + "," + inner + '"content": ' + content + nl + "}"
+
+
+def write_ndjson(pages: Iterable[PageResult], fh: IO[str]) -> int:
+    return write_pages(pages, [NdjsonWriter(fh)])
+
+
+def write_markdown(pages: Iterable[PageResult], fh: IO[str]) -> int:
+    # to_markdown for a stream of pages, without holding the document as one string
+    return write_pages(pages, [MarkdownWriter(fh)])
+
+
+def write_json_stream(pages: Iterable[PageResult], fh: IO[str], pretty: bool = True, metadata: dict | None = None) -> int:
+    # writes {"pages": [...]} without ever holding the whole document
+    return write_pages(pages, [JsonWriter(fh, pretty=pretty, metadata=metadata)])
@@ -1,9 +1,80 @@
 from __future__ import annotations
+from bisect import bisect_right
+from collections import Counter
+from dataclasses import dataclass
+from functools import lru_cache
 from typing import List, Tuple, Optional
 import re
 
 
-def detect_headings(page_dict: dict, min_ratio: float = 1.15) -> List[Tuple[str, Tuple[float,float,float,float], float]]:
+def _body_size(sizes, document_body_size: Optional[float] = None) -> float:
+    # most common non-blank span size; when every size occurs once (title, figure and closing pages)
+    # the document's body size, or the page median without one
+    counter = Counter(sizes)
+    body_size, body_freq = counter.most_common(1)[0]
+    if body_freq == 1:
+        if callable(document_body_size):
+            document_body_size = document_body_size()
+        if document_body_size is not None:
+            return document_body_size
+        sizes_sorted = sorted(sizes)
+        body_size = sizes_sorted[len(sizes_sorted)//2]
+    return body_size
+
+
+@dataclass(frozen=True)
+class FontProfile:
+    # document-wide typography from an evenly spaced sample of pages: the body size carrying the most
+    # text, the distinct sizes at or above the heading threshold (largest first) and the share of each
+    # tier's characters set in bold. Pages keep their own body size when they have one (documents mix
+    # e.g. 6pt table pages with 10pt prose); the profile replaces the median guess on pages where every
+    # size occurs once. Only the body size feeds heading detection: the tiers are by construction the
+    # sampled sizes above the threshold, and the bold shares are reported (stats, debug log) for tuning
+    # the ratio, not used to classify lines.
+    body_size: float
+    heading_sizes: Tuple[float, ...] = ()
+    heading_bold: Tuple[float, ...] = ()  # per heading_sizes entry, 0.0-1.0
+    pages_sampled: int = 0
+
+
+PROFILE_SAMPLE_PAGES = 48
+_BOLD = 16  # PyMuPDF span flag
+
+
+def profile_sample(page_count: int, sample: int = PROFILE_SAMPLE_PAGES) -> List[int]:
+    # page indices read for the font profile: every page of short documents, evenly spaced otherwise
+    if page_count <= sample:
+        return list(range(page_count))
+    step = page_count / sample
+    return sorted({int(i * step) for i in range(sample)})
+
+
+def font_profile(pages, min_ratio: float = 1.15) -> Optional[FontProfile]:
+    # pages: page_text.PageSpans of the sampled pages. Sizes are weighted by characters, so a page
+    # with one title and two captions cannot outvote the running text. None when there is no text.
+    chars = Counter()
+    bold = Counter()
+    sampled = 0
+    for spans in pages:
+        sampled += 1
+        for text, size, flags in zip(spans.span_text, spans.span_size, spans.span_flags):
+            n = len(text.strip())
+            if n:
+                size = round(size, 2)
+                chars[size] += n
+                if flags & _BOLD:
+                    bold[size] += n
+    if not chars:
+        return None
+    body_size = chars.most_common(1)[0][0]
+    threshold = body_size * min_ratio
+    tiers = tuple(sorted((s for s in chars if s >= threshold), reverse=True))
+    return FontProfile(body_size, tiers, tuple(round(bold[s] / chars[s], 3) for s in tiers), sampled)
+
+
+def detect_headings(page_dict: dict, min_ratio: float = 1.15, document_body_size: Optional[float] = None) -> List[Tuple[str, Tuple[float,float,float,float], float]]:
+    # document_body_size: FontProfile.body_size (or a callable returning it, called only when needed),
+    # used on pages too sparse for their own statistics
     spans = []
     for block in page_dict.get("blocks", []):
         for line in block.get("lines", []):
@@ -14,12 +85,7 @@ def detect_headings(page_dict: dict, min_ratio: float = 1.15) -> List[Tuple[str,
                 spans.append(span.get("size", 0))
     if not spans:
         return []
-    from collections import Counter
-    counter = Counter(spans)
-    body_size, body_freq = counter.most_common(1)[0]
-    if body_freq == 1:
-        spans_sorted = sorted(spans)
-        body_size = spans_sorted[len(spans_sorted)//2]
+    body_size = _body_size(spans, document_body_size)
     threshold = body_size * min_ratio
 
     headings: List[Tuple[str, Tuple[float,float,float,float], float]] = []
@@ -47,53 +113,200 @@ def detect_headings(page_dict: dict, min_ratio: float = 1.15) -> List[Tuple[str,
     return headings
 
 
-def assign_sections(paragraphs: List[Tuple[str, int, Tuple[float,float,float,float]]], headings_per_page: dict) -> List[Tuple[str, Optional[str], Optional[str]]]:
-    results = []
-    last_section = None
-    last_subsection = None
-    for text, page, bbox in paragraphs:
-        y_top = bbox[1] if bbox else 0
-        candidates = []
-        for h_text, h_bbox in headings_per_page.get(page, []):
-            if h_bbox and h_bbox[1] <= y_top:
-                candidates.append((h_text, h_bbox))
+def detect_headings_in_spans(spans, min_ratio: float = 1.15, document_body_size: Optional[float] = None) -> List[Tuple[str, Tuple[float,float,float,float], float]]:
+    # same rules as detect_headings, over the column arrays of page_text.PageSpans
+    if not spans.sizes:
+        return []
+    body_size = _body_size(spans.sizes, document_body_size)
+    threshold = body_size * min_ratio
+    headings: List[Tuple[str, Tuple[float,float,float,float], float]] = []
+    span_text = spans.span_text
+    for i in range(spans.line_count):
+        head = spans.line_head[i]
+        if head < 0:
+            continue
+        max_size = spans.line_max_size[i]
+        if max_size >= threshold:
+            text_line = " ".join(t.strip() for t in span_text[head:spans.line_end[i]] if t.strip())
+            confidence = (max_size / body_size) if body_size else 1.0
+            headings.append((text_line, spans.span_bbox(head), round(confidence, 3)))
+    return headings
+
+
+def outline_by_page(toc) -> dict:
+    # doc.get_toc(simple=False) -> {page_number: [(level, title, y or None)]} in outline order;
+    # y is the bookmark's target position (top-left origin) when the entry has one
+    pages = {}
+    for entry in toc:
+        level, title, page_number = entry[0], entry[1], entry[2]
+        if page_number < 1 or not title.strip():
+            continue
+        dest = entry[3] if len(entry) > 3 and isinstance(entry[3], dict) else {}
+        to = dest.get("to")
+        pages.setdefault(page_number, []).append((level, title.strip(), float(to.y) if to is not None else None))
+    return pages
+
+
+def _norm(text: str) -> str:
+    return " ".join(text.split()).casefold()
+
+
+def outline_headings(spans, entries) -> List[Tuple[str, Tuple[float,float,float,float], int]]:
+    # Places a page's outline entries on its text lines: (title, bbox, level). Titles are looked up
+    # verbatim first (one set probe per line); only titles that miss get the normalized index, and
+    # titles wrapped over several lines or with extra numbering a prefix match. Unmatched entries
+    # sit at the bookmark target (or the page top).
+    if not entries:
+        return []
+    exact = {}
+    wanted = {title for _level, title, _y in entries}
+    for i, text in enumerate(spans.line_text):
+        if text in wanted:
+            exact.setdefault(text, []).append(i)
+    normalized = None
+    used = set()
+    headings = []
+    for level, title, y in entries:
+        candidates = [i for i in exact.get(title, ()) if i not in used]
+        if not candidates:
+            if normalized is None:
+                normalized = {}
+                for i, text in enumerate(spans.line_text):
+                    key = _norm(text)
+                    if key:
+                        normalized.setdefault(key, []).append(i)
+            key = _norm(title)
+            candidates = [i for i in normalized.get(key, ()) if i not in used]
+            if not candidates:
+                candidates = [i for i in range(spans.line_count) if i not in used and _prefix_match(key, _norm(spans.line_text[i]))]
         if candidates:
-            candidates.sort(key=lambda x: x[1][1])  # ascending y
-            level_map = {}  # level -> text
-            last_plain = None
-            for h_text, _hb in candidates:
-                m = re.match(r"^(\d+(?:\.\d+)*)\s+(.+)$", h_text)
-                if m:
-                    numbering = m.group(1)
-                    level = numbering.count('.') + 1
-                    level_map[level] = h_text
-                else:
-                    last_plain = h_text
-            # Determine section/subsection
-            if level_map:
-                # section is level 1 if present
-                last_section = level_map.get(1, last_section)
-                # sub_section is highest level >1 if exists
-                deeper_levels = [lvl for lvl in level_map.keys() if lvl > 1]
-                if deeper_levels:
-                    top_deep = max(deeper_levels)
-                    last_subsection = level_map[top_deep]
-                else:
-                    last_subsection = None
-                if last_plain and last_section:
-                    if last_plain != last_section:
-                        last_subsection = last_plain
-                elif last_plain and not level_map.get(1):
-                    if last_section is None:
-                        last_section = last_plain
-                    else:
-                        last_subsection = last_plain
+            # several matching lines (e.g. a running header repeating the title): prefer the bookmark target
+            line = min(candidates, key=lambda i: abs(spans.line_y0[i] - y)) if y is not None else candidates[0]
+            used.add(line)
+            headings.append((title, spans.line_bbox(line), level))
+        else:
+            top = y if y is not None else 0.0
+            headings.append((title, (0.0, top, 0.0, top), level))
+    return headings
+
+
+# leading numbering an outline title may carry on the page but not in the bookmark (or vice versa)
+_LABEL_PREFIX_RE = re.compile(r"^(?:\d+(?:\.\d+)*\.?|[ivxlc]+\.|[a-z]\)|(?:chapter|section|part|appendix) [\w.]+:?)\s+")
+
+
+def _prefix_match(title: str, line: str) -> bool:
+    if not title or not line:
+        return False
+    if _LABEL_PREFIX_RE.sub("", line) == _LABEL_PREFIX_RE.sub("", title):
+        return True
+    # first line of a title wrapped over several lines
+    return len(line) >= min(len(title), 12) and title.startswith(line)
+
+
+_NUMBERED_HEADING_RE = re.compile(r"^(\d+(?:\.\d+)*)\s+(.+)$")
+
+
+@lru_cache(maxsize=4096)
+def heading_level(text: str) -> Optional[int]:
+    # numbering depth of "2.3 Title" style headings (1 for "2 Title"); None for plain headings,
+    # which includes "1. Title" (the dot is not followed by another number)
+    m = _NUMBERED_HEADING_RE.match(text)
+    if not m:
+        return None
+    return m.group(1).count('.') + 1
+
+
+class _PageHeadingIndex:
+    # Headings of one page sorted by y, with the section-relevant summary of every prefix
+    # precomputed, so a paragraph is resolved with one bisect instead of rescanning headings.
+    # Headings are (text, bbox) or (text, bbox, level): an int level (outline entries) is used
+    # as-is instead of parsing the text's numbering; a float third element is a font confidence.
+    __slots__ = ("ys", "prefix")
+
+    def __init__(self, headings):
+        ordered = sorted((h for h in headings if h[1]), key=lambda h: h[1][1])  # stable, ascending y
+        self.ys = [h[1][1] for h in ordered]
+        self.prefix = []  # for the first k+1 headings: (level-1 text, any numbered, deepest text, last plain)
+        level_map = {}
+        max_deep = None
+        last_plain = None
+        for h in ordered:
+            h_text = h[0]
+            level = h[2] if len(h) > 2 and isinstance(h[2], int) else heading_level(h_text)
+            if level is not None:
+                level_map[level] = h_text
+                if level > 1 and (max_deep is None or level > max_deep):
+                    max_deep = level
             else:
-                if last_plain:
-                    if last_section is None:
-                        last_section = last_plain
-                        last_subsection = None
-                    else:
-                        last_subsection = last_plain
-        results.append((text, last_section, last_subsection))
-    return results
+                last_plain = h_text
+            deepest = level_map[max_deep] if max_deep is not None else None
+            self.prefix.append((level_map.get(1), bool(level_map), deepest, last_plain))
+
+    def state_at(self, y_top: float):
+        k = bisect_right(self.ys, y_top)
+        return self.prefix[k - 1] if k else None
+
+
+class SectionTracker:
+    # Section/sub_section state carried across calls, so pages can be assigned one at a time
+    # (streaming) with the same result as one call over the whole document.
+    def __init__(self, last_section: Optional[str] = None, last_subsection: Optional[str] = None):
+        self.last_section = last_section
+        self.last_subsection = last_subsection
+
+    def assign(self, paragraphs: List[Tuple[str, int, Tuple[float,float,float,float]]], headings_per_page: dict) -> List[Tuple[str, Optional[str], Optional[str]]]:
+        results = []
+        last_section = self.last_section
+        last_subsection = self.last_subsection
+        indexes = {}
+        for text, page, bbox in paragraphs:
+            index = indexes.get(page)
+            if index is None:
+                index = indexes[page] = _PageHeadingIndex(headings_per_page.get(page, []))
+            state = index.state_at(bbox[1] if bbox else 0)
+            if state is not None:
+                level1, numbered, deepest, last_plain = state
+                # Determine section/subsection
+                if numbered:
+                    # section is level 1 if present
+                    if level1 is not None:
+                        last_section = level1
+                    # sub_section is highest level >1 if exists
+                    last_subsection = deepest
+                    if last_plain and last_section:
+                        if last_plain != last_section:
+                            last_subsection = last_plain
+                    elif last_plain and not level1:
+                        if last_section is None:
+                            last_section = last_plain
+                        else:
+                            last_subsection = last_plain
+                else:
+                    if last_plain:
+                        if last_section is None:
+                            last_section = last_plain
+                            last_subsection = None
+                        else:
+                            last_subsection = last_plain
+            results.append((text, last_section, last_subsection))
+        self.last_section = last_section
+        self.last_subsection = last_subsection
+        return results
+
+
+def resets_section_state(paragraphs, headings) -> bool:
+    # True if assigning this page's paragraphs passes a point where the tracker state no longer depends
+    # on earlier pages (a paragraph below a numbered level-1 heading overwrites both fields). Replaying
+    # pages from the last such page on reproduces the state of a full replay from the first page.
+    index = _PageHeadingIndex(headings)
+    if not index.ys:
+        return False
+    for _text, _page, bbox in paragraphs:
+        state = index.state_at(bbox[1] if bbox else 0)
+        if state is not None and state[1] and state[0] is not None:
+            return True
+    return False
+
+
+def assign_sections(paragraphs: List[Tuple[str, int, Tuple[float,float,float,float]]], headings_per_page: dict) -> List[Tuple[str, Optional[str], Optional[str]]]:
+    return SectionTracker().assign(paragraphs, headings_per_page)
@@ -0,0 +1,174 @@
+from __future__ import annotations
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+import copy
+import hashlib
+import json
+import re
+
+from .models import ExtractionResult, PageResult
+
+# Page fingerprints stored with an extraction (result.metadata["fingerprints"]) so a revised PDF can be
+# re-extracted incrementally. A page's output depends only on its own content, the section state it is
+# entered with and the document-level options; a page whose fingerprint and entry state both match a
+# page of the previous extraction takes over that page's blocks, everything else is extracted again.
+FINGERPRINT_FORMAT = 1
+
+State = Tuple[Optional[str], Optional[str]]  # (section, sub_section) entering / leaving a page
+# block metadata written by the extractor itself; other keys come from plugins
+EXTRACTOR_METADATA = frozenset({"source", "images"})
+_REF = re.compile(rb"\d+ 0 R")
+
+
+@dataclass
+class PageRecord:
+    fingerprint: str
+    entry: State
+    exit: State
+
+
+@dataclass
+class Fingerprints:
+    context: str  # digest of the output-affecting options; a different context reuses nothing
+    body_size: Optional[float] = None  # document body size used on sparse pages, if it was computed
+    pages: List[PageRecord] = field(default_factory=list)
+    plugins: List[str] = field(default_factory=list)  # plugins run on the stored blocks after extraction
+
+    def to_dict(self) -> dict:
+        data = {
+            "format": FINGERPRINT_FORMAT,
+            "context": self.context,
+            "body_size": self.body_size,
+            "pages": [[r.fingerprint, *r.entry, *r.exit] for r in self.pages],
+        }
+        if self.plugins:
+            data["plugins"] = self.plugins
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Fingerprints":
+        if data.get("format") != FINGERPRINT_FORMAT:
+            raise ValueError(f"Unsupported fingerprint format {data.get('format')!r}")
+        pages = [PageRecord(p[0], (p[1], p[2]), (p[3], p[4])) for p in data["pages"]]
+        return cls(data["context"], data.get("body_size"), pages, list(data.get("plugins", [])))
+
+
+def context_key(options: dict) -> str:
+    payload = json.dumps({"format": FINGERPRINT_FORMAT, **options}, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+
+
+def _digest(data: bytes) -> bytes:
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+
+def _font_digest(doc, xref: int) -> bytes:
+    # the font dictionary (object numbers dropped, they change when a PDF is regenerated) and its
+    # ToUnicode map, which decides the extracted text
+    h = hashlib.blake2b(_REF.sub(b"R", doc.xref_object(xref, compressed=True).encode("latin-1", "replace")), digest_size=16)
+    kind, value = doc.xref_get_key(xref, "ToUnicode")
+    if kind == "xref":
+        h.update(doc.xref_stream(int(value.split()[0])) or b"")
+    return h.digest()
+
+
+def page_fingerprint(doc, page, outline_entries=None, digests: Optional[Dict[tuple, bytes]] = None) -> str:
+    # content streams + geometry + the fonts, images and form XObjects they reference (by content, not
+    # object number) + the page's outline entries. digests caches resource digests across pages.
+    digests = {} if digests is None else digests
+    h = hashlib.blake2b(digest_size=16)
+    h.update(repr((tuple(page.rect), tuple(page.cropbox), page.rotation)).encode())
+    h.update(page.read_contents())
+    for xref, _ext, ftype, basefont, name, encoding, *_ in page.get_fonts(full=True):
+        key = ("font", xref)
+        if key not in digests:
+            digests[key] = _font_digest(doc, xref)
+        h.update(repr((ftype, basefont, name, encoding)).encode())
+        h.update(digests[key])
+    for xref, _smask, width, height, bpc, colorspace, _alt, name, *_ in page.get_images(full=True):
+        key = ("stream", xref)
+        if key not in digests:
+            digests[key] = _digest(doc.xref_stream_raw(xref) or b"")
+        h.update(repr((width, height, bpc, colorspace, name)).encode())
+        h.update(digests[key])
+    for xref, name, *_ in page.get_xobjects():
+        key = ("stream", xref)
+        if key not in digests:
+            digests[key] = _digest(doc.xref_stream_raw(xref) or b"")
+        h.update(name.encode())
+        h.update(digests[key])
+    if outline_entries:
+        h.update(repr(outline_entries).encode())
+    return h.hexdigest()
+
+
+def document_fingerprints(doc, outline: Optional[dict] = None) -> List[str]:
+    digests: Dict[tuple, bytes] = {}
+    return [page_fingerprint(doc, page, outline.get(page.number + 1) if outline else None, digests) for page in doc]
+
+
+def _copied(block, page_number: int, plugins: bool):
+    # a reused block for page `page_number`; plugins: drop metadata added by plugins (the caller runs
+    # its own plugins on the result, as after a full extraction)
+    block = copy.copy(block)
+    block.page_number = page_number
+    if block._metadata:
+        if plugins:
+            block._metadata = {k: v for k, v in block._metadata.items() if k in EXTRACTOR_METADATA} or None
+        else:
+            block._metadata = dict(block._metadata)
+    return block
+
+
+@dataclass
+class ReusePlan:
+    # previous pages whose content matches a page of the new document, by new page index
+    previous: Fingerprints
+    pages: Sequence[PageResult]
+    candidates: Dict[int, List[int]]  # new index -> previous indices with the same fingerprint
+    reused: int = 0
+    taken: set = field(default_factory=set)  # previous indices already handed out
+    resynced: int = 0  # unchanged pages extracted again because they were entered in a new section state
+
+    @classmethod
+    def build(cls, previous: ExtractionResult, fingerprints: List[str], context: str) -> Optional["ReusePlan"]:
+        # None when nothing can be reused (no stored fingerprints or different options)
+        data = previous.metadata.get("fingerprints")
+        if not data:
+            raise ValueError("The previous extraction has no page fingerprints (extract it with fingerprints=True)")
+        stored = Fingerprints.from_dict(data)
+        if stored.context != context or len(previous.pages) != len(stored.pages):
+            return None
+        by_print: Dict[str, List[int]] = {}
+        for i, record in enumerate(stored.pages):
+            by_print.setdefault(record.fingerprint, []).append(i)
+        candidates = {}
+        for i, fp in enumerate(fingerprints):
+            matches = by_print.get(fp)
+            if matches:
+                # the page at the same position first, then moved copies
+                candidates[i] = sorted(matches, key=lambda j: j != i)
+        return cls(stored, previous.pages, candidates)
+
+    def unchanged(self, indices: Sequence[int], page_count: int) -> bool:
+        # True when every page in `indices` sits where it was, in a document of the same length
+        return len(self.previous.pages) == page_count and all(i in self.candidates and self.candidates[i][0] == i for i in indices)
+
+    def take(self, index: int, entry: State) -> Optional[Tuple[PageResult, State]]:
+        # the previous page for new index `index` if one was entered in state `entry`: (page, exit state).
+        # Its blocks are taken over as they are; a moved or duplicated page gets renumbered copies, and
+        # blocks that went through plugins are copied without the plugins' metadata.
+        for j in self.candidates.get(index, ()):
+            record = self.previous.pages[j]
+            if record.entry != entry:
+                continue
+            content = self.pages[j].content
+            if j != index or j in self.taken or self.previous.plugins:
+                content = [_copied(b, index + 1, bool(self.previous.plugins)) for b in content]
+            self.taken.add(j)
+            self.reused += 1
+            page = PageResult(page_number=index + 1, content=content)
+            return page, record.exit
+        if index in self.candidates:
+            self.resynced += 1
+        return None
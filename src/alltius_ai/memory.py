@@ -0,0 +1,88 @@
+from __future__ import annotations
+from collections.abc import Sequence
+from typing import List, Optional
+import os
+import pickle
+import sys
+import tempfile
+
+from .models import PageResult
+
+
+def peak_rss_mb() -> float:
+    # high-water mark of this process's resident set size
+    try:
+        import resource
+    except ImportError:  # Windows
+        return 0.0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024  # bytes on macOS, KiB elsewhere
+
+
+def rss_mb() -> float:
+    # current resident set size (Linux /proc); the peak where that is unavailable
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        return peak_rss_mb()
+
+
+class PageStore(Sequence):
+    # Finished pages of a memory-bounded extraction. Pages are held in memory until the process RSS
+    # exceeds budget_mb; from then on every page (including the ones already held) is pickled to an
+    # anonymous temporary file and read back on access, so the result costs a file offset per page.
+    def __init__(self, budget_mb: float, directory: Optional[str] = None):
+        self.budget_mb = budget_mb
+        self.directory = directory
+        self._pages: List[PageResult] = []
+        self._offsets: List[int] = []
+        self._file = None
+
+    @property
+    def spilled(self) -> int:
+        return len(self._offsets)
+
+    def append(self, page: PageResult) -> None:
+        if self._file is None and rss_mb() > self.budget_mb:
+            self._file = tempfile.TemporaryFile(prefix="alltius-pages-", dir=self.directory)
+            held, self._pages = self._pages, []
+            for p in held:
+                self._write(p)
+        if self._file is None:
+            self._pages.append(page)
+        else:
+            self._write(page)
+
+    def _write(self, page: PageResult) -> None:
+        self._file.seek(0, os.SEEK_END)
+        self._offsets.append(self._file.tell())
+        pickle.dump(page, self._file, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def _read(self, offset: int) -> PageResult:
+        self._file.seek(offset)
+        return pickle.load(self._file)
+
+    def __len__(self) -> int:
+        return len(self._pages) + len(self._offsets)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if self._file is None:
+            return self._pages[index]
+        return self._read(self._offsets[index])
+
+    def __iter__(self):
+        if self._file is None:
+            yield from self._pages
+            return
+        for offset in self._offsets:
+            yield self._read(offset)
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self._offsets = []
+        self._pages = []
@@ -0,0 +1,122 @@
+from __future__ import annotations
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, Optional
+import math
+import re
+import time
+
+# Stage timers and counters for the extraction hot path. Pipeline code always talks to a
+# metrics object; when instrumentation is off it is NULL_METRICS, whose methods do nothing,
+# and per-page bookkeeping that would cost more than a call is guarded by `metrics.enabled`.
+
+Listener = Callable[[str, str, float], None]  # (kind: "time" | "count", name, value)
+
+
+class Metrics:
+    enabled = True
+
+    def __init__(self, listener: Optional[Listener] = None):
+        # listener: optional tracing callback, called for every recorded timing and count
+        self.timers: Dict[str, list] = {}  # name -> [total seconds, observations, max seconds]
+        self.counters: Dict[str, float] = {}
+        self.listener = listener
+
+    def add_time(self, name: str, seconds: float) -> None:
+        t = self.timers.get(name)
+        if t is None:
+            self.timers[name] = [seconds, 1, seconds]
+        else:
+            t[0] += seconds
+            t[1] += 1
+            if seconds > t[2]:
+                t[2] = seconds
+        if self.listener is not None:
+            self.listener("time", name, seconds)
+
+    def incr(self, name: str, value: float = 1) -> None:
+        self.counters[name] = self.counters.get(name, 0) + value
+        if self.listener is not None:
+            self.listener("count", name, value)
+
+    @contextmanager
+    def timer(self, name: str) -> Iterator[None]:
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - t0)
+
+    def seconds(self, name: str) -> float:
+        t = self.timers.get(name)
+        return t[0] if t else 0.0
+
+    def merge(self, other: "Metrics") -> None:
+        for name, (total, count, longest) in other.timers.items():
+            t = self.timers.setdefault(name, [0.0, 0, 0.0])
+            t[0] += total
+            t[1] += count
+            t[2] = max(t[2], longest)
+        for name, value in other.counters.items():
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def to_dict(self) -> dict:
+        return {
+            "timers": {name: {"seconds": round(total, 6), "count": count, "max_seconds": round(longest, 6)}
+                       for name, (total, count, longest) in sorted(self.timers.items())},
+            "counters": dict(sorted(self.counters.items())),
+        }
+
+    def to_prometheus(self, prefix: str = "alltius") -> str:
+        # Prometheus text exposition format: stage timers as summaries labelled by stage, counters as totals
+        lines = []
+        if self.timers:
+            name = f"{prefix}_stage_seconds"
+            lines.append(f"# HELP {name} Wall time spent per extraction stage.")
+            lines.append(f"# TYPE {name} summary")
+            for stage, (total, count, _longest) in sorted(self.timers.items()):
+                lines.append(f'{name}_sum{{stage="{stage}"}} {total:.6f}')
+                lines.append(f'{name}_count{{stage="{stage}"}} {count}')
+            name = f"{prefix}_stage_max_seconds"
+            lines.append(f"# HELP {name} Longest single observation per extraction stage.")
+            lines.append(f"# TYPE {name} gauge")
+            for stage, (_total, _count, longest) in sorted(self.timers.items()):
+                lines.append(f'{name}{{stage="{stage}"}} {longest:.6f}')
+        for counter, value in sorted(self.counters.items()):
+            name = f"{prefix}_{_metric_name(counter)}_total"
+            lines.append(f"# TYPE {name} counter")
+            lines.append(f"{name} {_sample(value)}")
+        return "\n".join(lines) + "\n" if lines else ""
+
+
+def _sample(value) -> str:
+    # exact: {:g} would round counters past 1e6 to six significant digits
+    if isinstance(value, int) or (math.isfinite(value) and value == int(value)):
+        return str(int(value))
+    return repr(float(value))
+
+
+def _metric_name(name: str) -> str:
+    return re.sub(r"[^a-zA-Z0-9_]", "_", name)
+
+
+class _NullMetrics(Metrics):
+    enabled = False
+
+    def __init__(self):
+        super().__init__()
+
+    def add_time(self, name: str, seconds: float) -> None:
+        pass
+
+    def incr(self, name: str, value: float = 1) -> None:
+        pass
+
+    @contextmanager
+    def timer(self, name: str) -> Iterator[None]:
+        yield
+
+    def merge(self, other: "Metrics") -> None:
+        pass
+
+
+NULL_METRICS = _NullMetrics()
@@ -1,78 +1,135 @@
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, InitVar
 from typing import List, Optional, Literal, Union, Any
 
 BlockType = Literal["paragraph", "table", "chart", "footnote"]
 
-@dataclass
+# Blocks are slotted (no per-instance __dict__) and create their metadata dict only when it is first
+# used: a large document holds hundreds of thousands of them, nearly all without metadata.
+@dataclass(slots=True)
 class ContentBlock:
     type: BlockType
     page_number: int
     section: Optional[str] = None
     sub_section: Optional[str] = None
     confidence: Optional[float] = None  # block-level extraction / classification confidence
-    metadata: dict = field(default_factory=dict)
+    metadata: InitVar[Optional[dict]] = None  # accepted by the constructor; stored in _metadata
+    _metadata: Optional[dict] = field(default=None, init=False, repr=False)
 
-@dataclass
+    def __post_init__(self, metadata):
+        if metadata:
+            self._metadata = metadata
+
+
+def _get_metadata(self) -> dict:
+    if self._metadata is None:
+        self._metadata = {}
+    return self._metadata
+
+
+def _set_metadata(self, value: dict) -> None:
+    self._metadata = value
+
+
+# set after the class is built: a property in the class body would become the InitVar's default
+ContentBlock.metadata = property(_get_metadata, _set_metadata)
+
+@dataclass(slots=True)
 class ParagraphBlock(ContentBlock):
     text: str = ""
     bbox: tuple | None = None  # (x0,y0,x1,y1) not serialized
 
-@dataclass
+@dataclass(slots=True)
 class TableBlock(ContentBlock):
     table_data: List[List[str]] = field(default_factory=list)
     description: Optional[str] = None
     bbox: tuple | None = None  # not serialized
 
-@dataclass
+@dataclass(slots=True)
 class ChartBlock(ContentBlock):
     description: Optional[str] = None
     extracted_data: Optional[List[List[str]]] = None  # heuristic table extracted from chart if any OCR pass
 
-@dataclass
+@dataclass(slots=True)
 class FootnoteBlock(ContentBlock):
     text: str = ""
 
 Block = Union[ParagraphBlock, TableBlock, ChartBlock]
 
+def block_to_dict(b: Block) -> dict:
+    base = {
+        "type": b.type,
+        "section": b.section,
+        "sub_section": b.sub_section,
+    }
+    if isinstance(b, ParagraphBlock):
+        base["text"] = b.text
+    elif isinstance(b, TableBlock):
+        base["table_data"] = b.table_data
+        base["description"] = b.description
+    elif isinstance(b, ChartBlock):
+        base["description"] = b.description
+        base["extracted_data"] = b.extracted_data
+    elif isinstance(b, FootnoteBlock):
+        base["text"] = b.text
+    # include confidence if present
+    if b.confidence is not None:
+        base["confidence"] = b.confidence
+    if b._metadata:
+        base["metadata"] = b._metadata
+    return base
+
 @dataclass
 class PageResult:
     page_number: int
     content: List[Block] = field(default_factory=list)
 
+    def to_dict(self) -> dict:
+        return {
+            "page_number": self.page_number,
+            "content": [block_to_dict(b) for b in self.content],
+        }
+
 @dataclass
 class ExtractionResult:
     pages: List[PageResult] = field(default_factory=list)
+    stats: dict = field(default_factory=dict)  # runtime statistics, not serialized
+    metadata: dict = field(default_factory=dict)  # document-level extras (e.g. metrics); serialized when non-empty
 
     def to_dict(self) -> dict:
-        return {
-            "pages": [
-                {
-                    "page_number": p.page_number,
-                    "content": [self._block_to_dict(b) for b in p.content],
-                }
-                for p in self.pages
-            ]
-        }
+        data = {"pages": [p.to_dict() for p in self.pages]}
+        if self.metadata:
+            data["metadata"] = self.metadata
+        return data
 
     def _block_to_dict(self, b: Block) -> dict:
-        base = {
-            "type": b.type,
-            "section": b.section,
-            "sub_section": b.sub_section,
-        }
-        if isinstance(b, ParagraphBlock):
-            base["text"] = b.text
-        elif isinstance(b, TableBlock):
-            base["table_data"] = b.table_data
-            base["description"] = b.description
-        elif isinstance(b, ChartBlock):
-            base["description"] = b.description
-            base["extracted_data"] = b.extracted_data
-        elif isinstance(b, FootnoteBlock):
-            base["text"] = b.text
-        # include confidence if present
-        if b.confidence is not None:
-            base["confidence"] = b.confidence
-        if b.metadata:
-            base["metadata"] = b.metadata
-        return base
+        return block_to_dict(b)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "ExtractionResult":
+        return cls(pages=[page_from_dict(p) for p in data.get("pages", [])], metadata=data.get("metadata") or {})
+
+
+def block_from_dict(d: dict, page_number: int) -> Block:
+    common = dict(
+        type=d["type"],
+        page_number=page_number,
+        section=d.get("section"),
+        sub_section=d.get("sub_section"),
+        confidence=d.get("confidence"),
+        metadata=d.get("metadata") or {},
+    )
+    if d["type"] == "paragraph":
+        return ParagraphBlock(text=d.get("text", ""), **common)
+    if d["type"] == "table":
+        return TableBlock(table_data=d.get("table_data") or [], description=d.get("description"), **common)
+    if d["type"] == "chart":
+        return ChartBlock(description=d.get("description"), extracted_data=d.get("extracted_data"), **common)
+    if d["type"] == "footnote":
+        return FootnoteBlock(text=d.get("text", ""), **common)
+    raise ValueError(f"Unknown block type: {d['type']!r}")
+
+
+def page_from_dict(p: dict) -> PageResult:
+    page = PageResult(page_number=p["page_number"])
+    page.content = [block_from_dict(b, page.page_number) for b in p.get("content", [])]
+    return page
@@ -0,0 +1,228 @@
+from __future__ import annotations
+from collections import OrderedDict
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+import hashlib
+import io
+import os
+import threading
+import fitz  # PyMuPDF
+
+OCR_DESCRIPTION = "Image/Chart detected (OCR excerpt: {excerpt}...)"
+
+# Image prefilter (PDF points): icons, bullets and decorative rules are not worth a Tesseract run
+MIN_SIDE_PT = 24.0
+MIN_AREA_PT2 = 2500.0
+MAX_ASPECT = 8.0
+DEFAULT_DPI = 200
+
+
+def describe(desc: str, ocr_text: str) -> str:
+    if not ocr_text:
+        return desc
+    return OCR_DESCRIPTION.format(excerpt=ocr_text[:60])
+
+
+def worth_ocr(bbox, min_side: float = MIN_SIDE_PT, min_area: float = MIN_AREA_PT2, max_aspect: float = MAX_ASPECT) -> bool:
+    w = bbox[2] - bbox[0]
+    h = bbox[3] - bbox[1]
+    if min(w, h) < min_side or w * h < min_area:
+        return False
+    return max(w, h) / min(w, h) <= max_aspect
+
+
+def _done(value) -> Future:
+    fut = Future()
+    fut.set_result(value)
+    return fut
+
+
+def _run_tesseract(png_bytes: bytes) -> str:
+    from PIL import Image
+    import pytesseract
+    image = Image.open(io.BytesIO(png_bytes))
+    return pytesseract.image_to_string(image).strip()
+
+
+@dataclass
+class OcrStats:
+    images: int = 0           # image blocks that asked for OCR text
+    filtered: int = 0         # rejected by the size/area/aspect prefilter
+    xref_hits: int = 0        # answered from the per-document memo (same rendered pixels as an earlier block)
+    cache_hits: int = 0       # answered from the content-addressed cache
+    tesseract_calls: int = 0
+
+    def merge(self, other: "OcrStats") -> None:
+        self.images += other.images
+        self.filtered += other.filtered
+        self.xref_hits += other.xref_hits
+        self.cache_hits += other.cache_hits
+        self.tesseract_calls += other.tesseract_calls
+
+
+class OcrCache:
+    # Content-addressed OCR text: a small in-memory LRU in front of an optional on-disk store.
+    # The disk store keeps one file per image hash and evicts least recently used files once
+    # it grows past max_bytes (hits refresh the file mtime).
+    def __init__(self, directory: str | None = None, max_bytes: int = 64 * 1024 * 1024, max_entries: int = 4096):
+        self.directory = Path(directory) if directory else None
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self._memory: OrderedDict = OrderedDict()
+        self._disk_bytes: Optional[int] = None
+        self._lock = threading.Lock()  # puts arrive from OCR pool threads
+        if self.directory is not None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.txt"
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            return self._get(key)
+
+    def put(self, key: str, text: str) -> None:
+        with self._lock:
+            self._put(key, text)
+
+    def _get(self, key: str) -> Optional[str]:
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            return self._memory[key]
+        if self.directory is None:
+            return None
+        path = self._path(key)
+        try:
+            text = path.read_text(encoding="utf-8")
+            os.utime(path)
+        except OSError:
+            return None
+        self._remember(key, text)
+        return text
+
+    def _put(self, key: str, text: str) -> None:
+        self._remember(key, text)
+        if self.directory is None:
+            return
+        path = self._path(key)
+        path.parent.mkdir(exist_ok=True)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        data = text.encode("utf-8")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)  # atomic, so concurrent worker processes never see partial entries
+        if self._disk_bytes is None:
+            self._disk_bytes = self._scan_disk_bytes()
+        else:
+            self._disk_bytes += len(data)
+        if self._disk_bytes > self.max_bytes:
+            self._evict()
+
+    def _remember(self, key: str, text: str) -> None:
+        self._memory[key] = text
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _entries(self):
+        entries = []
+        for path in self.directory.glob("*/*.txt"):
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+        return entries
+
+    def _scan_disk_bytes(self) -> int:
+        return sum(size for _mtime, size, _path in self._entries())
+
+    def _evict(self) -> None:
+        entries = sorted(self._entries())
+        total = sum(size for _mtime, size, _path in entries)
+        target = self.max_bytes * 0.9  # evict a little extra so every put does not rescan
+        for _mtime, size, path in entries:
+            if total <= target:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            total -= size
+        self._disk_bytes = total
+
+
+class DocumentOcr:
+    # OCR for the image blocks of one open document. Rendering happens on the calling thread
+    # (PyMuPDF documents are not thread-safe); Tesseract runs on a bounded thread pool, so it
+    # overlaps with text extraction of the following pages. Each image block is rendered only inside
+    # its bbox at `dpi` rather than at native resolution, together with any labels drawn over it.
+    # Results are memoized by a hash of that rendering, per document and via OcrCache, so a chart
+    # template reused with other labels is read again; in-flight jobs are shared too.
+    # executor: run Tesseract on this (shared, caller-owned) executor instead of a pool of `workers` threads
+    def __init__(self, doc, cache: OcrCache | None = None, workers: int = 0, dpi: int = DEFAULT_DPI,
+                 max_pending: int | None = None, executor: Executor | None = None):
+        self.doc = doc
+        self.cache = cache if cache is not None else OcrCache()
+        self.dpi = dpi
+        self._by_render = {}
+        self._owns_pool = executor is None
+        if executor is not None:
+            self._pool = executor
+        else:
+            self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ocr") if workers > 0 else None
+        # backpressure: page parsing blocks once this many OCR jobs are queued
+        self._slots = threading.BoundedSemaphore(max_pending or max(1, workers) * 4)
+
+    def submit(self, page, info: dict, stats: OcrStats) -> Future:
+        # info: the image block's entry from page.get_image_info()
+        stats.images += 1
+        clip = fitz.Rect(info.get("bbox", (0, 0, 0, 0))) & page.rect
+        if clip.is_empty or not worth_ocr(tuple(clip)):
+            stats.filtered += 1
+            return _done("")
+        # keyed on what Tesseract would see: the image's own pixels say nothing about text drawn over it
+        pix = page.get_pixmap(clip=clip, dpi=self.dpi)
+        key = f"{hashlib.blake2b(pix.samples_mv, digest_size=16).hexdigest()}-{pix.width}x{pix.height}x{pix.n}"
+        if key in self._by_render:
+            stats.xref_hits += 1
+            return self._by_render[key]
+        text = self.cache.get(key)
+        if text is not None:
+            stats.cache_hits += 1
+            fut = _done(text)
+        else:
+            stats.tesseract_calls += 1
+            fut = self._run(pix.tobytes("png"))
+            fut.add_done_callback(lambda f, key=key: f.exception() is None and self.cache.put(key, f.result()))
+        self._by_render[key] = fut
+        return fut
+
+    def _run(self, png: bytes) -> Future:
+        if self._pool is None:
+            fut = Future()
+            try:
+                fut.set_result(_run_tesseract(png))
+            except Exception as e:
+                fut.set_exception(e)
+            return fut
+        self._slots.acquire()
+        fut = self._pool.submit(_run_tesseract, png)
+        fut.add_done_callback(lambda _f: self._slots.release())
+        return fut
+
+    def close(self) -> None:
+        if self._pool is not None and self._owns_pool:
+            self._pool.shutdown(wait=True)
+        self._pool = None
+
+
+_SHARED_CACHES = {}
+
+def shared_cache(directory: str | None = None, max_bytes: int = 64 * 1024 * 1024) -> OcrCache:
+    # one cache per store and process, so long-lived processes and pool workers reuse results across documents
+    key = (str(directory) if directory else None, max_bytes)
+    if key not in _SHARED_CACHES:
+        _SHARED_CACHES[key] = OcrCache(directory, max_bytes=max_bytes)
+    return _SHARED_CACHES[key]
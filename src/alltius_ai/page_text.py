@@ -0,0 +1,139 @@
+from __future__ import annotations
+from array import array
+from typing import Iterator, List, Tuple
+import re
+import fitz  # PyMuPDF
+
+# text-only dict extraction: image blocks (and their decoded payloads) are left out
+LEAN_TEXT_FLAGS = fitz.TEXTFLAGS_DICT & ~fitz.TEXT_PRESERVE_IMAGES
+# inline image operator in a content stream (a match inside a string only costs an extra image pass)
+_INLINE_IMAGE = re.compile(rb"(?:^|\s)BI\s")
+
+
+class PageSpans:
+    # Column-oriented text of one page, filled in a single walk over the lean text dict.
+    # Spans: size, font flags, bbox and text. Lines: span offsets [start, end), the first span's bbox,
+    # the first non-blank span, the largest non-blank span size and the joined text.
+    # Image blocks are recorded separately (bbox + block number) from page.get_image_info().
+    __slots__ = (
+        "span_text", "span_size", "span_flags", "span_x0", "span_y0", "span_x1", "span_y1",
+        "line_start", "line_end", "line_head", "line_max_size", "line_text",
+        "line_x0", "line_y0", "line_x1", "line_y1",
+        "sizes", "images", "_items",
+    )
+
+    def __init__(self):
+        self.span_text: List[str] = []
+        self.span_size = array("d")
+        self.span_flags = array("l")  # PyMuPDF span flags (bit 4: bold)
+        self.span_x0 = array("d")
+        self.span_y0 = array("d")
+        self.span_x1 = array("d")
+        self.span_y1 = array("d")
+        self.line_start = array("l")
+        self.line_end = array("l")
+        self.line_head = array("l")  # index of first non-blank span, -1 if none
+        self.line_max_size = array("d")
+        self.line_text: List[str] = []
+        self.line_x0 = array("d")
+        self.line_y0 = array("d")
+        self.line_x1 = array("d")
+        self.line_y1 = array("d")
+        self.sizes = array("d")  # sizes of non-blank spans, in reading order (font statistics)
+        self.images: List[dict] = []  # image info dicts (bbox, number, ...) in block order
+        self._items = array("l")  # reading order: line index >= 0, image i encoded as -(i + 1)
+
+    @property
+    def line_count(self) -> int:
+        return len(self.line_text)
+
+    def span_bbox(self, i: int) -> Tuple[float, float, float, float]:
+        return (self.span_x0[i], self.span_y0[i], self.span_x1[i], self.span_y1[i])
+
+    def line_bbox(self, i: int) -> Tuple[float, float, float, float]:
+        return (self.line_x0[i], self.line_y0[i], self.line_x1[i], self.line_y1[i])
+
+    def items(self) -> Iterator[Tuple[str, int]]:
+        # ("line", index) / ("image", index) in the block order of page.get_text("dict")
+        for code in self._items:
+            if code >= 0:
+                yield "line", code
+            else:
+                yield "image", -code - 1
+
+    def span_origins(self) -> Iterator[Tuple[float, float]]:
+        # top-left corner of every non-blank span (table column alignment)
+        for i, text in enumerate(self.span_text):
+            if text.strip():
+                yield self.span_x0[i], self.span_y0[i]
+
+    def _add_block(self, block: dict) -> None:
+        # hot loop: bound methods hoisted out of the per-span work
+        span_text, sizes = self.span_text, self.sizes
+        add_text, add_size, add_flags = span_text.append, self.span_size.append, self.span_flags.append
+        add_x0, add_y0, add_x1, add_y1 = self.span_x0.append, self.span_y0.append, self.span_x1.append, self.span_y1.append
+        for line in block.get("lines", []):
+            spans = line.get("spans", [])
+            start = len(span_text)
+            head = -1
+            max_size = 0
+            for span in spans:
+                text = span.get("text", "")
+                size = span.get("size", 0)
+                x0, y0, x1, y1 = span.get("bbox", (0, 0, 0, 0))
+                if text.strip():
+                    if head < 0:
+                        head = len(span_text)
+                    if size > max_size:
+                        max_size = size
+                    sizes.append(size)
+                add_text(text)
+                add_size(size)
+                add_flags(span.get("flags", 0))
+                add_x0(x0)
+                add_y0(y0)
+                add_x1(x1)
+                add_y1(y1)
+            self._items.append(len(self.line_text))
+            self.line_start.append(start)
+            self.line_end.append(len(span_text))
+            self.line_head.append(head)
+            self.line_max_size.append(max_size)
+            self.line_text.append("".join(span_text[start:]).strip())
+            if spans:
+                x0, y0, x1, y1 = spans[0].get("bbox", (0, 0, 0, 0))
+            else:
+                x0 = y0 = x1 = y1 = 0
+            self.line_x0.append(x0)
+            self.line_y0.append(y0)
+            self.line_x1.append(x1)
+            self.line_y1.append(y1)
+
+    def _add_image(self, info: dict) -> None:
+        self._items.append(-len(self.images) - 1)
+        self.images.append(info)
+
+
+def read_page(page) -> PageSpans:
+    spans = PageSpans()
+    text_blocks = page.get_text("dict", flags=LEAN_TEXT_FLAGS).get("blocks", [])
+    images = []
+    # get_image_info() re-runs the page's content stream; skip it when the page references no image
+    # XObject, no form XObject (which may hold images) and has no inline image (BI ... EI) of its own
+    if page.get_images() or page.get_xobjects() or _INLINE_IMAGE.search(page.read_contents()):
+        images = sorted(page.get_image_info(), key=lambda info: info["number"])
+    # image block numbers are positions in the full block list; text blocks fill the other slots in order
+    img_iter = iter(images)
+    next_img = next(img_iter, None)
+    position = 0
+    for block in text_blocks:
+        while next_img is not None and next_img["number"] <= position:
+            spans._add_image(next_img)
+            position = next_img["number"] + 1
+            next_img = next(img_iter, None)
+        spans._add_block(block)
+        position += 1
+    while next_img is not None:
+        spans._add_image(next_img)
+        next_img = next(img_iter, None)
+    return spans
@@ -1,17 +1,468 @@
 from __future__ import annotations
-import json
 from pathlib import Path
-from typing import List, Tuple
+from contextlib import ExitStack
+from dataclasses import dataclass, field, replace
+from typing import Iterable, Iterator, List, Optional, Tuple
 import fitz  # PyMuPDF
 import logging
+import time
 
 from .models import ExtractionResult, PageResult, ParagraphBlock, TableBlock, ChartBlock
 from .models import FootnoteBlock
-from .heading_detection import detect_headings, assign_sections
-from .table_extractor import extract_tables
+from .heading_detection import detect_headings_in_spans, font_profile, outline_by_page, outline_headings, profile_sample
+from .heading_detection import resets_section_state, SectionTracker
+from .page_text import read_page
+from .table_extractor import get_backend, detect_page_tables, TableDetectionStats
+from .ocr import DocumentOcr, OcrStats, describe, shared_cache
+from .cache import ResultCache
+from .exporters import JsonWriter, MarkdownWriter, write_pages, writer_for
+from .metrics import Metrics, NULL_METRICS
+from .memory import PageStore, peak_rss_mb
+from .spatial import RegionIndex
+from .incremental import Fingerprints, PageRecord, ReusePlan, context_key, document_fingerprints
 
 
-def extract_pdf(
+_IMG_MARKER = "__IMG_BLOCK__::"
+HEADING_SOURCES = ("auto", "outline", "fonts")
+FONT_STATS = ("document", "page")
+TABLE_TEXT = ("drop", "keep")
+# memory-bounded runs release parsed document state every this many pages (and cap worker shards to it)
+_PAGE_WINDOW = 32
+
+
+@dataclass(frozen=True)
+class _PageOptions:
+    # per-page settings shipped to worker processes
+    min_heading_ratio: float = 1.15
+    enable_ocr: bool = False
+    table_backend: Optional[str] = "pdfplumber"
+    force_tables: bool = False
+    ocr_cache_dir: Optional[str] = None
+    ocr_cache_max_bytes: int = 64 * 1024 * 1024
+    ocr_workers: int = 0
+    ocr_dpi: int = 200
+    # {page_number: [(level, title, y)]} when headings come from the document outline, else None (font sizes)
+    outline: Optional[dict] = None
+    # document body font size (FontProfile) for pages too sparse for their own font statistics; in-process
+    # this may be a _DocumentProfile computing it on first use
+    body_size: Optional[float] = None
+    page_window: Optional[int] = None  # release cached document state every this many pages
+
+
+@dataclass
+class _PageScan:
+    # compact per-page result returned by the (possibly out-of-process) page pass
+    page_number: int
+    height: float
+    headings: list
+    paragraphs: list
+    tables: list
+    table_stats: TableDetectionStats = field(default_factory=TableDetectionStats)
+    ocr_stats: OcrStats = field(default_factory=OcrStats)
+    pending_ocr: list = field(default_factory=list)  # (paragraph index, Future); resolved before pickling/assembly
+    stage_seconds: dict = field(default_factory=dict)  # wall time per pipeline stage spent on this page
+    counts: dict = field(default_factory=dict)  # spans / lines / images read from the page
+
+    def resolve_ocr(self, logger: logging.Logger) -> None:
+        if self.pending_ocr:
+            t0 = time.perf_counter()
+            for _idx, fut in self.pending_ocr:
+                fut.exception()  # wait; failures are handled below
+            _add_time(self.stage_seconds, "ocr_wait", time.perf_counter() - t0)
+        for idx, fut in self.pending_ocr:
+            text, page_number, bbox = self.paragraphs[idx]
+            try:
+                ocr_text = fut.result()
+            except Exception as e:
+                logger.debug("OCR failed: %s", e)
+                continue
+            self.paragraphs[idx] = (f"{_IMG_MARKER}{describe(text[len(_IMG_MARKER):], ocr_text)}", page_number, bbox)
+        self.pending_ocr = []
+
+
+def _add_time(stages: dict, name: str, seconds: float) -> None:
+    stages[name] = stages.get(name, 0.0) + seconds
+
+
+class _DocumentProfile:
+    # FontProfile of an open document, sampled on the first call: most documents have no page sparse
+    # enough to need it, and then pay nothing. Calls return the body size (None for text-less documents).
+    def __init__(self, doc, min_ratio: float, stage_seconds: dict, metrics: Metrics, logger: logging.Logger):
+        self.doc = doc
+        self.min_ratio = min_ratio
+        self.stage_seconds = stage_seconds
+        self.metrics = metrics
+        self.logger = logger
+        self.computed = False
+        self.profile = None
+
+    def __call__(self) -> Optional[float]:
+        if not self.computed:
+            t0 = time.perf_counter()
+            # sampled from the whole document, so a page range sees the same profile as a full run
+            self.profile = font_profile((read_page(self.doc[i]) for i in profile_sample(len(self.doc))), self.min_ratio)
+            self.computed = True
+            _add_time(self.stage_seconds, "font_profile", time.perf_counter() - t0)
+            self.metrics.add_time("font_profile", time.perf_counter() - t0)
+            if self.profile is not None:
+                self.logger.debug("Font profile: body %.2fpt, heading sizes %s (%d pages sampled)", self.profile.body_size,
+                                  ", ".join(f"{s:g} ({b:.0%} bold)" for s, b in zip(self.profile.heading_sizes, self.profile.heading_bold)),
+                                  self.profile.pages_sampled)
+        return self.profile.body_size if self.profile is not None else None
+
+
+def _page_items(spans, page_number: int):
+    # (text, page_number, bbox) for every text line and image block in reading order; image blocks
+    # become chart placeholders. Also returns (paragraph index, image index) for each image block.
+    paragraphs: List[Tuple[str,int,Tuple[float,float,float,float]]] = []
+    image_slots = []
+    for kind, i in spans.items():
+        if kind == "line":  # text
+            text_line = spans.line_text[i]
+            if text_line:
+                paragraphs.append((text_line, page_number, spans.line_bbox(i)))
+        else:  # image block => potential chart placeholder
+            bbox = spans.images[i].get("bbox", (0,0,0,0))
+            image_slots.append((len(paragraphs), i))
+            paragraphs.append((f"{_IMG_MARKER}Image/Chart detected", page_number, bbox))
+    return paragraphs, image_slots
+
+
+def _page_headings(spans, page_number: int, opts: _PageOptions) -> list:
+    # (text, bbox) from font statistics, or (title, bbox, level) from the outline
+    if opts.outline is not None:
+        return outline_headings(spans, opts.outline.get(page_number, ()))
+    return [(h[0], h[1]) for h in detect_headings_in_spans(spans, min_ratio=opts.min_heading_ratio, document_body_size=opts.body_size)]
+
+
+def _process_page(doc, page_index: int, opts: _PageOptions, tables_engine, ocr: DocumentOcr | None, logger: logging.Logger):
+    t0 = time.perf_counter()
+    page = doc[page_index]
+    page_number = page_index + 1
+    # lean pass: text spans as compact columns, image blocks as bbox-only records (no decoded payloads)
+    spans = read_page(page)
+    t1 = time.perf_counter()
+    headings = _page_headings(spans, page_number, opts)
+    t2 = time.perf_counter()
+    local_headings = headings
+    local_paragraphs, image_slots = _page_items(spans, page_number)
+    ocr_stats = OcrStats()
+    pending_ocr = []
+    if ocr is not None:
+        for idx, i in image_slots:
+            try:
+                pending_ocr.append((idx, ocr.submit(page, spans.images[i], ocr_stats)))
+            except Exception as e:
+                logger.debug("OCR failed: %s", e)
+    t3 = time.perf_counter()
+    # page height travels with the scan so later passes never need the page object again
+    scan = _PageScan(page_number, page.rect.height, local_headings, local_paragraphs, [], ocr_stats=ocr_stats, pending_ocr=pending_ocr)
+    # "ocr_submit" covers prefiltering and rendering image regions; Tesseract itself shows up as "ocr_wait"
+    scan.stage_seconds = {"text": t1 - t0, "headings": t2 - t1, "ocr_submit" if ocr is not None else "blocks": t3 - t2}
+    scan.counts = {"spans": len(spans.span_text), "lines": spans.line_count, "images": len(spans.images), "headings": len(headings)}
+    if tables_engine is not None:
+        # tables come from the same per-page pass: (rows, bbox) pairs
+        scan.tables = detect_page_tables(tables_engine, page_index, page, spans.span_origins(), force=opts.force_tables, stats=scan.table_stats)
+        scan.stage_seconds["tables"] = time.perf_counter() - t3
+    return scan
+
+
+def _open_tables_engine(pdf_path: str, opts: _PageOptions):
+    if not opts.table_backend:
+        return None
+    engine = get_backend(opts.table_backend)
+    engine.open(pdf_path)
+    return engine
+
+
+def _default_ocr_workers() -> int:
+    import os
+    return min(4, os.cpu_count() or 1)
+
+
+def _open_ocr(doc, opts: _PageOptions, executor=None):
+    if not opts.enable_ocr:
+        return None
+    return DocumentOcr(doc, shared_cache(opts.ocr_cache_dir, opts.ocr_cache_max_bytes), workers=opts.ocr_workers, dpi=opts.ocr_dpi,
+                       executor=executor)
+
+
+def _release_document_state(tables_engine) -> None:
+    # MuPDF's object store (fonts, images, parsed objects) is shared by all open documents and only
+    # shrinks on demand; the table backend may cache objects of its own
+    fitz.TOOLS.store_shrink(100)
+    if tables_engine is not None:
+        tables_engine.release()
+
+
+def _process_shard(pdf_path: str, page_indices: range, opts: _PageOptions):
+    # runs in a worker process: every worker opens its own document (and table backend) handle
+    logger = logging.getLogger(__name__)
+    doc = fitz.open(pdf_path)
+    tables_engine = _open_tables_engine(pdf_path, opts)
+    ocr = _open_ocr(doc, opts)
+    try:
+        scans = []
+        for i in page_indices:
+            scans.append(_process_page(doc, i, opts, tables_engine, ocr, logger))
+            if opts.page_window and len(scans) % opts.page_window == 0:
+                _release_document_state(tables_engine)
+        # OCR futures overlap with the shard's text pass; settle them before results are pickled
+        for scan in scans:
+            scan.resolve_ocr(logger)
+        return scans
+    finally:
+        if ocr is not None:
+            ocr.close()
+        if tables_engine is not None:
+            tables_engine.close()
+        doc.close()
+
+
+def _shard_pages(page_indices, workers: int, max_size: int | None = None) -> list:
+    # a few contiguous shards per worker keeps load balanced on uneven pages;
+    # page_indices: a page count (whole document) or the selected 0-based indices;
+    # max_size bounds the pages (and scans) a worker holds at once
+    if isinstance(page_indices, int):
+        page_indices = range(page_indices)
+    elif not isinstance(page_indices, (range, list)):
+        page_indices = list(page_indices)
+    page_count = len(page_indices)
+    shard_count = max(1, min(page_count, workers * 4))
+    if max_size:
+        shard_count = max(shard_count, -(-page_count // max_size))
+    size, extra = divmod(page_count, shard_count)
+    shards = []
+    start = 0
+    for i in range(shard_count):
+        end = start + size + (1 if i < extra else 0)
+        shards.append(page_indices[start:end])
+        start = end
+    return shards
+
+
+def _iter_parallel_scans(pdf_path: str, page_indices, opts: _PageOptions, workers: int | None, executor=None):
+    # executor: a caller-owned process pool shared across documents (left running); else one per document
+    import os
+    from collections import deque
+    from concurrent.futures import ProcessPoolExecutor
+    from contextlib import nullcontext
+    workers = workers or os.cpu_count() or 1
+    shards = _shard_pages(page_indices, workers, opts.page_window)
+    with nullcontext(executor) if executor is not None else ProcessPoolExecutor(max_workers=min(workers, len(shards))) as ex:
+        # submit lazily (bounded window) so finished shards do not pile up ahead of the consumer
+        pending = deque()
+        shard_iter = iter(shards)
+        for shard in shard_iter:
+            pending.append(ex.submit(_process_shard, pdf_path, shard, opts))
+            if len(pending) >= workers * 2:
+                break
+        # consume in shard order so the merge is deterministic
+        while pending:
+            scans = pending.popleft().result()
+            for shard in shard_iter:
+                pending.append(ex.submit(_process_shard, pdf_path, shard, opts))
+                break
+            yield from scans
+
+
+# pages parsed ahead of the oldest page still waiting on OCR results
+_OCR_LOOKAHEAD = 4
+
+
+def _iter_settled_scans(scans, logger: logging.Logger):
+    # yields scans in order once their OCR futures are done, letting the pool run a few pages ahead
+    from collections import deque
+    waiting = deque()
+    for scan in scans:
+        waiting.append(scan)
+        while waiting and (len(waiting) > _OCR_LOOKAHEAD or all(f.done() for _i, f in waiting[0].pending_ocr)):
+            head = waiting.popleft()
+            head.resolve_ocr(logger)
+            yield head
+    while waiting:
+        head = waiting.popleft()
+        head.resolve_ocr(logger)
+        yield head
+
+
+def page_ranges(spec: str) -> List[Tuple[int, Optional[int]]]:
+    # "40-55,80,90-" -> [(40, 55), (80, 80), (90, None)]; 1-based and inclusive, None = last page
+    ranges = []
+    for part in spec.replace(" ", "").split(","):
+        if not part:
+            continue
+        try:
+            if "-" in part:
+                lo, hi = part.split("-", 1)
+                ranges.append((int(lo) if lo else 1, int(hi) if hi else None))
+            else:
+                ranges.append((int(part), int(part)))
+        except ValueError:
+            raise ValueError(f"Invalid page range {part!r} (expected e.g. '40-55,80')") from None
+    if not ranges:
+        raise ValueError("Empty page selection")
+    return ranges
+
+
+def parse_page_spec(spec, page_count: int) -> List[int]:
+    # page_ranges() spec or an iterable of 1-based page numbers -> sorted unique 0-based indices
+    if isinstance(spec, str):
+        ranges = [(lo, page_count if hi is None else hi) for lo, hi in page_ranges(spec)]
+    else:
+        ranges = [(int(n), int(n)) for n in spec]
+    if not ranges:
+        raise ValueError("Empty page selection")
+    for lo, hi in ranges:
+        if not 1 <= lo <= hi <= page_count:
+            label = str(lo) if lo == hi else f"{lo}-{hi}"
+            raise ValueError(f"Page selection {label} is outside 1-{page_count}")
+    return sorted({n - 1 for lo, hi in ranges for n in range(lo, hi + 1)})
+
+
+def _output_options(min_heading_ratio, merge_lines, merge_gap_ratio, enable_ocr, ocr_dpi, table_backend,
+                    force_tables, heading_source, font_stats, table_text) -> dict:
+    # every option that changes the output; parallelism, worker counts and caches are not
+    return {
+        "min_heading_ratio": min_heading_ratio,
+        "merge_lines": merge_lines,
+        "merge_gap_ratio": merge_gap_ratio,
+        "enable_ocr": enable_ocr,
+        "ocr_dpi": ocr_dpi if enable_ocr else None,
+        "table_backend": table_backend,
+        "force_tables": force_tables,
+        "heading_source": heading_source,
+        "font_stats": font_stats,
+        "table_text": table_text if table_backend else None,
+    }
+
+
+def _seed_tracker(doc, tracker: SectionTracker, start: int, stop: int, opts: _PageOptions) -> int:
+    # Brings `tracker` to the section state entering page index `stop`, as if pages [start, stop) had
+    # been extracted: a text-only scan (no tables, OCR or block building) replayed through the tracker,
+    # walking back only to the last page whose headings fix the state on their own. Returns pages scanned.
+    pending = []
+    for index in range(stop - 1, start - 1, -1):
+        spans = read_page(doc[index])
+        headings = _page_headings(spans, index + 1, opts)
+        paragraphs, _images = _page_items(spans, index + 1)
+        pending.append((index + 1, paragraphs, headings))
+        if resets_section_state(paragraphs, headings):
+            break
+    for page_number, paragraphs, headings in reversed(pending):
+        tracker.assign(paragraphs, {page_number: headings})
+    return len(pending)
+
+
+def _build_page(scan: _PageScan, tracker: SectionTracker, merge_lines: bool, merge_gap_ratio: float,
+                metrics: Metrics = NULL_METRICS, table_text: str = "drop") -> PageResult:
+    page_number = scan.page_number
+    t0 = time.perf_counter()
+    # Assign section/subsection (state carries over from earlier pages through the tracker); table lines
+    # take part, so the state leaving the page does not depend on table_text
+    assigned = tracker.assign(scan.paragraphs, {page_number: scan.headings})
+    t1 = time.perf_counter()
+
+    # table_text "drop": text lines inside a table region are already in its cells, and image blocks there
+    # are attached to the table (metadata["images"]) instead of becoming charts of their own
+    regions = RegionIndex([bbox for _tbl, bbox in scan.tables]) if scan.tables and table_text == "drop" else None
+    table_images = {}
+    dropped = 0
+
+    # Build paragraph blocks
+    para_items = []
+    image_placeholders = []
+    for ((text, _page_number, bbox), (_assigned_text, section, subsection)) in zip(scan.paragraphs, assigned):
+        table = regions.find_box(bbox) if regions and bbox else None
+        if table is not None:
+            if text.startswith(_IMG_MARKER):
+                table_images.setdefault(table, []).append(text[len(_IMG_MARKER):])
+            dropped += 1
+            continue
+        if text.startswith(_IMG_MARKER):
+            desc = text[len(_IMG_MARKER):]
+            image_placeholders.append((bbox, ChartBlock(type="chart", page_number=page_number, section=section, sub_section=subsection, description=desc)))
+        else:
+            block = ParagraphBlock(type="paragraph", page_number=page_number, section=section, sub_section=subsection, text=text, bbox=bbox)
+            para_items.append((bbox, block))
+
+    t2 = time.perf_counter()
+    if merge_lines and para_items:
+        merged = []
+        # sort by vertical position
+        para_items.sort(key=lambda x: (x[0][1], x[0][0]))
+        current_block = None
+        last_y_bottom = None
+        for bbox, block in para_items:
+            y0, y1 = bbox[1], bbox[3]
+            if current_block is None:
+                current_block = block
+                last_y_bottom = y1
+                continue
+            gap = y0 - (last_y_bottom or y0)
+            line_height = y1 - y0 if (y1 - y0) > 0 else 1
+            if gap <= line_height * merge_gap_ratio and block.section == current_block.section and block.sub_section == current_block.sub_section:
+                if current_block.text.endswith('-'):
+                    current_block.text = current_block.text[:-1] + block.text.lstrip()
+                else:
+                    current_block.text += ' ' + block.text
+                last_y_bottom = y1
+            else:
+                merged.append(current_block)
+                current_block = block
+                last_y_bottom = y1
+        if current_block is not None:
+            merged.append(current_block)
+        # replace with merged, reattach synthetic bbox ordering using original first bbox
+        para_items = [((b.bbox or (0,0,0,0)), b) for b in merged]
+
+    t3 = time.perf_counter()
+    bottom_threshold = scan.height * 0.9
+    new_items = []
+    for bbox, block in para_items:
+        if bbox[1] >= bottom_threshold:
+            foot = FootnoteBlock(type="footnote", page_number=page_number, section=block.section, sub_section=block.sub_section, text=block.text, confidence=0.5, metadata={"source":"heuristic"})
+            new_items.append((bbox, foot))
+        else:
+            new_items.append((bbox, block))
+    para_items = new_items
+    t4 = time.perf_counter()
+
+    positional_items = []
+    if scan.tables:
+        # tables are ordered by their real position; one without a bbox gets a synthetic slot
+        if para_items:
+            min_y = min(b[0][1] for b in para_items)
+            max_y = max(b[0][3] for b in para_items)
+        else:
+            min_y, max_y = 0, 0
+        spread = max(max_y - min_y, 1)
+        per_table_offset = spread / (len(scan.tables) + 1)
+        for idx, (tbl, table_bbox) in enumerate(scan.tables):
+            if table_bbox:
+                bbox = table_bbox
+            else:
+                y_center = min_y + per_table_offset * (idx + 1) if spread > 1 else 99999
+                bbox = (0, y_center, 0, y_center + 1)
+            images = table_images.get(idx)
+            positional_items.append((bbox, TableBlock(type="table", page_number=page_number, table_data=tbl, bbox=bbox,
+                                                      metadata={"images": images} if images else None)))
+    positional_items.extend(para_items)
+    positional_items.extend(image_placeholders)
+    positional_items.sort(key=lambda item: (item[0][1], item[0][0]))
+    page = PageResult(page_number=page_number, content=[blk for _bbox, blk in positional_items])
+    if metrics.enabled:
+        metrics.add_time("sections", t1 - t0)
+        metrics.add_time("block_build", t2 - t1)
+        metrics.add_time("merge", t3 - t2)
+        metrics.add_time("footnotes", t4 - t3)
+        metrics.add_time("layout", time.perf_counter() - t4)
+        if dropped:
+            metrics.incr("table_lines_dropped", dropped)
+    return page
+
+
+def iter_pages(
     pdf_path: str,
     min_heading_ratio: float = 1.15,
     logger: logging.Logger | None = None,
@@ -19,165 +470,418 @@ def extract_pdf(
     merge_gap_ratio: float = 0.6,
     enable_ocr: bool = False,
     parallel: bool = False,
-) -> ExtractionResult:
+    workers: int | None = None,
+    table_backend: str | None = "pdfplumber",
+    force_tables: bool = False,
+    ocr_cache_dir: str | None = None,
+    ocr_cache_max_mb: float = 64,
+    ocr_workers: int | None = None,
+    ocr_dpi: int = 200,
+    stats: dict | None = None,
+    metrics: Metrics | None = None,
+    pages=None,
+    heading_source: str = "auto",
+    font_stats: str = "document",
+    memory_budget_mb: float | None = None,
+    fingerprints: bool = False,
+    previous: ExtractionResult | None = None,
+    table_text: str = "drop",
+    page_executor=None,
+    ocr_executor=None,
+) -> Iterator[PageResult]:
+    # Yields finished pages in order; only the page being built (plus the OCR lookahead) is held in memory.
+    # pages: optional selection ("40-55,80" or 1-based numbers); only those pages are extracted, and the
+    # section context entering each selected run is seeded from a cheap text-only scan of skipped pages.
+    # Run statistics are written into `stats` (if given) once the document is exhausted; `metrics`
+    # receives per-stage timers and per-page counters as pages are produced.
+    # heading_source: "outline" takes headings (titles and levels) from the document's bookmarks,
+    # "fonts" detects them from font sizes, "auto" uses the outline when the document has one.
+    # font_stats: "document" samples the document's typography once, before any page is processed, and
+    # uses its body size on pages where every font size occurs once; "page" uses each page's median there.
+    # memory_budget_mb: memory-bounded run; cached document state (MuPDF store, table backend objects) is
+    # released every few pages and worker shards stay short. Peak RSS is reported in stats["memory"].
+    # fingerprints: fingerprint every page (content streams and referenced resources) and record them with
+    # the section state entering and leaving it in stats["fingerprints"] (a Fingerprints).
+    # previous: an earlier extraction of a revision of this PDF, made with fingerprints=True. Unchanged pages
+    # entered in the same section state take over its blocks; only the other pages are extracted (text,
+    # tables, OCR). Implies fingerprints. Counts are in stats["incremental"].
+    # table_text: "drop" leaves out text lines inside detected tables (their text is in the cells) and
+    # attaches image blocks there to the table; "keep" emits them as paragraphs / charts as well.
+    # page_executor: a process pool (e.g. shared by all documents of a service) for the page shards; implies
+    # parallel. ocr_executor: a thread pool for Tesseract jobs of in-process pages. Neither is shut down here.
+    if heading_source not in HEADING_SOURCES:
+        raise ValueError(f"Unknown heading source {heading_source!r} (expected one of {', '.join(HEADING_SOURCES)})")
+    if font_stats not in FONT_STATS:
+        raise ValueError(f"Unknown font statistics {font_stats!r} (expected one of {', '.join(FONT_STATS)})")
+    if table_text not in TABLE_TEXT:
+        raise ValueError(f"Unknown table text handling {table_text!r} (expected one of {', '.join(TABLE_TEXT)})")
+    fingerprints = fingerprints or previous is not None
+    if fingerprints and pages is not None:
+        raise ValueError("Page fingerprints cover the whole document; they cannot be combined with a page selection")
     logger = logger or logging.getLogger(__name__)
-    logger.debug("Opening PDF: %s", pdf_path)
+    metrics = metrics or NULL_METRICS
     pdf_path = str(pdf_path)
-    doc = fitz.open(pdf_path)
+    logger.debug("Opening PDF: %s", pdf_path)
+    opts = _PageOptions(
+        min_heading_ratio=min_heading_ratio,
+        enable_ocr=enable_ocr,
+        table_backend=table_backend,
+        force_tables=force_tables,
+        ocr_cache_dir=str(ocr_cache_dir) if ocr_cache_dir else None,
+        ocr_cache_max_bytes=int(ocr_cache_max_mb * 1024 * 1024),
+        ocr_workers=ocr_workers if ocr_workers is not None else _default_ocr_workers(),
+        ocr_dpi=ocr_dpi,
+        page_window=_PAGE_WINDOW if memory_budget_mb is not None else None,
+    )
+    tracker = SectionTracker()
+    table_stats = TableDetectionStats()
+    ocr_stats = OcrStats()
+    stage_seconds = {}
+    table_pages = 0
 
-    # Pre-extract tables with pdfplumber
-    table_map = extract_tables(pdf_path)
-    logger.debug("Extracted tables for %d pages", len(table_map))
-
-    pages: List[PageResult] = []
-    headings_per_page = {}
-    raw_paragraphs: List[Tuple[str,int,Tuple[float,float,float,float]]] = []
-
-    def _process_page(page_index: int):
-        page = doc[page_index]
-        page_number = page_index + 1
-        page_dict = page.get_text("dict")
-        headings = detect_headings(page_dict, min_ratio=min_heading_ratio)
-        local_headings = [(h[0], h[1]) for h in headings]
-        local_paragraphs: List[Tuple[str,int,Tuple[float,float,float,float]]] = []
-        for block in page_dict.get("blocks", []):
-            btype = block.get("type", 0)
-            if btype == 0:  # text
-                for line in block.get("lines", []):
-                    line_text_parts = [span.get("text", "") for span in line.get("spans", [])]
-                    text_line = "".join(line_text_parts).strip()
-                    if text_line:
-                        bbox = line.get("spans", [])[0].get("bbox", (0,0,0,0)) if line.get("spans") else (0,0,0,0)
-                        local_paragraphs.append((text_line, page_number, bbox))
-            elif btype == 1:  # image block => potential chart placeholder
-                bbox = block.get("bbox", (0,0,0,0))
-                desc = "Image/Chart detected"
-                if enable_ocr:
-                    try:
-                        import io
-                        from PIL import Image
-                        import pytesseract
-                        for img in page.get_images(full=True):
-                            xref = img[0]
-                            pix = fitz.Pixmap(doc, xref)
-                            if pix.n > 4:
-                                pix = fitz.Pixmap(fitz.csRGB, pix)
-                            img_bytes = pix.tobytes("png")
-                            image = Image.open(io.BytesIO(img_bytes))
-                            ocr_text = pytesseract.image_to_string(image).strip()
-                            if ocr_text:
-                                desc = f"Image/Chart detected (OCR excerpt: {ocr_text[:60]}...)"
-                                break
-                    except Exception as e:
-                        logger.debug("OCR failed: %s", e)
-                local_paragraphs.append((f"__IMG_BLOCK__::{desc}", page_number, bbox))
-        return page_number, local_headings, local_paragraphs
-
-    if parallel and len(doc) > 1:
-        from concurrent.futures import ThreadPoolExecutor
-        with ThreadPoolExecutor() as ex:
-            for page_number, local_headings, local_paragraphs in ex.map(_process_page, range(len(doc))):
-                headings_per_page[page_number] = local_headings
-                raw_paragraphs.extend(local_paragraphs)
-                pages.append(PageResult(page_number=page_number))
-    else:
-        for page_index in range(len(doc)):
-            page_number, local_headings, local_paragraphs = _process_page(page_index)
-            headings_per_page[page_number] = local_headings
-            raw_paragraphs.extend(local_paragraphs)
-            pages.append(PageResult(page_number=page_number))
-
-    # Assign section/subsection
-    assigned = assign_sections(raw_paragraphs, headings_per_page)
-
-    # Build paragraph blocks per page
-    page_para_blocks = {p.page_number: [] for p in pages}
-    image_placeholders = {p.page_number: [] for p in pages}
-    for ((text, page_number, bbox), (_assigned_text, section, subsection)) in zip(raw_paragraphs, assigned):
-        if text.startswith("__IMG_BLOCK__::"):
-            desc = text.split("::",1)[1]
-            image_placeholders[page_number].append((bbox, ChartBlock(type="chart", page_number=page_number, section=section, sub_section=subsection, description=desc)))
+    with fitz.open(pdf_path) as doc:
+        page_count = len(doc)
+        page_indices = range(page_count) if pages is None else parse_page_spec(pages, page_count)
+        if heading_source != "fonts":
+            outline = outline_by_page(doc.get_toc(simple=False))
+            if outline:
+                opts = replace(opts, outline=outline)
+            elif heading_source == "outline":
+                logger.warning("%s has no outline; detecting headings from font sizes", pdf_path)
+        logger.debug("Heading source: %s", "outline" if opts.outline is not None else "fonts")
+        plan = None
+        records = None
+        if fingerprints:
+            t0 = time.perf_counter()
+            prints = document_fingerprints(doc, opts.outline)
+            context = context_key({
+                **_output_options(min_heading_ratio, merge_lines, merge_gap_ratio, enable_ocr, ocr_dpi, table_backend,
+                                  force_tables, heading_source, font_stats, table_text),
+                "outline": opts.outline is not None,
+            })
+            _add_time(stage_seconds, "fingerprint", time.perf_counter() - t0)
+            metrics.add_time("fingerprint", time.perf_counter() - t0)
+            records = Fingerprints(context)
+            if previous is not None:
+                plan = ReusePlan.build(previous, prints, context)
+                if plan is None:
+                    logger.info("Previous extraction used other options; extracting every page")
+        profile = None
+        if opts.outline is None and font_stats == "document":
+            stored_size = plan.previous.body_size if plan is not None else None
+            if stored_size is not None and plan.unchanged(profile_sample(page_count), page_count):
+                # the pages the profile samples are unchanged, so it is too
+                opts = replace(opts, body_size=stored_size)
+                records.body_size = stored_size
+            else:
+                profile = _DocumentProfile(doc, min_heading_ratio, stage_seconds, metrics, logger)
+                opts = replace(opts, body_size=profile)
+                if records is not None:
+                    # stored with the fingerprints whether or not a page needs it, so serial and parallel
+                    # runs record the same body size
+                    records.body_size = profile()
+                if stored_size is not None and profile() != stored_size:
+                    # unchanged sparse pages may have used the old body size
+                    logger.info("Document font profile changed; extracting every page")
+                    plan = None
+        if plan is not None:
+            extract_indices = [i for i in page_indices if i not in plan.candidates]
+            logger.info("Incremental extraction: %d of %d pages changed", len(extract_indices), page_count)
         else:
-            # assign confidence if this exact text was a heading recognized earlier
-            conf = None
-            block = ParagraphBlock(type="paragraph", page_number=page_number, section=section, sub_section=subsection, text=text, bbox=bbox)
-            page_para_blocks[page_number].append((bbox, block))
+            extract_indices = page_indices
+        tables_engine = None
+        ocr = None
+        engines_open = False
+        previous_index = -1  # index of the last page fed through the tracker
+        produced = 0
 
-    if merge_lines:
-        for page_no, items in page_para_blocks.items():
-            if not items:
-                continue
-            merged = []
-            # sort by vertical position
-            items.sort(key=lambda x: (x[0][1], x[0][0]))
-            current_block = None
-            last_y_bottom = None
-            for bbox, block in items:
-                y0, y1 = bbox[1], bbox[3]
-                if current_block is None:
-                    current_block = block
-                    last_y_bottom = y1
+        def scan_page(index: int) -> _PageScan:
+            # in-process page pass; the table backend and OCR pool open with the first page that needs them
+            nonlocal tables_engine, ocr, engines_open
+            if not engines_open:
+                tables_engine = _open_tables_engine(pdf_path, opts)
+                ocr = _open_ocr(doc, opts, ocr_executor)
+                engines_open = True
+            return _process_page(doc, index, opts, tables_engine, ocr, logger)
+
+        def rescan(index: int) -> _PageScan:
+            # an unchanged page entered in a different section state is extracted again
+            scan = scan_page(index)
+            scan.resolve_ocr(logger)
+            return scan
+
+        def in_order(settled):
+            # extracted scans and taken-over pages in page order; the tracker has consumed every page
+            # before the next one is decided
+            for index in page_indices:
+                if index not in plan.candidates:
+                    yield next(settled)
                     continue
-                gap = y0 - (last_y_bottom or y0)
-                line_height = y1 - y0 if (y1 - y0) > 0 else 1
-                if gap <= line_height * merge_gap_ratio and block.section == current_block.section and block.sub_section == current_block.sub_section:
-                    if current_block.text.endswith('-'):
-                        current_block.text = current_block.text[:-1] + block.text.lstrip()
-                    else:
-                        current_block.text += ' ' + block.text
-                    last_y_bottom = y1
-                else:
-                    merged.append(current_block)
-                    current_block = block
-                    last_y_bottom = y1
-            if current_block is not None:
-                merged.append(current_block)
-            # replace with merged, reattach synthetic bbox ordering using original first bbox
-            page_para_blocks[page_no] = [((b.bbox or (0,0,0,0)), b) for b in merged]
-    for page_index in range(len(doc)):
-        page_number = page_index + 1
-        page = doc[page_index]
-        page_height = page.rect.height
-        bottom_threshold = page_height * 0.9
-        new_items = []
-        for bbox, block in page_para_blocks.get(page_number, []):
-            if bbox[1] >= bottom_threshold:
-                foot = FootnoteBlock(type="footnote", page_number=page_number, section=block.section, sub_section=block.sub_section, text=block.text, confidence=0.5, metadata={"source":"heuristic"})
-                new_items.append((bbox, foot))
-            else:
-                new_items.append((bbox, block))
-        page_para_blocks[page_number] = new_items
-    for p in pages:
-        positional_items = []
-        para_items = page_para_blocks.get(p.page_number, [])
-        if p.page_number in table_map:
-            if para_items:
-                min_y = min(b[0][1] for b in para_items)
-                max_y = max(b[0][3] for b in para_items)
+                taken = plan.take(index, (tracker.last_section, tracker.last_subsection))
+                if taken is None:
+                    yield rescan(index)
+                    continue
+                page, (tracker.last_section, tracker.last_subsection) = taken
+                yield page
+
+        try:
+            if (parallel or page_executor is not None) and len(extract_indices) > 1:
+                if profile is not None:
+                    # computed once here and shipped to every worker with the page options
+                    opts = replace(opts, body_size=profile())
+                scans = _iter_parallel_scans(pdf_path, extract_indices, opts, workers, page_executor)
             else:
-                min_y, max_y = 0, 0
-            spread = max(max_y - min_y, 1)
-            per_table_offset = spread / (len(table_map[p.page_number]) + 1)
-            for idx, tbl in enumerate(table_map[p.page_number], start=1):
-                y_center = min_y + per_table_offset * idx if spread > 1 else 99999
-                bbox = (0, y_center, 0, y_center + 1)
-                positional_items.append((bbox, TableBlock(type="table", page_number=p.page_number, table_data=tbl, bbox=bbox)))
-        positional_items.extend(para_items)
-        positional_items.extend(image_placeholders.get(p.page_number, []))
-        positional_items.sort(key=lambda item: (item[0][1], item[0][0]))
-        p.content.extend([blk for _bbox, blk in positional_items])
-        logger.debug("Page %d: %d content blocks", p.page_number, len(p.content))
+                scans = (scan_page(i) for i in extract_indices)
+            scans = _iter_settled_scans(scans, logger)
+            if plan is not None:
+                scans = in_order(scans)
+            entry = (None, None)  # section state entering the next page
+            for scan in scans:
+                if isinstance(scan, PageResult):
+                    # taken over from the previous extraction; the tracker already holds its exit state
+                    exit_state = (tracker.last_section, tracker.last_subsection)
+                    records.pages.append(PageRecord(prints[scan.page_number - 1], entry, exit_state))
+                    entry = exit_state
+                    metrics.incr("reused_pages")
+                    previous_index = scan.page_number - 1
+                    yield scan
+                    produced += 1
+                    continue
+                if scan.page_number - 1 > previous_index + 1:
+                    t0 = time.perf_counter()
+                    seeded = _seed_tracker(doc, tracker, previous_index + 1, scan.page_number - 1, opts)
+                    _add_time(stage_seconds, "section_seed", time.perf_counter() - t0)
+                    metrics.add_time("section_seed", time.perf_counter() - t0)
+                    metrics.incr("seed_pages", seeded)
+                previous_index = scan.page_number - 1
+                table_stats.merge(scan.table_stats)
+                ocr_stats.merge(scan.ocr_stats)
+                table_pages += bool(scan.tables)
+                t0 = time.perf_counter()
+                page = _build_page(scan, tracker, merge_lines, merge_gap_ratio, metrics, table_text)
+                _add_time(stage_seconds, "assembly", time.perf_counter() - t0)
+                for name, seconds in scan.stage_seconds.items():
+                    _add_time(stage_seconds, name, seconds)
+                if metrics.enabled:
+                    for name, seconds in scan.stage_seconds.items():
+                        metrics.add_time(name, seconds)
+                    for name, value in scan.counts.items():
+                        metrics.incr(name, value)
+                    metrics.incr("pages")
+                    metrics.incr("content_blocks", len(page.content))
+                    metrics.incr("tables", len(scan.tables))
+                logger.debug("Page %d: %d content blocks", page.page_number, len(page.content))
+                if records is not None:
+                    exit_state = (tracker.last_section, tracker.last_subsection)
+                    records.pages.append(PageRecord(prints[page.page_number - 1], entry, exit_state))
+                    entry = exit_state
+                yield page
+                produced += 1
+                if opts.page_window and produced % opts.page_window == 0:
+                    _release_document_state(tables_engine)
+        finally:
+            if ocr is not None:
+                ocr.close()
+            if tables_engine is not None:
+                tables_engine.close()
+    logger.debug("Extracted tables for %d pages", table_pages)
+    if table_backend:
+        logger.info(
+            "Table prefilter: %d pages checked, %d skipped, %d sent to detector (~%.2fs saved)",
+            table_stats.pages_checked, table_stats.pages_skipped, table_stats.pages_detected, table_stats.seconds_saved,
+        )
+        if force_tables and table_stats.pages_missed:
+            logger.info("Table prefilter would have missed tables on %d pages", table_stats.pages_missed)
+    if enable_ocr:
+        logger.debug(
+            "OCR: %d images, %d filtered, %d xref hits, %d cache hits, %d tesseract calls",
+            ocr_stats.images, ocr_stats.filtered, ocr_stats.xref_hits, ocr_stats.cache_hits, ocr_stats.tesseract_calls,
+        )
+    if metrics.enabled:
+        if table_backend:
+            metrics.incr("table_pages_skipped", table_stats.pages_skipped)
+            metrics.incr("table_pages_detected", table_stats.pages_detected)
+            metrics.add_time("table_prefilter", table_stats.prefilter_seconds)
+        if enable_ocr:
+            metrics.incr("ocr_images", ocr_stats.images)
+            metrics.incr("ocr_filtered", ocr_stats.filtered)
+            metrics.incr("ocr_cache_hits", ocr_stats.cache_hits + ocr_stats.xref_hits)
+            metrics.incr("ocr_tesseract_calls", ocr_stats.tesseract_calls)
+    peak = peak_rss_mb()
+    logger.log(logging.INFO if memory_budget_mb is not None else logging.DEBUG, "Peak memory: %.0f MB", peak)
+    if stats is not None:
+        # per-stage wall time summed over pages (worker time when parallel, so it can exceed elapsed time)
+        stats["stages"] = stage_seconds
+        stats["memory"] = {"peak_rss_mb": round(peak, 1)}
+        if profile is not None and profile.profile is not None:
+            stats["font_profile"] = profile.profile
+        if records is not None:
+            stats["fingerprints"] = records
+        if previous is not None:
+            reused = plan.reused if plan is not None else 0
+            stats["incremental"] = {"reused_pages": reused, "extracted_pages": page_count - reused,
+                                    "resynced_pages": plan.resynced if plan is not None else 0}
+        if table_backend:
+            stats["tables"] = table_stats
+        if enable_ocr:
+            stats["ocr"] = ocr_stats
+
+
+def extract_pdf(
+    pdf_path: str,
+    min_heading_ratio: float = 1.15,
+    logger: logging.Logger | None = None,
+    merge_lines: bool = True,
+    merge_gap_ratio: float = 0.6,
+    enable_ocr: bool = False,
+    parallel: bool = False,
+    workers: int | None = None,
+    table_backend: str | None = "pdfplumber",
+    force_tables: bool = False,
+    ocr_cache_dir: str | None = None,
+    ocr_cache_max_mb: float = 64,
+    ocr_workers: int | None = None,
+    ocr_dpi: int = 200,
+    cache: ResultCache | None = None,
+    metrics: Metrics | None = None,
+    attach_metrics: bool = False,
+    pages=None,
+    heading_source: str = "auto",
+    font_stats: str = "document",
+    memory_budget_mb: float | None = None,
+    fingerprints: bool = False,
+    previous: ExtractionResult | None = None,
+    table_text: str = "drop",
+) -> ExtractionResult:
+    # attach_metrics: record metrics (into `metrics` or a fresh Metrics) and store them under
+    # result.metadata["metrics"], which is serialized with the result
+    # memory_budget_mb: memory-bounded run (see iter_pages); once the process RSS exceeds the budget,
+    # finished pages are spilled to a temporary file and result.pages becomes a disk-backed PageStore
+    # fingerprints / previous: incremental re-extraction (see iter_pages); the page fingerprints are stored
+    # under result.metadata["fingerprints"], so a saved result can serve as `previous` for the next revision
+    logger = logger or logging.getLogger(__name__)
+    pdf_path = str(pdf_path)
+    if attach_metrics and metrics is None:
+        metrics = Metrics()
+    metrics = metrics or NULL_METRICS
+    t0 = time.perf_counter()
+    cache_key = None
+    if cache is not None:
+        # every option that changes the output is part of the key; parallelism/worker counts are not
+        cache_key = cache.key(pdf_path, {
+            **_output_options(min_heading_ratio, merge_lines, merge_gap_ratio, enable_ocr, ocr_dpi, table_backend,
+                              force_tables, heading_source, font_stats, table_text),
+            # a selection is keyed by its normalized spec; full-document keys are unchanged
+            **({"pages": pages.replace(" ", "") if isinstance(pages, str) else sorted(set(pages))} if pages is not None else {}),
+            **({"fingerprints": True} if fingerprints or previous is not None else {}),
+        })
+        cached = cache.get(cache_key, pdf_path)
+        metrics.incr("result_cache_hits" if cached is not None else "result_cache_misses")
+        if cached is not None:
+            logger.debug("Result cache hit: %s", pdf_path)
+            return _with_metrics(cached, metrics, attach_metrics, t0)
+    result = ExtractionResult()
+    produced = iter_pages(
+        pdf_path,
+        min_heading_ratio=min_heading_ratio,
+        logger=logger,
+        merge_lines=merge_lines,
+        merge_gap_ratio=merge_gap_ratio,
+        enable_ocr=enable_ocr,
+        parallel=parallel,
+        workers=workers,
+        table_backend=table_backend,
+        force_tables=force_tables,
+        ocr_cache_dir=ocr_cache_dir,
+        ocr_cache_max_mb=ocr_cache_max_mb,
+        ocr_workers=ocr_workers,
+        ocr_dpi=ocr_dpi,
+        stats=result.stats,
+        metrics=metrics,
+        pages=pages,
+        heading_source=heading_source,
+        font_stats=font_stats,
+        memory_budget_mb=memory_budget_mb,
+        fingerprints=fingerprints,
+        previous=previous,
+        table_text=table_text,
+    )
+    if memory_budget_mb is None:
+        result.pages = list(produced)
+    else:
+        store = PageStore(memory_budget_mb)
+        for page in produced:
+            store.append(page)
+        result.pages = store
+        result.stats["memory"].update(budget_mb=memory_budget_mb, spilled_pages=store.spilled)
+        metrics.incr("spilled_pages", store.spilled)
+        if store.spilled:
+            logger.info("Memory budget of %.0f MB exceeded; %d pages spilled to disk", memory_budget_mb, store.spilled)
+    _attach_fingerprints(result)
+    if cache is not None:
+        cache.put(cache_key, result)
+    return _with_metrics(result, metrics, attach_metrics, t0)
 
-    return ExtractionResult(pages=pages)
 
+def _attach_fingerprints(result: ExtractionResult) -> None:
+    # page fingerprints travel with the serialized result, ready to serve as `previous` for the next revision
+    if "fingerprints" in result.stats:
+        result.metadata["fingerprints"] = result.stats["fingerprints"].to_dict()
 
-def save_extraction(result: ExtractionResult, output_path: str, pretty: bool = True):
-    data = result.to_dict()
-    with open(output_path, "w", encoding="utf-8") as f:
-        if pretty:
-            json.dump(data, f, indent=2, ensure_ascii=False)
-        else:
-            json.dump(data, f, ensure_ascii=False)
+
+def _with_metrics(result: ExtractionResult, metrics: Metrics, attach: bool, started: float) -> ExtractionResult:
+    metrics.add_time("extract", time.perf_counter() - started)
+    if attach:
+        result.metadata["metrics"] = metrics.to_dict()
+    return result
+
+
+def save_extraction(result: ExtractionResult, output_path: str, pretty: bool = True, metrics: Metrics | None = None,
+                    markdown_path: str | None = None):
+    metrics = metrics or NULL_METRICS
+    with metrics.timer("serialize"):
+        # written page by page straight from the blocks (no result.to_dict() tree); same bytes as
+        # json.dump(result.to_dict(), ...), and disk-backed pages of memory-bounded runs are read one at a time.
+        # markdown_path: Markdown (to_markdown) written from the same pass over the pages
+        with ExitStack() as files:
+            writers = [JsonWriter(files.enter_context(open(output_path, "w", encoding="utf-8")), pretty=pretty, metadata=result.metadata)]
+            if markdown_path:
+                writers.append(MarkdownWriter(files.enter_context(open(markdown_path, "w", encoding="utf-8"))))
+            write_pages(result.pages, writers)
+
+
+def _timed_source(pages: Iterable[PageResult], spent: list) -> Iterator[PageResult]:
+    # accumulates the time spent producing pages, so a writer's own time can be separated from it
+    it = iter(pages)
+    while True:
+        t0 = time.perf_counter()
+        try:
+            page = next(it)
+        except StopIteration:
+            spent[0] += time.perf_counter() - t0
+            return
+        spent[0] += time.perf_counter() - t0
+        yield page
+
+
+def save_extraction_stream(pages: Iterable[PageResult], output_path: str, fmt: str = "json", pretty: bool = True,
+                           metrics: Metrics | None = None, markdown_path: str | None = None) -> int:
+    # incremental counterpart of save_extraction: consumes e.g. iter_pages() without materializing the result;
+    # with markdown_path, each page goes to both files before the next one is produced
+    if metrics is not None and metrics.enabled:
+        spent = [0.0]
+        t0 = time.perf_counter()
+        count = save_extraction_stream(_timed_source(pages, spent), output_path, fmt=fmt, pretty=pretty,
+                                       markdown_path=markdown_path)
+        metrics.add_time("serialize", time.perf_counter() - t0 - spent[0])
+        return count
+    if fmt not in ("json", "ndjson"):
+        raise ValueError(f"Unknown stream format: {fmt!r}")
+    with ExitStack() as files:
+        writers = [writer_for(fmt, files.enter_context(open(output_path, "w", encoding="utf-8")), pretty=pretty)]
+        if markdown_path:
+            writers.append(MarkdownWriter(files.enter_context(open(markdown_path, "w", encoding="utf-8"))))
+        return write_pages(pages, writers)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,315 @@
+from __future__ import annotations
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+from urllib.parse import parse_qs, urlparse
+import json
+import logging
+import multiprocessing as mp
+import os
+import socketserver
+import tempfile
+import threading
+import time
+
+# Imported up front on purpose: the server process (and, through the fork server's preload, the pool
+# workers) keep PyMuPDF and pdfplumber loaded, so a request pays for extraction only, not interpreter
+# and library start-up.
+from .pdf_extractor import FONT_STATS, HEADING_SOURCES, TABLE_TEXT, extract_pdf, page_ranges
+from .metrics import Metrics
+from .table_extractor import available_backends, preload_backend
+
+logger = logging.getLogger(__name__)
+
+# request options accepted as query parameters (or "options" in a JSON body); names follow extract_pdf
+_OPTION_TYPES = {
+    "min_heading_ratio": float,
+    "merge_lines": bool,
+    "merge_gap_ratio": float,
+    "enable_ocr": bool,
+    "table_backend": str,
+    "force_tables": bool,
+    "ocr_dpi": int,
+    "pages": str,
+    "heading_source": str,
+    "font_stats": str,
+    "table_text": str,
+    "memory_budget_mb": float,
+}
+
+
+def _parse_bool(value) -> bool:
+    if isinstance(value, bool):
+        return value
+    if str(value).lower() in ("1", "true", "yes", "on"):
+        return True
+    if str(value).lower() in ("0", "false", "no", "off"):
+        return False
+    raise ValueError(f"not a boolean: {value!r}")
+
+
+def parse_options(raw: dict) -> dict:
+    options = {}
+    for name, value in raw.items():
+        if name not in _OPTION_TYPES:
+            raise ValueError(f"Unknown option {name!r} (allowed: {', '.join(sorted(_OPTION_TYPES))})")
+        kind = _OPTION_TYPES[name]
+        options[name] = _parse_bool(value) if kind is bool else kind(value)
+    if str(options.get("table_backend")).lower() in ("", "none"):
+        options["table_backend"] = None  # same as the CLI's --no-tables
+    if options.get("table_backend") not in (None, *available_backends()):
+        raise ValueError(f"Unknown table backend {options['table_backend']!r}")
+    # checked here so a bad value is a 400, not a failed job
+    for name, allowed in (("heading_source", HEADING_SOURCES), ("font_stats", FONT_STATS), ("table_text", TABLE_TEXT)):
+        if name in options and options[name] not in allowed:
+            raise ValueError(f"Unknown {name} {options[name]!r} (expected one of {', '.join(allowed)})")
+    if "pages" in options:
+        page_ranges(options["pages"])
+    return options
+
+
+# modules the fork server imports before forking workers (missing optional ones are skipped)
+_PRELOAD = ["alltius_ai.server", "alltius_ai.pdf_extractor", "pdfplumber"]
+
+
+def _pool_context():
+    # forkserver: workers fork from a helper process that imported the extraction stack once, so they start
+    # warm without forking this multi-threaded server (inherited locks); spawn where it is unavailable
+    methods = mp.get_all_start_methods()
+    if "forkserver" not in methods:
+        return mp.get_context("spawn")
+    ctx = mp.get_context("forkserver")
+    ctx.set_forkserver_preload(_PRELOAD)
+    return ctx
+
+
+def _extract_job(pdf_path: str, options: dict, cache_dir: Optional[str]):
+    # runs in a pool worker; returns plain page dicts plus the job's metrics
+    cache = None
+    if cache_dir:
+        from .cache import ResultCache
+        cache = ResultCache(cache_dir)
+    metrics = Metrics()
+    result = extract_pdf(pdf_path, cache=cache, metrics=metrics, **options)
+    return [p.to_dict() for p in result.pages], metrics
+
+
+class ExtractionService:
+    # Pool plus admission control shared by all request threads. At most `workers` jobs run and
+    # `queue_size` wait; anything beyond that is rejected immediately (HTTP 503) instead of piling up.
+    def __init__(self, workers: int | None = None, queue_size: int = 16, cache_dir: str | None = None):
+        self.workers = workers or os.cpu_count() or 1
+        self.queue_size = queue_size
+        self.cache_dir = cache_dir
+        self.metrics = Metrics()
+        self.started = time.time()
+        self.in_flight = 0  # admitted jobs, running or waiting for a worker
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(self.workers + queue_size)
+        self._pool = self._new_pool()
+        # start every worker before serving; later (replacement) pools start from request threads, which
+        # is safe because workers come from the single-threaded fork server, never from this process
+        for fut in [self._pool.submit(int) for _ in range(self.workers)]:
+            fut.result()
+
+    def _new_pool(self) -> ProcessPoolExecutor:
+        for name in available_backends():
+            preload_backend(name)
+        return ProcessPoolExecutor(max_workers=self.workers, mp_context=_pool_context())
+
+    def try_acquire(self) -> bool:
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            return False
+        return True
+
+    def run(self, pdf_path: str, options: dict) -> list:
+        # caller holds a slot from try_acquire(); it is released here
+        with self._lock:
+            self.in_flight += 1
+            pool = self._pool
+        try:
+            pages, metrics = pool.submit(_extract_job, pdf_path, options, self.cache_dir).result()
+        except BrokenProcessPool:
+            # a worker died (e.g. a native crash on a hostile PDF): replace the pool, fail only this job
+            with self._lock:
+                self.failed += 1
+                if self._pool is pool:
+                    self._pool = self._new_pool()
+            raise
+        except Exception:
+            with self._lock:
+                self.failed += 1
+            raise
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+            self._slots.release()
+        with self._lock:
+            self.completed += 1
+            self.metrics.merge(metrics)
+        return pages
+
+    def queue_state(self) -> dict:
+        with self._lock:
+            return {
+                "in_flight": self.in_flight,
+                "queued": max(0, self.in_flight - self.workers),
+                "workers": self.workers,
+                "capacity": self.workers + self.queue_size,
+                "completed": self.completed,
+                "failed": self.failed,
+                "rejected": self.rejected,
+            }
+
+    def close(self) -> None:
+        self._pool.shutdown(wait=True, cancel_futures=True)
+
+
+def _encode_pages(pages: list, fmt: str, pretty: bool) -> bytes:
+    if fmt == "ndjson":
+        return "".join(json.dumps(p, ensure_ascii=False) + "\n" for p in pages).encode("utf-8")
+    # same bytes as save_extraction()
+    data = {"pages": pages}
+    text = json.dumps(data, indent=2, ensure_ascii=False) if pretty else json.dumps(data, ensure_ascii=False)
+    return text.encode("utf-8")
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = "alltius-serve"
+    protocol_version = "HTTP/1.1"
+
+    @property
+    def service(self) -> ExtractionService:
+        return self.server.service
+
+    def log_message(self, format, *args):
+        logger.debug("%s - %s", self.client_address or "unix", format % args)
+
+    def _send(self, status: int, body: bytes, content_type: str = "application/json", headers: dict | None = None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_json(self, status: int, data: dict, headers: dict | None = None):
+        self._send(status, json.dumps(data).encode("utf-8"), headers=headers)
+
+    def do_GET(self):
+        path = urlparse(self.path).path
+        if path == "/health":
+            self._send_json(200, {"status": "ok", "uptime_seconds": round(time.time() - self.service.started, 1),
+                                  "workers": self.service.workers})
+        elif path == "/queue":
+            self._send_json(200, self.service.queue_state())
+        elif path == "/metrics":
+            self._send(200, self.service.metrics.to_prometheus().encode("utf-8"), "text/plain; version=0.0.4")
+        else:
+            self._send_json(404, {"error": f"no such endpoint: {path}"})
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        if url.path != "/extract":
+            self._send_json(404, {"error": f"no such endpoint: {url.path}"})
+            return
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        fmt = query.pop("format", "json")
+        upload = None
+        try:
+            pretty = _parse_bool(query.pop("pretty", "true"))
+            if fmt not in ("json", "ndjson"):
+                raise ValueError(f"Unknown format {fmt!r}")
+            if self.headers.get("Content-Type", "").startswith("application/json"):
+                # {"path": "/local/file.pdf", "options": {...}}: the server reads the file itself
+                request = json.loads(body or b"{}")
+                pdf_path = request["path"]
+                options = parse_options({**query, **request.get("options", {})})
+                if not os.path.isfile(pdf_path):
+                    raise ValueError(f"No such file: {pdf_path}")
+            else:
+                # raw PDF bytes in the request body
+                if not body:
+                    raise ValueError("Empty request body: send PDF bytes or a JSON {\"path\": ...} request")
+                options = parse_options(query)
+                fd, upload = tempfile.mkstemp(suffix=".pdf", prefix="alltius-")
+                with os.fdopen(fd, "wb") as f:
+                    f.write(body)
+                pdf_path = upload
+        except (ValueError, KeyError, TypeError) as e:
+            self._send_json(400, {"error": str(e)})
+            return
+        try:
+            if not self.service.try_acquire():
+                self._send_json(503, {"error": "server busy", **self.service.queue_state()}, headers={"Retry-After": "1"})
+                return
+            try:
+                pages = self.service.run(pdf_path, options)
+            except Exception as e:
+                logger.warning("Extraction failed for %s: %s", pdf_path, e)
+                self._send_json(500, {"error": f"{type(e).__name__}: {e}"})
+                return
+            content_type = "application/x-ndjson" if fmt == "ndjson" else "application/json"
+            self._send(200, _encode_pages(pages, fmt, pretty), content_type)
+        finally:
+            if upload:
+                os.unlink(upload)
+
+
+class _TCPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+
+class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def make_server(service: ExtractionService, host: str = "127.0.0.1", port: int = 8765, unix_socket: str | None = None):
+    if unix_socket:
+        if os.path.exists(unix_socket):
+            os.unlink(unix_socket)
+        server = _UnixServer(unix_socket, _Handler)
+    else:
+        server = _TCPServer((host, port), _Handler)
+    server.service = service
+    return server
+
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description="Alltius PDF extraction server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix-socket", help="Listen on this Unix socket path instead of TCP")
+    parser.add_argument("--workers", type=int, default=None, help="Extraction worker processes (default: CPU count)")
+    parser.add_argument("--queue-size", type=int, default=16, help="Jobs allowed to wait for a worker before requests get 503")
+    parser.add_argument("--cache-dir", help="Result cache directory shared by all jobs")
+    parser.add_argument("--log-level", default="INFO")
+    args = parser.parse_args()
+    logging.basicConfig(level=getattr(logging, args.log_level.upper(), logging.INFO))
+    service = ExtractionService(workers=args.workers, queue_size=args.queue_size, cache_dir=args.cache_dir)
+    server = make_server(service, args.host, args.port, args.unix_socket)
+    where = args.unix_socket or f"http://{args.host}:{server.server_address[1]}"
+    logger.info("Serving on %s (%d workers, queue %d)", where, service.workers, service.queue_size)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+        if args.unix_socket and os.path.exists(args.unix_socket):
+            os.unlink(args.unix_socket)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+from __future__ import annotations
+from bisect import bisect_right
+from typing import Optional, Sequence, Tuple
+
+Box = Tuple[float, float, float, float]  # (x0, y0, x1, y1), y growing downwards
+
+
+class RegionIndex:
+    # Rectangles (a page's table bboxes) sorted by top edge, for point lookups in O(log n): bisect finds
+    # the last region starting above the point, and a running maximum of bottom edges ends the backwards
+    # scan as soon as no earlier region reaches down to the point (at once, unless regions overlap).
+    def __init__(self, boxes: Sequence[Optional[Box]], margin: float = 1.0):
+        # boxes: None entries (regions without a position) are skipped; lookups return indices into boxes
+        self.margin = margin
+        self._ids = sorted((i for i, b in enumerate(boxes) if b), key=lambda i: boxes[i][1])
+        self._boxes = [boxes[i] for i in self._ids]
+        self._tops = [b[1] - margin for b in self._boxes]
+        self._reach = []
+        bottom = float("-inf")
+        for b in self._boxes:
+            bottom = max(bottom, b[3] + margin)
+            self._reach.append(bottom)
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def find(self, x: float, y: float) -> Optional[int]:
+        # index of a region containing (x, y), within the margin
+        m = self.margin
+        i = bisect_right(self._tops, y) - 1
+        while i >= 0 and self._reach[i] >= y:
+            x0, _y0, x1, y1 = self._boxes[i]
+            if x0 - m <= x <= x1 + m and y <= y1 + m:
+                return self._ids[i]
+            i -= 1
+        return None
+
+    def find_box(self, bbox: Box) -> Optional[int]:
+        # a text line or image block belongs to the region containing its centre
+        return self.find((bbox[0] + bbox[2]) / 2, (bbox[1] + bbox[3]) / 2)
@@ -1,20 +1,255 @@
 from __future__ import annotations
-from typing import List
-import pdfplumber
+from collections import Counter
+from dataclasses import dataclass
+from typing import List, Optional, Protocol, Tuple
+import time
 
+BBox = Tuple[float, float, float, float]
+PageTable = Tuple[List[List[str]], Optional[BBox]]  # (rows, bbox in PyMuPDF page space, as text lines)
 
-def extract_tables(pdf_path: str) -> dict:
+
+def _clean(tbl) -> List[List[str]]:
+    return [[cell if cell is not None else '' for cell in row] for row in tbl]
+
+
+class TableBackend(Protocol):
+    # backends import their engine in preload()/open(), so the library loads only when tables are requested
+    name: str
+    @staticmethod
+    def preload() -> None: ...
+    def open(self, pdf_path: str) -> None: ...
+    def page_tables(self, page_index: int, page) -> List[PageTable]: ...
+    def release(self) -> None: ...  # drop parsed state finished pages no longer need (memory-bounded runs)
+    def close(self) -> None: ...
+
+
+# Registry of backend classes; instances hold per-document state so one is created per document/worker
+_BACKEND_REGISTRY = {}
+
+def register_backend(backend_cls):
+    _BACKEND_REGISTRY[backend_cls.name] = backend_cls
+    return backend_cls
+
+def available_backends() -> List[str]:
+    return sorted(_BACKEND_REGISTRY)
+
+def get_backend(name: str) -> TableBackend:
+    try:
+        return _BACKEND_REGISTRY[name]()
+    except KeyError:
+        raise ValueError(f"Unknown table backend {name!r} (available: {', '.join(available_backends())})") from None
+
+def preload_backend(name: str) -> None:
+    # import a backend's engine ahead of time (e.g. before forking workers that should start warm)
+    if name in _BACKEND_REGISTRY:
+        _BACKEND_REGISTRY[name].preload()
+
+
+def _plumber_to_page(bbox: BBox, frame: BBox, page) -> BBox:
+    # pdfplumber measures from the MediaBox top-left of the rotated page (frame: its page.bbox); PyMuPDF
+    # text is unrotated and measured from the CropBox top-left. Undo the rotation, then move the origin.
+    u0, v0, u1, v1 = bbox[0] - frame[0], bbox[1] - frame[1], bbox[2] - frame[0], bbox[3] - frame[1]
+    width, height = page.mediabox.width, page.mediabox.height
+    rotation = page.rotation
+    if rotation == 90:
+        u0, v0, u1, v1 = v0, height - u1, v1, height - u0
+    elif rotation == 180:
+        u0, v0, u1, v1 = width - u1, height - v1, width - u0, height - v0
+    elif rotation == 270:
+        u0, v0, u1, v1 = width - v1, u0, width - v0, u1
+    dx = page.mediabox.x0 - page.cropbox.x0
+    dy = -page.cropbox.y0
+    return (u0 + dx, v0 + dy, u1 + dx, v1 + dy)
+
+
+@register_backend
+class PdfplumberBackend:
+    # pdfplumber pages are opened lazily, one at a time, alongside the PyMuPDF pass
+    name = "pdfplumber"
+
+    def __init__(self):
+        self._pdf = None
+
+    @staticmethod
+    def preload() -> None:
+        import pdfplumber  # noqa: F401
+
+    def open(self, pdf_path: str) -> None:
+        import pdfplumber
+        self._pdf = pdfplumber.open(pdf_path)
+
+    def page_tables(self, page_index: int, page) -> List[PageTable]:
+        plumber_page = self._pdf.pages[page_index]
+        try:
+            tables = plumber_page.find_tables()
+            return [(_clean(tbl.extract()), _plumber_to_page(tbl.bbox, plumber_page.bbox, page)) for tbl in tables]
+        except Exception:
+            return []
+        finally:
+            plumber_page.close()  # drop cached layout objects once the page is done
+
+    def release(self) -> None:
+        # pdfminer keeps every PDF object it has resolved for the life of the document
+        cached = getattr(getattr(self._pdf, "doc", None), "_cached_objs", None)
+        if cached is not None:
+            cached.clear()
+
+    def close(self) -> None:
+        if self._pdf is not None:
+            if "_pages" in vars(self._pdf):
+                self._pdf.close()
+            else:
+                # no page was used: PDF.close() would parse the whole page tree just to close it
+                self._pdf.flush_cache()
+                self._pdf.stream.close()
+            self._pdf = None
+
+
+@register_backend
+class PyMuPDFBackend:
+    # PyMuPDF's table finder on the already-open fitz page: no second parse of the file
+    name = "pymupdf"
+
+    @staticmethod
+    def preload() -> None:
+        pass
+
+    def open(self, pdf_path: str) -> None:
+        pass
+
+    def page_tables(self, page_index: int, page) -> List[PageTable]:
+        try:
+            finder = page.find_tables()
+        except Exception:
+            return []
+        return [(_clean(tbl.extract()), tuple(tbl.bbox)) for tbl in finder.tables]
+
+    def release(self) -> None:
+        pass  # shares the fitz document; its store is shrunk by the extractor
+
+    def close(self) -> None:
+        pass
+
+
+# Prefilter thresholds: a ruled table needs at least a 1x1 cell grid, an unruled one
+# a few text columns that line up over several rows
+_MIN_EDGE_LEN = 6.0
+_MIN_H_EDGES = 2
+_MIN_V_EDGES = 2
+_MIN_ALIGNED_COLUMNS = 3
+_MIN_ALIGNED_ROWS = 3
+
+
+def _ruling_edges(page) -> Tuple[set, set]:
+    horizontal, vertical = set(), set()
+    for path in page.get_cdrawings():
+        for item in path.get("items", []):
+            kind = item[0]
+            if kind == "l":
+                (x0, y0), (x1, y1) = item[1], item[2]
+                if abs(y0 - y1) < 1 and abs(x1 - x0) >= _MIN_EDGE_LEN:
+                    horizontal.add(round(y0))
+                elif abs(x0 - x1) < 1 and abs(y1 - y0) >= _MIN_EDGE_LEN:
+                    vertical.add(round(x0))
+            elif kind in ("re", "qu"):
+                if kind == "re":
+                    x0, y0, x1, y1 = item[1]
+                else:
+                    xs = [pt[0] for pt in item[1]]
+                    ys = [pt[1] for pt in item[1]]
+                    x0, y0, x1, y1 = min(xs), min(ys), max(xs), max(ys)
+                if abs(x1 - x0) >= _MIN_EDGE_LEN:
+                    horizontal.update((round(y0), round(y1)))
+                if abs(y1 - y0) >= _MIN_EDGE_LEN:
+                    vertical.update((round(x0), round(x1)))
+    return horizontal, vertical
+
+
+def _dict_span_origins(page_dict: dict):
+    for block in page_dict.get("blocks", []):
+        for line in block.get("lines", []):
+            for span in line.get("spans", []):
+                if span.get("text", "").strip():
+                    yield span.get("bbox", (0, 0, 0, 0))[:2]
+
+
+def _aligned_columns(span_origins) -> int:
+    # span start positions shared by several multi-cell rows
+    rows = {}
+    for x0, y0 in span_origins:
+        rows.setdefault(round(y0 / 2), set()).add(round(x0))
+    column_hits = Counter()
+    for xs in rows.values():
+        if len(xs) >= 2:
+            column_hits.update(xs)
+    return sum(1 for hits in column_hits.values() if hits >= _MIN_ALIGNED_ROWS)
+
+
+def page_may_have_tables(page, span_origins=None) -> bool:
+    # span_origins: (x0, y0) of the page's non-blank text spans, if the caller already has them
+    horizontal, vertical = _ruling_edges(page)
+    if len(horizontal) >= _MIN_H_EDGES and len(vertical) >= _MIN_V_EDGES:
+        return True
+    if span_origins is None:
+        span_origins = _dict_span_origins(page.get_text("dict"))
+    return _aligned_columns(span_origins) >= _MIN_ALIGNED_COLUMNS
+
+
+@dataclass
+class TableDetectionStats:
+    pages_checked: int = 0    # pages evaluated by the prefilter
+    pages_skipped: int = 0    # pages never handed to the detector
+    pages_detected: int = 0   # pages the detector ran on
+    pages_missed: int = 0     # forced runs only: tables found on pages the prefilter would skip
+    prefilter_seconds: float = 0.0
+    detect_seconds: float = 0.0
+
+    def merge(self, other: "TableDetectionStats") -> None:
+        self.pages_checked += other.pages_checked
+        self.pages_skipped += other.pages_skipped
+        self.pages_detected += other.pages_detected
+        self.pages_missed += other.pages_missed
+        self.prefilter_seconds += other.prefilter_seconds
+        self.detect_seconds += other.detect_seconds
+
+    @property
+    def seconds_saved(self) -> float:
+        # estimate: skipped pages at the mean detector cost, minus what the prefilter itself cost
+        if not self.pages_detected:
+            return 0.0
+        return self.pages_skipped * self.detect_seconds / self.pages_detected - self.prefilter_seconds
+
+
+def detect_page_tables(engine: TableBackend, page_index: int, page, span_origins=None,
+                       force: bool = False, stats: Optional[TableDetectionStats] = None) -> List[PageTable]:
+    stats = stats if stats is not None else TableDetectionStats()
+    t0 = time.perf_counter()
+    likely = page_may_have_tables(page, span_origins)
+    t1 = time.perf_counter()
+    stats.pages_checked += 1
+    stats.prefilter_seconds += t1 - t0
+    if not likely and not force:
+        stats.pages_skipped += 1
+        return []
+    tables = engine.page_tables(page_index, page)
+    stats.detect_seconds += time.perf_counter() - t1
+    stats.pages_detected += 1
+    if tables and not likely:
+        stats.pages_missed += 1
+    return tables
+
+
+def extract_tables(pdf_path: str, backend: str = "pdfplumber", force: bool = False) -> dict:
+    import fitz
     tables = {}
-    with pdfplumber.open(pdf_path) as pdf:
-        for i, page in enumerate(pdf.pages, start=1):
-            page_tables = []
-            try:
-                extracted = page.extract_tables() or []
-                for tbl in extracted:
-                    cleaned = [[cell if cell is not None else '' for cell in row] for row in tbl]
-                    page_tables.append(cleaned)
-            except Exception:
-                continue
-            if page_tables:
-                tables[i] = page_tables
+    engine = get_backend(backend)
+    engine.open(pdf_path)
+    try:
+        with fitz.open(pdf_path) as doc:
+            for i, page in enumerate(doc):
+                page_tables = [rows for rows, _bbox in detect_page_tables(engine, i, page, force=force)]
+                if page_tables:
+                    tables[i + 1] = page_tables
+    finally:
+        engine.close()
     return tables
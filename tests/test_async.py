@@ -0,0 +1,100 @@
+import asyncio
+import sys
+from contextlib import aclosing
+from pathlib import Path
+import pytest
+from reportlab.pdfgen import canvas
+from reportlab.lib.pagesizes import LETTER
+
+ROOT = Path(__file__).resolve().parent.parent
+SRC = ROOT / 'src'
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+from alltius_ai import aiter_pages, extract_pdf_async
+from alltius_ai.aio import DEFAULT_MAX_CONCURRENCY, set_max_concurrency
+from alltius_ai.pdf_extractor import extract_pdf
+
+
+def build_pdf(path: Path, pages: int = 60):
+    c = canvas.Canvas(str(path), pagesize=LETTER)
+    for i in range(pages):
+        if i % 20 == 0:
+            c.setFont("Helvetica-Bold", 18)
+            c.drawString(72, 740, f"{i // 20 + 1} Chapter {i // 20 + 1}")
+        c.setFont("Helvetica", 11)
+        for j in range(20):
+            c.drawString(72, 700 - 25 * j, f"Page {i + 1} line {j + 1} with some text.")
+        c.showPage()
+    c.save()
+
+
+def test_async_extraction_matches_sync_and_bounds_concurrency(tmp_path):
+    pdf_file = tmp_path / "doc.pdf"
+    build_pdf(pdf_file)
+    expected = extract_pdf(str(pdf_file)).to_dict()
+
+    async def main():
+        semaphore = asyncio.Semaphore(2)
+        running = peak = 0
+
+        async def job():
+            nonlocal running, peak
+            pages = []
+            async with aclosing(aiter_pages(str(pdf_file), semaphore=semaphore, table_backend=None)) as it:
+                async for page in it:
+                    if not pages:
+                        running += 1
+                        peak = max(peak, running)
+                    pages.append(page)
+            running -= 1
+            return pages
+
+        results = await asyncio.gather(*(job() for _ in range(4)))
+        result = await extract_pdf_async(str(pdf_file), semaphore=semaphore)
+        return results, result, peak, semaphore
+
+    results, result, peak, semaphore = asyncio.run(main())
+    assert result.to_dict() == expected
+    assert all(len(pages) == 60 for pages in results) and peak <= 2
+    assert semaphore._value == 2
+
+
+def test_async_timeout_and_cancellation_release_the_slot(tmp_path):
+    pdf_file = tmp_path / "doc.pdf"
+    build_pdf(pdf_file, pages=200)
+
+    async def main():
+        semaphore = asyncio.Semaphore(1)
+        with pytest.raises(TimeoutError):
+            await extract_pdf_async(str(pdf_file), semaphore=semaphore, timeout=0.01)
+        task = asyncio.create_task(extract_pdf_async(str(pdf_file), semaphore=semaphore))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        # the slot is free again: a following document runs to completion
+        result = await extract_pdf_async(str(pdf_file), semaphore=semaphore, pages="1-3")
+        return result, semaphore
+
+    result, semaphore = asyncio.run(main())
+    assert [p.page_number for p in result.pages] == [1, 2, 3] and semaphore._value == 1
+
+
+def test_changing_the_limit_does_not_break_running_documents(tmp_path):
+    pdf_file = tmp_path / "doc.pdf"
+    build_pdf(pdf_file, pages=10)
+
+    async def main():
+        pages = []
+        async with aclosing(aiter_pages(str(pdf_file), table_backend=None)) as it:
+            async for page in it:
+                if not pages:
+                    set_max_concurrency(2)
+                pages.append(page)
+        return pages
+
+    try:
+        assert len(asyncio.run(main())) == 10
+    finally:
+        set_max_concurrency(DEFAULT_MAX_CONCURRENCY)
@@ -0,0 +1,85 @@
+import json
+import os
+import sys
+from pathlib import Path
+from reportlab.pdfgen import canvas
+from reportlab.lib.pagesizes import LETTER
+
+ROOT = Path(__file__).resolve().parent.parent
+SRC = ROOT / 'src'
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+from alltius_ai import batch
+from alltius_ai.batch import BatchJob, collect_jobs, run_batch
+from alltius_ai.pdf_extractor import extract_pdf
+
+
+def build_pdf(path: Path, pages: int = 2):
+    c = canvas.Canvas(str(path), pagesize=LETTER)
+    for i in range(pages):
+        c.setFont("Helvetica-Bold", 18)
+        c.drawString(72, 730, f"{i + 1} Part {i + 1}")
+        c.setFont("Helvetica", 12)
+        c.drawString(72, 700, f"Text on page {i + 1}.")
+        c.drawString(72, 680, "More body text.")
+        c.showPage()
+    c.save()
+
+
+def test_collect_jobs_from_dir_glob_and_manifest(tmp_path):
+    for name in ("b.pdf", "a.pdf"):
+        build_pdf(tmp_path / name)
+    (tmp_path / "notes.txt").write_text("skip me")
+    out = tmp_path / "out"
+    jobs = collect_jobs(str(tmp_path), str(out))
+    assert [Path(j.input).name for j in jobs] == ["a.pdf", "b.pdf"]
+    assert jobs[0].output == str(out / "a.json")
+    assert [Path(j.input).name for j in collect_jobs(str(tmp_path / "*.pdf"), str(out), fmt="ndjson")] == ["a.pdf", "b.pdf"]
+    manifest = tmp_path / "jobs.jsonl"
+    manifest.write_text(json.dumps({"input": str(tmp_path / "a.pdf"), "output": str(tmp_path / "x.json")}) + "\n\n")
+    assert collect_jobs(str(manifest)) == [BatchJob(str(tmp_path / "a.pdf"), str(tmp_path / "x.json"))]
+
+
+def test_batch_isolates_failures(tmp_path):
+    good = tmp_path / "good.pdf"
+    build_pdf(good, pages=3)
+    broken = tmp_path / "broken.pdf"
+    broken.write_bytes(b"not a pdf")
+    out = tmp_path / "out"
+    jobs = collect_jobs(str(tmp_path), str(out))
+    summary = run_batch(jobs, concurrency=2)
+    assert summary.succeeded == 1
+    assert summary.pages == 3
+    assert [Path(o.job.input).name for o in summary.failures] == ["broken.pdf"]
+    with open(out / "good.json", encoding="utf-8") as f:
+        assert json.load(f) == extract_pdf(str(good)).to_dict()
+    assert "1 failed" in summary.format()
+
+
+
+def test_batch_ignores_parallel_page_extraction(tmp_path):
+    # jobs run in daemonic processes, which cannot start page worker pools
+    build_pdf(tmp_path / "a.pdf", pages=3)
+    summary = run_batch(collect_jobs(str(tmp_path), str(tmp_path / "out")), options={"parallel": True, "workers": 2})
+    assert summary.succeeded == 1 and not summary.failures
+
+def _hang(*args):
+    import time
+    time.sleep(60)
+
+
+def _crash(*args):
+    os._exit(3)
+
+
+def test_batch_timeout_and_crash(tmp_path, monkeypatch):
+    pdf = tmp_path / "doc.pdf"
+    build_pdf(pdf)
+    jobs = [BatchJob(str(pdf), str(tmp_path / "doc.json"))]
+    monkeypatch.setattr(batch, "_run_job", _hang)
+    summary = run_batch(jobs, timeout=0.5)
+    assert "timed out" in summary.failures[0].error
+    monkeypatch.setattr(batch, "_run_job", _crash)
+    summary = run_batch(jobs)
+    assert summary.failures[0].error == "worker exited with code 3"
@@ -0,0 +1,81 @@
+import os
+import sys
+import time
+from pathlib import Path
+from reportlab.pdfgen import canvas
+from reportlab.lib.pagesizes import LETTER
+
+ROOT = Path(__file__).resolve().parent.parent
+SRC = ROOT / 'src'
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+from alltius_ai.cache import ResultCache
+from alltius_ai.models import ExtractionResult
+from alltius_ai.pdf_extractor import extract_pdf
+
+
+def build_pdf(path: Path, body: str = "Body text."):
+    c = canvas.Canvas(str(path), pagesize=LETTER)
+    c.setFont("Helvetica-Bold", 18)
+    c.drawString(72, 730, "1. Summary")
+    c.setFont("Helvetica", 12)
+    c.drawString(72, 700, body)
+    c.drawString(72, 40, "Footnote text")
+    c.showPage()
+    c.save()
+
+
+def test_from_dict_round_trip(tmp_path):
+    pdf_file = tmp_path / "doc.pdf"
+    build_pdf(pdf_file)
+    data = extract_pdf(str(pdf_file)).to_dict()
+    assert ExtractionResult.from_dict(data).to_dict() == data
+
+
+def test_cache_hit_miss_and_options(tmp_path):
+    pdf_file = tmp_path / "doc.pdf"
+    build_pdf(pdf_file)
+    cache = ResultCache(str(tmp_path / "cache"))
+    first = extract_pdf(str(pdf_file), cache=cache)
+    second = extract_pdf(str(pdf_file), cache=cache)
+    assert second.to_dict() == first.to_dict()
+    assert (cache.stats.hits, cache.stats.misses) == (1, 1)
+    assert cache.stats.bytes_saved == os.path.getsize(pdf_file)
+    # an output-affecting option is part of the key
+    extract_pdf(str(pdf_file), cache=cache, merge_lines=False)
+    assert cache.stats.misses == 2
+    # so is the file content
+    build_pdf(pdf_file, body="Changed text.")
+    changed = extract_pdf(str(pdf_file), cache=cache)
+    assert cache.stats.misses == 3
+    assert "Changed text." in str(changed.to_dict())
+
+
+
+def test_cache_hit_keeps_bboxes(tmp_path):
+    from alltius_ai.columnar import block_rows
+    pdf_file = tmp_path / "doc.pdf"
+    build_pdf(pdf_file)
+    cache = ResultCache(str(tmp_path / "cache"))
+    miss = extract_pdf(str(pdf_file), cache=cache)
+    hit = extract_pdf(str(pdf_file), cache=cache)
+    assert cache.stats.hits == 1
+    rows = [list(block_rows(page)) for page in miss.pages]
+    assert rows == [list(block_rows(page)) for page in hit.pages]
+    assert all(block.bbox is not None for block in hit.pages[0].content if block.type == "paragraph")
+
+def test_cache_eviction(tmp_path):
+    pdf_file = tmp_path / "doc.pdf"
+    build_pdf(pdf_file)
+    cache = ResultCache(str(tmp_path / "cache"), max_age=60)
+    result = extract_pdf(str(pdf_file))
+    cache.put("old", result)
+    past = time.time() - 120
+    os.utime(tmp_path / "cache" / "old.json.gz", (past, past))
+    cache.put("new", result)
+    assert not (tmp_path / "cache" / "old.json.gz").exists()
+    small = ResultCache(str(tmp_path / "small"), max_bytes=1)
+    small.put("a", result)
+    assert list((tmp_path / "small").glob("*.json.gz")) == []
+    assert small.stats.evictions == 1
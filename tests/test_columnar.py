@@ -0,0 +1,69 @@
+import sys
+from pathlib import Path
+
+import pytest
+from reportlab.pdfgen import canvas
+from reportlab.lib.pagesizes import LETTER
+
+ROOT = Path(__file__).resolve().parent.parent
+SRC = ROOT / 'src'
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+from alltius_ai.columnar import load_columnar, save_columnar
+from alltius_ai.models import ChartBlock, PageResult, TableBlock
+from alltius_ai.pdf_extractor import extract_pdf
+
+
+def build_pdf(path: Path):
+    c = canvas.Canvas(str(path), pagesize=LETTER)
+    c.setFont("Helvetica-Bold", 18)
+    c.drawString(72, 730, "1 Results")
+    c.setFont("Helvetica", 12)
+    c.drawString(72, 700, "Quarterly figures follow.")
+    y = 660
+    for row in (("Region", "Q1", "Q2"), ("North", "10", "12"), ("South", "7", "9")):
+        for j, cell in enumerate(row):
+            c.drawString(72 + 120 * j, y, cell)
+        y -= 20
+    for x in (66, 186, 306, 426):
+        c.line(x, 675, x, 615)
+    for y in (675, 655, 635, 615):
+        c.line(66, y, 426, y)
+    c.showPage()
+    c.showPage()  # empty page: kept in the page list
+    c.save()
+
+
+def _bboxes(result):
+    return [getattr(b, "bbox", None) for p in result.pages for b in p.content]
+
+
+@pytest.mark.parametrize("fmt,module", [("parquet", "pyarrow"), ("arrow", "pyarrow"), ("msgpack", "msgpack")])
+def test_columnar_round_trip(tmp_path, fmt, module):
+    pytest.importorskip(module)
+    pdf_file = tmp_path / "doc.pdf"
+    build_pdf(pdf_file)
+    result = extract_pdf(str(pdf_file))
+    assert any(isinstance(b, TableBlock) for b in result.pages[0].content)
+    result.pages.append(PageResult(3, [TableBlock("table", 3, table_data=[[]]), ChartBlock("chart", 3, extracted_data=[])]))
+    result.metadata["source"] = "test"
+    out = tmp_path / f"doc.{fmt}"
+    assert save_columnar(result, str(out), fmt=fmt) == 3
+    back = load_columnar(str(out))
+    assert back.to_dict() == result.to_dict()
+    assert _bboxes(back) == _bboxes(result)
+
+
+def test_parquet_rows_per_block(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    pdf_file = tmp_path / "doc.pdf"
+    build_pdf(pdf_file)
+    result = extract_pdf(str(pdf_file))
+    save_columnar(result, str(tmp_path / "doc.parquet"))
+    rows = pq.read_table(str(tmp_path / "doc.parquet")).to_pylist()
+    assert len(rows) == sum(len(p.content) for p in result.pages)
+    table = next(r for r in rows if r["type"] == "table")
+    assert table["rows"][1] == ["North", "10", "12"]
+    assert [r["section"] for r in rows if r["text"] == "Quarterly figures follow."] == ["1 Results"]
+    assert all(r["x0"] is not None for r in rows if r["type"] == "paragraph")
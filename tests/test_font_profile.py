@@ -0,0 +1,54 @@
+import sys
+from pathlib import Path
+from reportlab.pdfgen import canvas
+from reportlab.lib.pagesizes import LETTER
+
+ROOT = Path(__file__).resolve().parent.parent
+SRC = ROOT / 'src'
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+from alltius_ai.heading_detection import profile_sample
+from alltius_ai.pdf_extractor import extract_pdf
+
+
+def build_pdf(path: Path):
+    c = canvas.Canvas(str(path), pagesize=LETTER)
+    c.setFont("Helvetica-Bold", 16)
+    c.drawString(72, 730, "1 Introduction")
+    c.setFont("Helvetica", 11)
+    for i in range(8):
+        c.drawString(72, 700 - 20 * i, f"Body text line {i + 1}.")
+    c.showPage()
+    # sparse page: every size occurs once, so the page's own median (14pt) would hide the heading
+    c.setFont("Helvetica-Bold", 14)
+    c.drawString(72, 730, "Appendix")
+    c.setFont("Helvetica", 11)
+    c.drawString(72, 700, "Closing remarks.")
+    c.showPage()
+    c.save()
+
+
+def _sections(result):
+    return [(b.text, b.section, b.sub_section) for p in result.pages for b in p.content]
+
+
+def test_sparse_page_uses_document_body_size(tmp_path):
+    pdf_file = tmp_path / "doc.pdf"
+    build_pdf(pdf_file)
+    kwargs = dict(merge_lines=False, table_backend=None)
+    result = extract_pdf(str(pdf_file), **kwargs)
+    assert result.stats["font_profile"].body_size == 11
+    assert result.stats["font_profile"].heading_sizes == (16, 14)
+    assert result.stats["font_profile"].heading_bold == (1.0, 1.0)
+    assert _sections(result)[-1] == ("Closing remarks.", "1 Introduction", "Appendix")
+    # the profile is computed once in the parent and shipped to page workers
+    assert _sections(extract_pdf(str(pdf_file), parallel=True, workers=2, **kwargs)) == _sections(result)
+    assert _sections(extract_pdf(str(pdf_file), pages="2", **kwargs))[-1] == _sections(result)[-1]
+    assert _sections(extract_pdf(str(pdf_file), font_stats="page", **kwargs))[-1] == ("Closing remarks.", "1 Introduction", None)
+
+
+def test_profile_sample_is_even_and_bounded():
+    assert profile_sample(5) == [0, 1, 2, 3, 4]
+    sample = profile_sample(1000, sample=10)
+    assert sample == [0, 100, 200, 300, 400, 500, 600, 700, 800, 900]
@@ -0,0 +1,108 @@
+import sys
+from pathlib import Path
+import pytest
+from reportlab.pdfgen import canvas
+from reportlab.lib.pagesizes import LETTER
+
+ROOT = Path(__file__).resolve().parent.parent
+SRC = ROOT / 'src'
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+from alltius_ai.models import ExtractionResult
+from alltius_ai.pdf_extractor import extract_pdf
+
+
+def build_pdf(path: Path, pages: int = 30, edits=None, heading_at=None, insert_at=None):
+    edits = edits or {}
+    order = list(range(pages))
+    if insert_at is not None:
+        order.insert(insert_at, None)
+    c = canvas.Canvas(str(path), pagesize=LETTER)
+    for i in order:
+        c.setFont("Helvetica", 11)
+        if i is None:
+            c.drawString(72, 700, "Inserted erratum page.")
+            c.showPage()
+            continue
+        if i % 10 == 0:
+            c.setFont("Helvetica-Bold", 18)
+            c.drawString(72, 740, f"{i // 10 + 1} Chapter {i // 10 + 1}")
+        if i == heading_at:
+            c.setFont("Helvetica-Bold", 18)
+            c.drawString(72, 720, "9 Appendix")
+        c.setFont("Helvetica", 11)
+        for j in range(6):
+            c.drawString(72, 680 - 30 * j, edits.get(i, f"Page {i + 1} paragraph {j + 1}.") if j == 2 else f"Page {i + 1} paragraph {j + 1}.")
+        c.showPage()
+    c.save()
+
+
+@pytest.mark.parametrize("revision, extracted, resynced", [
+    (dict(edits={4: "Corrected text.", 25: "Another fix."}), 2, 0),
+    # a new level-1 heading changes the section state entering the pages after it, up to the next chapter
+    (dict(heading_at=12), 9, 8),
+    # pages after an inserted page are matched by content and renumbered
+    (dict(insert_at=15), 1, 0),
+])
+def test_incremental_extraction_matches_full_run(tmp_path, revision, extracted, resynced):
+    build_pdf(tmp_path / "v1.pdf")
+    build_pdf(tmp_path / "v2.pdf", **revision)
+    previous = extract_pdf(str(tmp_path / "v1.pdf"), fingerprints=True)
+    assert len(previous.metadata["fingerprints"]["pages"]) == 30
+    # the stored result works as well as the in-memory one
+    previous = ExtractionResult.from_dict(previous.to_dict())
+    result = extract_pdf(str(tmp_path / "v2.pdf"), previous=previous)
+    assert result.to_dict() == extract_pdf(str(tmp_path / "v2.pdf"), fingerprints=True).to_dict()
+    stats = result.stats["incremental"]
+    assert (stats["extracted_pages"], stats["resynced_pages"]) == (extracted, resynced)
+
+
+
+def test_fingerprints_do_not_depend_on_execution_mode(tmp_path):
+    build_pdf(tmp_path / "v1.pdf", pages=12)
+    serial = extract_pdf(str(tmp_path / "v1.pdf"), fingerprints=True)
+    parallel = extract_pdf(str(tmp_path / "v1.pdf"), fingerprints=True, parallel=True, workers=2)
+    assert serial.metadata["fingerprints"]["body_size"] is not None
+    assert parallel.to_dict() == serial.to_dict()
+
+def test_incremental_extraction_needs_matching_fingerprints(tmp_path):
+    build_pdf(tmp_path / "v1.pdf", pages=3)
+    with pytest.raises(ValueError):
+        extract_pdf(str(tmp_path / "v1.pdf"), previous=extract_pdf(str(tmp_path / "v1.pdf")))
+    previous = extract_pdf(str(tmp_path / "v1.pdf"), fingerprints=True)
+    # other output options: nothing is reused
+    result = extract_pdf(str(tmp_path / "v1.pdf"), previous=previous, merge_lines=False)
+    assert result.stats["incremental"]["reused_pages"] == 0
+
+
+def test_cli_previous_with_result_cache(tmp_path, monkeypatch):
+    from alltius_ai.cli import main
+    build_pdf(tmp_path / "v1.pdf", pages=3)
+    build_pdf(tmp_path / "v2.pdf", pages=3, edits={1: "Corrected text."})
+    monkeypatch.setattr(sys, "argv", ["alltius-extract", str(tmp_path / "v1.pdf"), "--fingerprints", "--out", str(tmp_path / "v1.json")])
+    main()
+    for run in ("a", "b"):
+        # the second run is served by the cache, which keeps no incremental stats
+        monkeypatch.setattr(sys, "argv", ["alltius-extract", str(tmp_path / "v2.pdf"), "--previous", str(tmp_path / "v1.json"),
+                                          "--cache-dir", str(tmp_path / "cache"), "--out", str(tmp_path / f"{run}.json")])
+        main()
+    assert (tmp_path / "a.json").read_bytes() == (tmp_path / "b.json").read_bytes()
+
+
+def test_plugin_output_is_not_carried_over(tmp_path):
+    from alltius_ai.plugins import run_plugins
+    build_pdf(tmp_path / "v1.pdf", pages=12)
+    build_pdf(tmp_path / "v2.pdf", pages=12, edits={4: "Corrected text.", 10: "Another fix."})
+    previous = extract_pdf(str(tmp_path / "v1.pdf"), fingerprints=True)
+    run_plugins(previous, ["wordcount"])
+    assert previous.metadata["fingerprints"]["plugins"] == ["wordcount"]
+    previous = ExtractionResult.from_dict(previous.to_dict())
+    result = extract_pdf(str(tmp_path / "v2.pdf"), previous=previous)
+    assert result.stats["incremental"]["reused_pages"] == 10
+    full = extract_pdf(str(tmp_path / "v2.pdf"), fingerprints=True)
+    assert result.to_dict() == full.to_dict()
+    # with the plugins run again, the output matches a full run with plugins
+    run_plugins(result, ["wordcount"])
+    run_plugins(full, ["wordcount"])
+    assert result.to_dict() == full.to_dict()
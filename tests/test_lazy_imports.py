@@ -0,0 +1,36 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+SRC = ROOT / 'src'
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+
+def _loaded_after(code: str) -> set:
+    probe = code + "; import sys; print(' '.join(m for m in ('fitz', 'pdfplumber') if m in sys.modules))"
+    env = {**os.environ, "PYTHONPATH": str(SRC)}
+    out = subprocess.run([sys.executable, "-c", probe], capture_output=True, text=True, env=env, check=True)
+    return set(out.stdout.splitlines()[-1].split())
+
+
+def test_package_and_cli_import_without_heavy_backends():
+    assert _loaded_after("import alltius_ai") == set()
+    assert _loaded_after("import alltius_ai.cli") == set()
+    # the public API still resolves on first use
+    assert _loaded_after("import alltius_ai; alltius_ai.extract_pdf") == {"fitz"}
+
+
+def test_no_tables_skips_table_backend(tmp_path):
+    from reportlab.pdfgen import canvas
+    pdf_file = tmp_path / "doc.pdf"
+    c = canvas.Canvas(str(pdf_file))
+    c.drawString(72, 700, "Hello")
+    c.save()
+    out = tmp_path / "out.json"
+    code = (f"import sys; sys.argv = ['x', {str(pdf_file)!r}, '--out', {str(out)!r}, '--no-tables', '--log-level', 'WARNING']; "
+            "from alltius_ai.cli import main; main()")
+    assert _loaded_after(code) == {"fitz"}
+    assert out.exists()
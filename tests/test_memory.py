@@ -0,0 +1,62 @@
+import sys
+from pathlib import Path
+from reportlab.pdfgen import canvas
+from reportlab.lib.pagesizes import LETTER
+
+ROOT = Path(__file__).resolve().parent.parent
+SRC = ROOT / 'src'
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+from alltius_ai.cache import ResultCache
+from alltius_ai.memory import PageStore
+from alltius_ai.models import PageResult
+from alltius_ai.pdf_extractor import _shard_pages, extract_pdf, save_extraction
+
+
+def build_pdf(path: Path, pages: int = 40):
+    c = canvas.Canvas(str(path), pagesize=LETTER)
+    for i in range(pages):
+        if i % 10 == 0:
+            c.setFont("Helvetica-Bold", 18)
+            c.drawString(72, 740, f"{i // 10 + 1} Chapter {i // 10 + 1}")
+        c.setFont("Helvetica", 11)
+        for j in range(5):
+            c.drawString(72, 700 - 30 * j, f"Page {i + 1} paragraph {j + 1}.")
+        c.showPage()
+    c.save()
+
+
+def test_memory_budget_spills_pages_with_identical_output(tmp_path):
+    pdf_file = tmp_path / "doc.pdf"
+    build_pdf(pdf_file)
+    expected = extract_pdf(str(pdf_file))
+    # a zero budget spills every page; 40 pages also cross a document-state release window
+    result = extract_pdf(str(pdf_file), memory_budget_mb=0)
+    assert isinstance(result.pages, PageStore)
+    assert result.stats["memory"]["spilled_pages"] == 40 and result.stats["memory"]["peak_rss_mb"] > 0
+    assert result.to_dict() == expected.to_dict()
+    assert result.pages[-1].page_number == 40 and [p.page_number for p in result.pages[3:5]] == [4, 5]
+    expected.metadata["source"] = result.metadata["source"] = "test"
+    for pretty in (True, False):
+        save_extraction(expected, str(tmp_path / "a.json"), pretty=pretty)
+        save_extraction(result, str(tmp_path / "b.json"), pretty=pretty)
+        assert (tmp_path / "a.json").read_bytes() == (tmp_path / "b.json").read_bytes()
+    cache = ResultCache(str(tmp_path / "cache"))
+    cache.put("k", result)
+    assert cache.get("k").to_dict() == expected.to_dict()
+    parallel = extract_pdf(str(pdf_file), memory_budget_mb=0, parallel=True, workers=2)
+    assert parallel.to_dict() == extract_pdf(str(pdf_file)).to_dict()
+
+
+def test_page_store_keeps_pages_in_memory_under_budget():
+    store = PageStore(budget_mb=1e9)
+    store.append(PageResult(1))
+    store.append(PageResult(2))
+    assert store.spilled == 0 and [p.page_number for p in store] == [1, 2]
+
+
+def test_shards_are_capped_by_page_window():
+    shards = _shard_pages(range(100), workers=1, max_size=32)
+    assert max(len(s) for s in shards) <= 32
+    assert [i for s in shards for i in s] == list(range(100))
@@ -0,0 +1,75 @@
+import json
+import sys
+from pathlib import Path
+from reportlab.pdfgen import canvas
+from reportlab.lib.pagesizes import LETTER
+
+ROOT = Path(__file__).resolve().parent.parent
+SRC = ROOT / 'src'
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+from alltius_ai.metrics import Metrics, NULL_METRICS
+from alltius_ai.models import ExtractionResult
+from alltius_ai.pdf_extractor import extract_pdf, iter_pages, save_extraction, save_extraction_stream
+
+
+def build_pdf(path: Path, pages: int = 3):
+    c = canvas.Canvas(str(path), pagesize=LETTER)
+    for i in range(pages):
+        c.setFont("Helvetica-Bold", 18)
+        c.drawString(72, 730, f"{i + 1} Part {i + 1}")
+        c.setFont("Helvetica", 12)
+        c.drawString(72, 700, f"Text on page {i + 1}.")
+        c.drawString(72, 680, "More body text.")
+        c.showPage()
+    c.save()
+
+
+def test_metrics_recorded_and_attached(tmp_path):
+    pdf_file = tmp_path / "doc.pdf"
+    build_pdf(pdf_file)
+    events = []
+    metrics = Metrics(listener=lambda kind, name, value: events.append((kind, name)))
+    result = extract_pdf(str(pdf_file), metrics=metrics, attach_metrics=True)
+    assert metrics.counters["pages"] == 3
+    assert metrics.counters["lines"] >= 9
+    for stage in ("text", "headings", "tables", "sections", "merge", "footnotes", "extract"):
+        assert stage in metrics.timers
+    assert metrics.timers["text"][1] == 3
+    assert ("count", "pages") in events
+    out = tmp_path / "out.json"
+    save_extraction(result, str(out), metrics=metrics)
+    assert metrics.seconds("serialize") > 0
+    data = json.loads(out.read_text(encoding="utf-8"))
+    assert data["metadata"]["metrics"]["counters"]["pages"] == 3
+    assert ExtractionResult.from_dict(data).metadata == result.metadata
+    # without metrics the output carries no metadata key
+    assert "metadata" not in extract_pdf(str(pdf_file)).to_dict()
+
+
+def test_prometheus_export_and_stream_serialize(tmp_path):
+    pdf_file = tmp_path / "doc.pdf"
+    build_pdf(pdf_file)
+    metrics = Metrics()
+    save_extraction_stream(iter_pages(str(pdf_file), metrics=metrics), str(tmp_path / "o.ndjson"), fmt="ndjson", metrics=metrics)
+    text = metrics.to_prometheus()
+    assert "# TYPE alltius_stage_seconds summary" in text
+    assert 'alltius_stage_seconds_count{stage="text"} 3' in text
+    assert 'alltius_stage_seconds_count{stage="serialize"} 1' in text
+    assert "alltius_pages_total 3" in text
+    # large counters are exported exactly
+    metrics.incr("ocr_bytes", 1234567)
+    metrics.incr("spill_bytes", 12345678901)
+    text = metrics.to_prometheus()
+    assert "alltius_ocr_bytes_total 1234567" in text.splitlines()
+    assert "alltius_spill_bytes_total 12345678901" in text.splitlines()
+
+
+def test_null_metrics_records_nothing():
+    with NULL_METRICS.timer("x"):
+        NULL_METRICS.incr("y")
+    NULL_METRICS.add_time("z", 1.0)
+    assert not NULL_METRICS.enabled
+    assert NULL_METRICS.to_dict() == {"timers": {}, "counters": {}}
+    assert NULL_METRICS.to_prometheus() == ""
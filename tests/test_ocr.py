@@ -0,0 +1,129 @@
+import sys
+from pathlib import Path
+from reportlab.pdfgen import canvas
+from reportlab.lib.pagesizes import LETTER
+
+ROOT = Path(__file__).resolve().parent.parent
+SRC = ROOT / 'src'
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+from PIL import Image
+from alltius_ai import ocr
+from alltius_ai.ocr import OcrCache
+from alltius_ai.pdf_extractor import extract_pdf
+
+
+def build_image_pdf(path: Path, tmp_path: Path, pages: int = 3):
+    logo = tmp_path / "logo.png"
+    Image.new("RGB", (120, 60), (200, 30, 30)).save(logo)
+    c = canvas.Canvas(str(path), pagesize=LETTER)
+    for i in range(pages):
+        c.setFont("Helvetica", 12)
+        c.drawString(72, 740, f"Page {i + 1} text.")
+        c.drawImage(str(logo), 72, 600, width=120, height=60)
+        c.drawImage(str(logo), 300, 600, width=120, height=60)
+        c.showPage()
+    c.save()
+
+
+def fake_tesseract(monkeypatch):
+    calls = []
+    def run(png_bytes):
+        calls.append(len(png_bytes))
+        return "ACME Corp"
+    monkeypatch.setattr(ocr, "_run_tesseract", run)
+    monkeypatch.setattr(ocr, "_SHARED_CACHES", {})
+    return calls
+
+
+def test_repeated_images_ocr_once(tmp_path, monkeypatch):
+    calls = fake_tesseract(monkeypatch)
+    pdf_file = tmp_path / "logos.pdf"
+    build_image_pdf(pdf_file, tmp_path)
+    result = extract_pdf(str(pdf_file), enable_ocr=True)
+    charts = [b for p in result.pages for b in p.content if b.type == "chart"]
+    assert len(charts) == 6
+    assert all("ACME Corp" in b.description for b in charts)
+    assert len(calls) == 1
+    stats = result.stats["ocr"]
+    assert stats.images == 6 and stats.tesseract_calls == 1 and stats.xref_hits == 5
+
+
+def test_disk_cache_shared_across_documents(tmp_path, monkeypatch):
+    calls = fake_tesseract(monkeypatch)
+    cache_dir = tmp_path / "ocr-cache"
+    first = tmp_path / "a.pdf"
+    build_image_pdf(first, tmp_path, pages=1)
+    extract_pdf(str(first), enable_ocr=True, ocr_cache_dir=str(cache_dir))
+    assert len(calls) == 1
+    # a fresh process would start with an empty memory cache
+    monkeypatch.setattr(ocr, "_SHARED_CACHES", {})
+    second = tmp_path / "b.pdf"
+    build_image_pdf(second, tmp_path, pages=2)
+    result = extract_pdf(str(second), enable_ocr=True, ocr_cache_dir=str(cache_dir))
+    assert len(calls) == 1
+    assert result.stats["ocr"].cache_hits == 1
+
+
+def test_cache_lru_eviction(tmp_path):
+    cache = OcrCache(tmp_path / "store", max_bytes=100)
+    for i in range(10):
+        cache.put(f"{i:02d}key", "x" * 30)
+    files = list((tmp_path / "store").glob("*/*.txt"))
+    assert sum(f.stat().st_size for f in files) <= 100
+    assert cache.get("09key") == "x" * 30
+
+
+def test_prefilter_and_roi_rendering(tmp_path, monkeypatch):
+    seen = []
+    def run(png_bytes):
+        import io
+        seen.append(Image.open(io.BytesIO(png_bytes)).size)
+        return "chart"
+    monkeypatch.setattr(ocr, "_run_tesseract", run)
+    monkeypatch.setattr(ocr, "_SHARED_CACHES", {})
+    big = tmp_path / "big.png"
+    Image.new("RGB", (1200, 600), (10, 120, 10)).save(big)
+    icon = tmp_path / "icon.png"
+    Image.new("RGB", (64, 64), (10, 10, 200)).save(icon)
+    bar = tmp_path / "bar.png"
+    Image.new("RGB", (400, 8), (90, 90, 90)).save(bar)
+    pdf_file = tmp_path / "mixed.pdf"
+    c = canvas.Canvas(str(pdf_file), pagesize=LETTER)
+    c.drawImage(str(big), 72, 500, width=144, height=72)
+    c.drawImage(str(icon), 300, 500, width=12, height=12)
+    c.drawImage(str(bar), 72, 400, width=400, height=8)
+    c.showPage()
+    c.save()
+    result = extract_pdf(str(pdf_file), enable_ocr=True, ocr_workers=2, ocr_dpi=100)
+    stats = result.stats["ocr"]
+    assert stats.images == 3 and stats.filtered == 2 and stats.tesseract_calls == 1
+    # 144x72pt rendered at 100 dpi, not the 1200x600 native pixels
+    assert len(seen) == 1
+    assert abs(seen[0][0] - 200) <= 1 and abs(seen[0][1] - 100) <= 1
+    charts = [b for b in result.pages[0].content if b.type == "chart"]
+    assert sum("chart" in b.description for b in charts) == 1
+
+
+def test_labels_drawn_over_a_shared_image_are_read_per_page(tmp_path, monkeypatch):
+    import hashlib
+    def run(png_bytes):
+        return "render " + hashlib.md5(png_bytes).hexdigest()[:8]
+    monkeypatch.setattr(ocr, "_run_tesseract", run)
+    monkeypatch.setattr(ocr, "_SHARED_CACHES", {})
+    template = tmp_path / "template.png"
+    Image.new("RGB", (300, 150), (240, 240, 240)).save(template)
+    pdf_file = tmp_path / "charts.pdf"
+    c = canvas.Canvas(str(pdf_file), pagesize=LETTER)
+    for label in ("Revenue 2023", "Costs 2024", "Revenue 2023"):
+        c.drawImage(str(template), 72, 500, width=300, height=150)
+        c.setFont("Helvetica", 14)
+        c.drawString(100, 600, label)
+        c.showPage()
+    c.save()
+    result = extract_pdf(str(pdf_file), enable_ocr=True)
+    descriptions = [b.description for p in result.pages for b in p.content if b.type == "chart"]
+    assert descriptions[0] != descriptions[1] and descriptions[0] == descriptions[2]
+    stats = result.stats["ocr"]
+    assert stats.tesseract_calls == 2 and stats.xref_hits == 1
@@ -0,0 +1,66 @@
+import logging
+import sys
+from pathlib import Path
+from reportlab.pdfgen import canvas
+from reportlab.lib.pagesizes import LETTER
+
+ROOT = Path(__file__).resolve().parent.parent
+SRC = ROOT / 'src'
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+from alltius_ai.pdf_extractor import extract_pdf
+
+
+def build_pdf(path: Path, outline: bool = True):
+    # unnumbered headings set in the body font: invisible to the font-size detector, exact in the outline
+    c = canvas.Canvas(str(path), pagesize=LETTER)
+    entries = [
+        (0, "Overview", 0), (1, "Background", 0),
+        (0, "Method", 1), (1, "Data Sources", 1), (1, "Appendix B: Sampling", 1),
+    ]
+    for page in range(3):
+        c.setFont("Helvetica", 12)
+        y = 730
+        for n, (level, title, on_page) in enumerate(entries):
+            if on_page != page:
+                continue
+            c.drawString(72, y, title if not title.startswith("Appendix") else "Sampling")
+            if outline:
+                c.bookmarkHorizontal(f"k{n}", 72, y + 12)
+                c.addOutlineEntry(title, f"k{n}", level=level)
+            c.drawString(72, y - 20, f"Text under {title}.")
+            y -= 80
+        c.drawString(72, 300, f"Closing text on page {page + 1}.")
+        c.showPage()
+    c.save()
+
+
+def _sections(result):
+    return [(b.section, b.sub_section, b.text) for p in result.pages for b in p.content if b.type == "paragraph"]
+
+
+def test_outline_gives_exact_sections(tmp_path):
+    pdf_file = tmp_path / "doc.pdf"
+    build_pdf(pdf_file)
+    sections = _sections(extract_pdf(str(pdf_file), table_backend=None, merge_lines=False))
+    assert ("Overview", None, "Text under Overview.") in sections
+    assert ("Overview", "Background", "Text under Background.") in sections
+    assert ("Method", "Data Sources", "Text under Data Sources.") in sections
+    # title differs from the page text only by its label prefix
+    assert ("Method", "Appendix B: Sampling", "Text under Appendix B: Sampling.") in sections
+    # page 3 has no outline entries and carries the state over
+    assert ("Method", "Appendix B: Sampling", "Closing text on page 3.") in sections
+    # same-size headings are invisible to font statistics
+    assert {s for s, _sub, _t in _sections(extract_pdf(str(pdf_file), table_backend=None, merge_lines=False, heading_source="fonts"))} == {None}
+    assert extract_pdf(str(pdf_file), table_backend=None, merge_lines=False, pages="2-3").pages[0].to_dict() == \
+        extract_pdf(str(pdf_file), table_backend=None, merge_lines=False).pages[1].to_dict()
+
+
+def test_outline_source_falls_back_to_fonts(tmp_path, caplog):
+    pdf_file = tmp_path / "plain.pdf"
+    build_pdf(pdf_file, outline=False)
+    with caplog.at_level(logging.WARNING):
+        result = extract_pdf(str(pdf_file), table_backend=None, merge_lines=False, heading_source="outline")
+    assert "no outline" in caplog.text
+    assert result.to_dict() == extract_pdf(str(pdf_file), table_backend=None, merge_lines=False, heading_source="fonts").to_dict()
@@ -0,0 +1,64 @@
+import sys
+from pathlib import Path
+import pytest
+from reportlab.pdfgen import canvas
+from reportlab.lib.pagesizes import LETTER
+
+ROOT = Path(__file__).resolve().parent.parent
+SRC = ROOT / 'src'
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+from alltius_ai.metrics import Metrics
+from alltius_ai.pdf_extractor import extract_pdf, parse_page_spec
+
+
+def build_pdf(path: Path, pages: int = 12):
+    # a numbered chapter every 4 pages, a subsection on odd pages
+    c = canvas.Canvas(str(path), pagesize=LETTER)
+    for i in range(pages):
+        y = 730
+        if i % 4 == 0:
+            c.setFont("Helvetica-Bold", 18)
+            c.drawString(72, y, f"{i // 4 + 1} Chapter {i // 4 + 1}")
+            y -= 30
+        if i % 2 == 1:
+            c.setFont("Helvetica-Bold", 15)
+            c.drawString(72, y, f"{i // 4 + 1}.{i} Topic {i}")
+            y -= 30
+        c.setFont("Helvetica", 12)
+        for k in range(3):
+            c.drawString(72, y - k * 40, f"Body text {i + 1}.{k}.")
+        c.showPage()
+    c.save()
+
+
+def test_parse_page_spec():
+    assert parse_page_spec("2-4, 7", 10) == [1, 2, 3, 6]
+    assert parse_page_spec("9-", 10) == [8, 9]
+    assert parse_page_spec("-2", 10) == [0, 1]
+    assert parse_page_spec([3, 1, 3], 10) == [0, 2]
+    for bad in ("0", "5-3", "11", "a-b", ""):
+        with pytest.raises(ValueError):
+            parse_page_spec(bad, 10)
+
+
+def test_page_selection_matches_full_extraction(tmp_path):
+    pdf_file = tmp_path / "doc.pdf"
+    build_pdf(pdf_file)
+    full = extract_pdf(str(pdf_file)).to_dict()["pages"]
+    for spec in ("7-8,11", "2", "12", [4, 10]):
+        numbers = [p + 1 for p in parse_page_spec(spec, len(full))]
+        got = extract_pdf(str(pdf_file), pages=spec).to_dict()["pages"]
+        assert got == [full[n - 1] for n in numbers]
+    assert extract_pdf(str(pdf_file), pages="6-8", parallel=True, workers=2).to_dict()["pages"] == full[5:8]
+
+
+def test_seeding_stops_at_last_chapter(tmp_path):
+    pdf_file = tmp_path / "doc.pdf"
+    build_pdf(pdf_file)
+    metrics = Metrics()
+    extract_pdf(str(pdf_file), pages="12", metrics=metrics)
+    # chapter 3 starts on page 9: pages 9-11 are scanned for section context, pages 1-8 are not touched
+    assert metrics.counters["seed_pages"] == 3
+    assert metrics.counters["pages"] == 1
@@ -0,0 +1,73 @@
+import sys
+from pathlib import Path
+from reportlab.pdfgen import canvas
+from reportlab.lib.pagesizes import LETTER
+
+ROOT = Path(__file__).resolve().parent.parent
+SRC = ROOT / 'src'
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+import fitz
+from PIL import Image
+from alltius_ai.heading_detection import detect_headings, detect_headings_in_spans
+from alltius_ai.page_text import read_page
+
+
+def build_pdf(path: Path, tmp_path: Path):
+    img = tmp_path / "chart.png"
+    Image.new("RGB", (200, 100), (0, 90, 200)).save(img)
+    c = canvas.Canvas(str(path), pagesize=LETTER)
+    c.drawImage(str(img), 72, 700, width=200, height=60)
+    c.setFont("Helvetica-Bold", 18)
+    c.drawString(72, 660, "2 Results")
+    c.setFont("Helvetica", 12)
+    c.drawString(72, 640, "First body line.")
+    c.drawString(72, 625, "Second body line.")
+    c.drawImage(str(img), 72, 400, width=200, height=60)
+    c.drawString(72, 380, "After the chart.")
+    c.showPage()
+    c.save()
+
+
+def test_read_page_matches_full_text_dict(tmp_path):
+    pdf_file = tmp_path / "mixed.pdf"
+    build_pdf(pdf_file, tmp_path)
+    with fitz.open(str(pdf_file)) as doc:
+        page = doc[0]
+        page_dict = page.get_text("dict")
+        spans = read_page(page)
+        expected = []
+        for block in page_dict["blocks"]:
+            if block["type"] == 1:
+                expected.append(("image", tuple(block["bbox"])))
+            else:
+                for line in block["lines"]:
+                    expected.append(("line", "".join(s["text"] for s in line["spans"]).strip()))
+        got = []
+        for kind, i in spans.items():
+            if kind == "image":
+                got.append(("image", tuple(spans.images[i]["bbox"])))
+            else:
+                got.append(("line", spans.line_text[i]))
+        assert got == expected
+        assert [k for k, _ in got].count("image") == 2
+        assert detect_headings_in_spans(spans) == detect_headings(page_dict)
+        assert detect_headings_in_spans(spans)[0][0] == "2 Results"
+
+
+def test_inline_images_become_chart_blocks(tmp_path):
+    from alltius_ai.pdf_extractor import extract_pdf
+    img = tmp_path / "chart.png"
+    Image.new("RGB", (200, 100), (0, 90, 200)).save(img)
+    pdf_file = tmp_path / "inline.pdf"
+    c = canvas.Canvas(str(pdf_file), pagesize=LETTER)
+    c.setFont("Helvetica", 12)
+    c.drawString(72, 700, "Text above an inline image.")
+    c.drawInlineImage(str(img), 72, 500, width=200, height=100)
+    c.showPage()
+    c.save()
+    with fitz.open(str(pdf_file)) as doc:
+        assert not doc[0].get_images()
+    content = extract_pdf(str(pdf_file)).pages[0].content
+    assert [b.type for b in content] == ["paragraph", "chart"]
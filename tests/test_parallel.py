@@ -0,0 +1,41 @@
+import sys
+from pathlib import Path
+from reportlab.pdfgen import canvas
+from reportlab.lib.pagesizes import LETTER
+
+ROOT = Path(__file__).resolve().parent.parent
+SRC = ROOT / 'src'
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+from alltius_ai.pdf_extractor import extract_pdf, _shard_pages
+
+
+def build_pdf(path: Path, pages: int = 5):
+    c = canvas.Canvas(str(path), pagesize=LETTER)
+    for i in range(pages):
+        c.setFont("Helvetica-Bold", 18)
+        c.drawString(72, 730, f"{i + 1}. Chapter {i + 1}")
+        c.setFont("Helvetica-Bold", 15)
+        c.drawString(72, 700, f"{i + 1}.1 Part")
+        c.setFont("Helvetica", 12)
+        c.drawString(72, 680, f"Body text on page {i + 1}.")
+        c.drawString(72, 665, "Continues here.")
+        c.drawString(72, 40, f"Footnote {i + 1}")
+        c.showPage()
+    c.save()
+
+
+def test_shards_are_contiguous_and_complete():
+    shards = _shard_pages(10, 2)
+    assert [i for shard in shards for i in shard] == list(range(10))
+    assert _shard_pages(1, 8) == [range(0, 1)]
+
+
+def test_parallel_matches_serial(tmp_path):
+    pdf_file = tmp_path / "multi.pdf"
+    build_pdf(pdf_file)
+    serial = extract_pdf(str(pdf_file)).to_dict()
+    parallel = extract_pdf(str(pdf_file), parallel=True, workers=2).to_dict()
+    assert parallel == serial
+    assert [p['page_number'] for p in parallel['pages']] == [1, 2, 3, 4, 5]
@@ -0,0 +1,97 @@
+import sys
+from pathlib import Path
+from reportlab.pdfgen import canvas
+from reportlab.lib.pagesizes import LETTER
+
+ROOT = Path(__file__).resolve().parent.parent
+SRC = ROOT / 'src'
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+from alltius_ai.metrics import Metrics
+from alltius_ai.plugins import PluginPipeline, register, run_plugins
+from alltius_ai.pdf_extractor import extract_pdf, iter_pages
+
+
+def build_pdf(path: Path, pages: int = 20):
+    c = canvas.Canvas(str(path), pagesize=LETTER)
+    for i in range(pages):
+        c.setFont("Helvetica-Bold", 16)
+        c.drawString(72, 730, f"{i + 1} Section {i + 1}")
+        c.setFont("Helvetica", 11)
+        for j in range(3):
+            c.drawString(72, 690 - 40 * j, f"Page {i + 1} paragraph {j + 1} text.")
+        c.showPage()
+    c.save()
+
+
+class CharCountPlugin:
+    name = "test_charcount"
+    block_types = ("paragraph",)
+    parallel = True
+
+    def process_block(self, block, page):
+        block.metadata["chars"] = len(block.text)
+
+
+class TaggerPlugin:
+    # handles every block type and reads what an earlier plugin wrote
+    name = "test_tagger"
+    block_types = None
+    parallel = False
+
+    def process_block(self, block, page):
+        block.metadata["tag"] = f"{page.page_number}:{block.metadata.get('word_count', '-')}"
+
+
+class LegacyPlugin:
+    name = "test_legacy"
+
+    def process(self, result):
+        total = sum(b.metadata.get("chars", 0) for p in result.pages for b in p.content)
+        for page in result.pages:
+            for block in page.content:
+                block.metadata["total_chars"] = total
+
+
+for plugin in (CharCountPlugin(), TaggerPlugin(), LegacyPlugin()):
+    register(plugin)
+
+
+def _metadata(pages):
+    return [dict(b.metadata) for p in pages for b in p.content]
+
+
+def test_fused_pipeline_matches_sequential_plugins(tmp_path):
+    pdf_file = tmp_path / "doc.pdf"
+    build_pdf(pdf_file)
+    names = ["wordcount", "test_charcount", "test_tagger", "test_legacy"]
+    expected = extract_pdf(str(pdf_file), table_backend=None)
+    # reference: each plugin applied on its own, in order
+    for name in names[:-1]:
+        PluginPipeline([name], workers=0).run(expected)
+    PluginPipeline(["test_legacy"]).run(expected)
+    blocks = [b for p in expected.pages for b in p.content]
+    assert blocks[0].metadata["tag"] == "1:3" and blocks[1].metadata["tag"] == "1:5"
+    assert blocks[1].metadata["total_chars"] == sum(len(b.text) for b in blocks if b.type == "paragraph")
+
+    metrics = Metrics()
+    result = extract_pdf(str(pdf_file), table_backend=None)
+    pipeline = PluginPipeline(names, metrics=metrics, workers=2)
+    assert [kind for kind, _ in pipeline.stages] == ["fused", "pool", "fused", "legacy"]
+    pipeline.run(result)
+    assert _metadata(result.pages) == _metadata(expected.pages)
+    assert pipeline.stats["wordcount"][1] == pipeline.stats["test_charcount"][1] == 80
+    assert pipeline.stats["test_tagger"][1] == len(blocks)
+    assert metrics.counters["plugin_test_charcount_blocks"] == 80 and "plugin_test_legacy" in metrics.timers
+
+
+def test_streaming_pipeline_keeps_page_order(tmp_path):
+    pdf_file = tmp_path / "doc.pdf"
+    build_pdf(pdf_file)
+    names = ["wordcount", "test_charcount", "test_tagger"]
+    expected = extract_pdf(str(pdf_file), table_backend=None)
+    run_plugins(expected, names, workers=0)
+    pages = list(PluginPipeline(names, workers=2).process_pages(iter_pages(str(pdf_file), table_backend=None)))
+    assert [p.page_number for p in pages] == list(range(1, 21))
+    assert _metadata(pages) == _metadata(expected.pages)
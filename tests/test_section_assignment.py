@@ -0,0 +1,91 @@
+import random
+import re
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+SRC = ROOT / 'src'
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+from alltius_ai.heading_detection import SectionTracker, assign_sections, heading_level
+
+
+def reference_assign(paragraphs, headings_per_page):
+    # the original rescan-per-paragraph implementation, kept as the behavioural reference
+    results = []
+    last_section = None
+    last_subsection = None
+    for text, page, bbox in paragraphs:
+        y_top = bbox[1] if bbox else 0
+        candidates = [(h_text, h_bbox) for h_text, h_bbox in headings_per_page.get(page, []) if h_bbox and h_bbox[1] <= y_top]
+        if candidates:
+            candidates.sort(key=lambda x: x[1][1])
+            level_map = {}
+            last_plain = None
+            for h_text, _hb in candidates:
+                m = re.match(r"^(\d+(?:\.\d+)*)\s+(.+)$", h_text)
+                if m:
+                    level_map[m.group(1).count('.') + 1] = h_text
+                else:
+                    last_plain = h_text
+            if level_map:
+                last_section = level_map.get(1, last_section)
+                deeper_levels = [lvl for lvl in level_map.keys() if lvl > 1]
+                last_subsection = level_map[max(deeper_levels)] if deeper_levels else None
+                if last_plain and last_section:
+                    if last_plain != last_section:
+                        last_subsection = last_plain
+                elif last_plain and not level_map.get(1):
+                    if last_section is None:
+                        last_section = last_plain
+                    else:
+                        last_subsection = last_plain
+            elif last_plain:
+                if last_section is None:
+                    last_section = last_plain
+                    last_subsection = None
+                else:
+                    last_subsection = last_plain
+        results.append((text, last_section, last_subsection))
+    return results
+
+
+def random_document(rng, pages=20):
+    titles = ["1. Intro", "2. Scope", "2.1 Detail", "2.1.3 Deep", "3.4 Other", "Plain", "Annex", "1. Intro"]
+    headings_per_page = {}
+    paragraphs = []
+    for page in range(1, pages + 1):
+        hs = []
+        for _ in range(rng.randint(0, 6)):
+            y = rng.choice([10, 50, 50, 120, 300, 500])
+            hs.append((rng.choice(titles), None if rng.random() < 0.1 else (72, y, 300, y + 12)))
+        headings_per_page[page] = hs
+        for _ in range(rng.randint(0, 8)):
+            y = rng.choice([5, 50, 60, 200, 400, 700])
+            paragraphs.append((f"p{page}-{y}", page, None if rng.random() < 0.05 else (72, y, 300, y + 10)))
+    return paragraphs, headings_per_page
+
+
+def test_matches_reference_implementation():
+    rng = random.Random(1234)
+    for _ in range(200):
+        paragraphs, headings = random_document(rng)
+        assert assign_sections(paragraphs, headings) == reference_assign(paragraphs, headings)
+
+
+def test_tracker_page_by_page_matches_single_call():
+    rng = random.Random(99)
+    paragraphs, headings = random_document(rng, pages=30)
+    tracker = SectionTracker()
+    per_page = []
+    for page in range(1, 31):
+        per_page.extend(tracker.assign([p for p in paragraphs if p[1] == page], headings))
+    assert per_page == assign_sections(paragraphs, headings)
+
+
+def test_heading_level():
+    assert heading_level("1 Intro") == 1
+    assert heading_level("1. Intro") is None
+    assert heading_level("2.3.1 Deep") == 3
+    assert heading_level("Plain heading") is None
@@ -0,0 +1,96 @@
+import json
+import socket
+import sys
+import threading
+import urllib.error
+import urllib.request
+from pathlib import Path
+from reportlab.pdfgen import canvas
+from reportlab.lib.pagesizes import LETTER
+
+ROOT = Path(__file__).resolve().parent.parent
+SRC = ROOT / 'src'
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+from alltius_ai.pdf_extractor import extract_pdf
+from alltius_ai.server import ExtractionService, make_server
+
+
+def build_pdf(path: Path, pages: int = 2):
+    c = canvas.Canvas(str(path), pagesize=LETTER)
+    for i in range(pages):
+        c.setFont("Helvetica-Bold", 18)
+        c.drawString(72, 730, f"{i + 1} Part {i + 1}")
+        c.setFont("Helvetica", 12)
+        c.drawString(72, 700, f"Text on page {i + 1}.")
+        c.drawString(72, 680, "More body text.")
+        c.showPage()
+    c.save()
+
+
+def _serve(**kwargs):
+    service = ExtractionService(workers=1, queue_size=0)
+    server = make_server(service, port=0, **kwargs)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return service, server
+
+
+def _stop(service, server):
+    server.shutdown()
+    server.server_close()
+    service.close()
+
+
+def test_server_extracts_and_applies_backpressure(tmp_path):
+    pdf_file = tmp_path / "doc.pdf"
+    build_pdf(pdf_file)
+    service, server = _serve()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        req = urllib.request.Request(f"{base}/extract?merge_lines=false", data=pdf_file.read_bytes(),
+                                     headers={"Content-Type": "application/pdf"})
+        with urllib.request.urlopen(req) as resp:
+            assert json.loads(resp.read()) == extract_pdf(str(pdf_file), merge_lines=False).to_dict()
+        req = urllib.request.Request(f"{base}/extract?format=ndjson", data=json.dumps({"path": str(pdf_file)}).encode(),
+                                     headers={"Content-Type": "application/json"})
+        with urllib.request.urlopen(req) as resp:
+            assert [json.loads(line)["page_number"] for line in resp.read().splitlines()] == [1, 2]
+        with urllib.request.urlopen(f"{base}/health") as resp:
+            assert json.loads(resp.read())["status"] == "ok"
+        # queue full: the only slot is taken, so the next job is rejected instead of queued
+        assert service.try_acquire()
+        try:
+            urllib.request.urlopen(urllib.request.Request(f"{base}/extract", data=b"%PDF", headers={"Content-Type": "application/pdf"}))
+            raise AssertionError("expected 503")
+        except urllib.error.HTTPError as e:
+            assert e.code == 503
+        finally:
+            service._slots.release()
+        with urllib.request.urlopen(f"{base}/queue") as resp:
+            state = json.loads(resp.read())
+        assert state["completed"] == 2 and state["rejected"] == 1 and state["in_flight"] == 0
+        for query in ("bogus=1", "pages=a-b", "heading_source=toc", "font_stats=median"):
+            try:
+                urllib.request.urlopen(urllib.request.Request(f"{base}/extract?{query}", data=b"%PDF"))
+                raise AssertionError("expected 400")
+            except urllib.error.HTTPError as e:
+                assert e.code == 400
+    finally:
+        _stop(service, server)
+
+
+def test_server_unix_socket(tmp_path):
+    sock_path = str(tmp_path / "alltius.sock")
+    service, server = _serve(unix_socket=sock_path)
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+            s.connect(sock_path)
+            s.sendall(b"GET /health HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n\r\n")
+            data = b""
+            while chunk := s.recv(4096):
+                data += chunk
+        assert data.startswith(b"HTTP/1.1 200")
+        assert b'"status": "ok"' in data
+    finally:
+        _stop(service, server)
@@ -0,0 +1,112 @@
+import io
+import json
+import sys
+from pathlib import Path
+from reportlab.pdfgen import canvas
+from reportlab.lib.pagesizes import LETTER
+
+ROOT = Path(__file__).resolve().parent.parent
+SRC = ROOT / 'src'
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+from alltius_ai import exporters
+from alltius_ai.exporters import page_json, to_markdown, write_json_stream, write_ndjson
+from alltius_ai.models import ChartBlock, FootnoteBlock, PageResult, ParagraphBlock, TableBlock
+from alltius_ai.pdf_extractor import extract_pdf, iter_pages, save_extraction, save_extraction_stream
+
+
+def build_pdf(path: Path, pages: int = 4):
+    c = canvas.Canvas(str(path), pagesize=LETTER)
+    for i in range(pages):
+        if i % 2 == 0:
+            c.setFont("Helvetica-Bold", 18)
+            c.drawString(72, 730, f"{i + 1}. Part {i + 1}")
+        c.setFont("Helvetica", 12)
+        c.drawString(72, 700, f"Text on page {i + 1}.")
+        c.drawString(72, 640, "More body text.")
+        c.showPage()
+    c.save()
+
+
+def test_iter_pages_carries_sections(tmp_path):
+    pdf_file = tmp_path / "doc.pdf"
+    build_pdf(pdf_file)
+    stream = iter_pages(str(pdf_file))
+    first = next(stream)
+    assert first.page_number == 1
+    rest = list(stream)
+    assert [p.page_number for p in rest] == [2, 3, 4]
+    # page 2 has no heading of its own and inherits the section from page 1
+    assert rest[0].content[0].section == "1. Part 1"
+    full = extract_pdf(str(pdf_file)).to_dict()
+    assert [first.to_dict()] + [p.to_dict() for p in rest] == full["pages"]
+
+
+def test_stream_writers_match_json_dump(tmp_path):
+    pdf_file = tmp_path / "doc.pdf"
+    build_pdf(pdf_file)
+    expected = extract_pdf(str(pdf_file)).to_dict()
+    for pretty in (True, False):
+        buf = io.StringIO()
+        assert write_json_stream(iter_pages(str(pdf_file)), buf, pretty=pretty) == 4
+        assert buf.getvalue() == json.dumps(expected, indent=2 if pretty else None, ensure_ascii=False)
+    buf = io.StringIO()
+    write_json_stream([], buf)
+    assert json.loads(buf.getvalue()) == {"pages": []}
+    buf = io.StringIO()
+    write_ndjson(iter_pages(str(pdf_file)), buf)
+    assert [json.loads(line) for line in buf.getvalue().splitlines()] == expected["pages"]
+
+
+
+def test_json_and_markdown_from_one_pass(tmp_path):
+    pdf_file = tmp_path / "doc.pdf"
+    build_pdf(pdf_file)
+    result = extract_pdf(str(pdf_file))
+    save_extraction(result, str(tmp_path / "a.json"), markdown_path=str(tmp_path / "a.md"))
+    assert (tmp_path / "a.md").read_text(encoding="utf-8") == to_markdown(result)
+    produced = []
+
+    def pages():
+        for page in iter_pages(str(pdf_file)):
+            produced.append(page.page_number)
+            yield page
+
+    count = save_extraction_stream(pages(), str(tmp_path / "b.json"), markdown_path=str(tmp_path / "b.md"))
+    assert count == 4 and produced == [1, 2, 3, 4]
+    assert (tmp_path / "b.json").read_text(encoding="utf-8") == (tmp_path / "a.json").read_text(encoding="utf-8")
+    assert (tmp_path / "b.md").read_text(encoding="utf-8") == to_markdown(result)
+
+def test_stage_timings_reported(tmp_path):
+    pdf_file = tmp_path / "doc.pdf"
+    build_pdf(pdf_file)
+    stats = {}
+    list(iter_pages(str(pdf_file), stats=stats))
+    assert {"text", "headings", "tables", "assembly"} <= set(stats["stages"])
+    assert all(seconds >= 0 for seconds in stats["stages"].values())
+
+
+def test_direct_page_writer_matches_json_dumps(monkeypatch):
+    texts = ["plain", "quote \" back\\slash", "ctrl \n\t\x00\x1f", "ünïcødé 中文", "lone \ud800"]
+    blocks = [ParagraphBlock("paragraph", 1, section=t, text=t, confidence=c, metadata=m)
+              for t in texts for c in (None, 0.5, 1e-05, float("nan")) for m in (None, {"word_count": 2, "x": [1.5e-07, None]})]
+    blocks += [TableBlock("table", 1, table_data=rows, description=d) for rows in ([], [[]], [["a", "b"], [], ["c"]], [[None, 1]]) for d in (None, "t")]
+    blocks += [ChartBlock("chart", 1, description="c", extracted_data=e) for e in (None, [["1", "2"]])]
+    blocks += [FootnoteBlock("footnote", 1, text="f", confidence=0.5, metadata={"source": "heuristic"})]
+    pages = [PageResult(1, blocks), PageResult(2, blocks[:3]), PageResult(3)]
+    for orjson in (exporters.orjson, None):
+        monkeypatch.setattr(exporters, "orjson", orjson)
+        for page in pages:
+            data = page.to_dict()
+            assert page_json(page) == json.dumps(data, indent=2, ensure_ascii=False)
+            assert page_json(page, None) == json.dumps(data, ensure_ascii=False)
+            assert page_json(page, "\n    ") == json.dumps(data, indent=2, ensure_ascii=False).replace("\n", "\n    ")
+
+
+def test_blocks_are_slotted_with_lazy_metadata():
+    block = ParagraphBlock("paragraph", 1, text="x")
+    assert not hasattr(block, "__dict__") and block._metadata is None
+    block.metadata["word_count"] = 1
+    assert page_json(PageResult(1, [block]), None).endswith('"metadata": {"word_count": 1}}]}')
+    assert FootnoteBlock("footnote", 1, metadata={"source": "heuristic"}).metadata == {"source": "heuristic"}
@@ -0,0 +1,144 @@
+import sys
+from pathlib import Path
+from reportlab.pdfgen import canvas
+from reportlab.lib.pagesizes import LETTER
+
+ROOT = Path(__file__).resolve().parent.parent
+SRC = ROOT / 'src'
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+import pytest
+from alltius_ai.pdf_extractor import extract_pdf
+from alltius_ai.table_extractor import available_backends, extract_tables, get_backend
+
+
+def build_table_pdf(path: Path):
+    c = canvas.Canvas(str(path), pagesize=LETTER)
+    c.setFont("Helvetica", 12)
+    c.drawString(72, 740, "Quarterly figures follow.")
+    xs = [72, 200, 328]
+    ys = [700, 680, 660, 640]
+    for y in ys:
+        c.line(xs[0], y, xs[-1], y)
+    for x in xs:
+        c.line(x, ys[0], x, ys[-1])
+    rows = [["Name", "Value"], ["Alpha", "1"], ["Beta", "2"]]
+    for r, row in enumerate(rows):
+        for col, cell in enumerate(row):
+            c.drawString(xs[col] + 4, ys[r] - 14, cell)
+    c.showPage()
+    c.save()
+
+
+def test_unknown_backend():
+    assert {"pdfplumber", "pymupdf"} <= set(available_backends())
+    with pytest.raises(ValueError):
+        get_backend("nope")
+
+
+@pytest.mark.parametrize("backend", ["pdfplumber", "pymupdf"])
+def test_backends_return_rows_and_bbox(tmp_path, backend):
+    pdf_file = tmp_path / "table.pdf"
+    build_table_pdf(pdf_file)
+    assert extract_tables(str(pdf_file), backend=backend) == {1: [[["Name", "Value"], ["Alpha", "1"], ["Beta", "2"]]]}
+    result = extract_pdf(str(pdf_file), table_backend=backend)
+    tables = [b for b in result.pages[0].content if b.type == "table"]
+    assert len(tables) == 1
+    x0, y0, x1, y1 = tables[0].bbox
+    # PDF y=700..640 from the bottom maps to roughly 92..152 from the top of a LETTER page
+    assert abs(x0 - 72) < 2 and abs(x1 - 328) < 2
+    assert abs(y0 - 92) < 2 and abs(y1 - 152) < 2
+
+
+def test_tables_disabled(tmp_path):
+    pdf_file = tmp_path / "table.pdf"
+    build_table_pdf(pdf_file)
+    result = extract_pdf(str(pdf_file), table_backend=None)
+    assert not [b for b in result.pages[0].content if b.type == "table"]
+
+
+def build_prose_pdf(path: Path):
+    c = canvas.Canvas(str(path), pagesize=LETTER)
+    c.setFont("Helvetica", 12)
+    c.drawString(72, 740, "Plain prose page without any grid.")
+    c.drawString(72, 725, "A second line of prose.")
+    c.showPage()
+    c.save()
+
+
+def test_prefilter_skips_prose_pages(tmp_path):
+    prose = tmp_path / "prose.pdf"
+    build_prose_pdf(prose)
+    result = extract_pdf(str(prose))
+    stats = result.stats["tables"]
+    assert stats.pages_checked == 1 and stats.pages_skipped == 1 and stats.pages_detected == 0
+
+    grid = tmp_path / "table.pdf"
+    build_table_pdf(grid)
+    result = extract_pdf(str(grid))
+    stats = result.stats["tables"]
+    assert stats.pages_skipped == 0 and stats.pages_detected == 1
+
+
+def test_force_table_detection(tmp_path):
+    prose = tmp_path / "prose.pdf"
+    build_prose_pdf(prose)
+    stats = extract_pdf(str(prose), force_tables=True).stats["tables"]
+    assert stats.pages_skipped == 0 and stats.pages_detected == 1 and stats.pages_missed == 0
+
+
+def build_report_pdf(path: Path):
+    from PIL import Image
+    from reportlab.lib.utils import ImageReader
+    c = canvas.Canvas(str(path), pagesize=LETTER)
+    c.setFont("Helvetica", 12)
+    c.drawString(72, 740, "Quarterly figures follow.")
+    xs = [72, 200, 328]
+    ys = [700, 680, 660, 640, 600]
+    for y in ys:
+        c.line(xs[0], y, xs[-1], y)
+    for x in xs:
+        c.line(x, ys[0], x, ys[-1])
+    rows = [["Name", "Value"], ["Alpha", "1"], ["Beta", "2"], ["Trend", ""]]
+    for r, row in enumerate(rows):
+        for col, cell in enumerate(row):
+            c.drawString(xs[col] + 4, ys[r] - 14, cell)
+    c.drawImage(ImageReader(Image.new("RGB", (60, 20), (200, 40, 40))), 210, 610, width=60, height=20)
+    c.drawString(72, 560, "Closing remarks below the table.")
+    c.showPage()
+    c.save()
+
+
+def test_table_text_is_dropped_and_tables_ordered_by_position(tmp_path):
+    pdf_file = tmp_path / "report.pdf"
+    build_report_pdf(pdf_file)
+    content = extract_pdf(str(pdf_file)).pages[0].content
+    assert [b.type for b in content] == ["paragraph", "table", "paragraph"]
+    assert content[0].text == "Quarterly figures follow." and content[2].text == "Closing remarks below the table."
+    assert content[1].table_data[:3] == [["Name", "Value"], ["Alpha", "1"], ["Beta", "2"]]
+    # the image inside the table belongs to it rather than becoming a chart block
+    assert len(content[1].metadata["images"]) == 1
+
+    kept = extract_pdf(str(pdf_file), table_text="keep").pages[0].content
+    assert "Alpha 1" in " ".join(b.text for b in kept if b.type == "paragraph")
+    assert [b.type for b in kept].count("chart") == 1
+    with pytest.raises(ValueError):
+        extract_pdf(str(pdf_file), table_text="nope")
+
+
+def test_table_regions_on_a_cropped_page(tmp_path):
+    import fitz
+    pdf_file = tmp_path / "report.pdf"
+    build_report_pdf(pdf_file)
+    cropped = tmp_path / "cropped.pdf"
+    with fitz.open(str(pdf_file)) as doc:
+        # CropBox origin away from the MediaBox origin: text lines are measured from the CropBox corner
+        doc.xref_set_key(doc[0].xref, "CropBox", "[40 500 560 760]")
+        doc.save(str(cropped))
+    results = {backend: extract_pdf(str(cropped), table_backend=backend).pages[0].content for backend in ("pdfplumber", "pymupdf")}
+    boxes = [next(b.bbox for b in content if b.type == "table") for content in results.values()]
+    assert all(abs(a - b) < 1 for a, b in zip(*boxes))
+    assert abs(boxes[0][0] - 32) < 1 and abs(boxes[0][1] - 60) < 1
+    for content in results.values():
+        assert [b.text for b in content if b.type == "paragraph"] == ["Quarterly figures follow.", "Closing remarks below the table."]